@@ -1,3 +1,4 @@
+import os
 from flask import Flask, redirect, url_for
 from routes.auth_routes import auth_bp
 from routes.main_routes import main_bp
@@ -7,15 +8,66 @@ from routes.category_routes import category_bp
 from routes.goal_routes import goal_bp
 from routes.objective_routes import objective_bp
 from routes.report_routes import report_bp
-from extensions import db, login_manager
-from models.user import User
-from utils import seeder
+from routes.job_routes import job_bp
+from extensions import db, login_manager, report_cache
+from utils import migrations, query_stats
+from utils.database import database_config_from_env, resolve_pragmas, configure_engine
+from utils.commands import register_commands
+from utils.system_categories import system_categories
+from utils.user_cache import user_cache
+from utils.passwords import password_hasher
+from utils.scheduler import start_goal_sweeper
 
-def create_app():
+def create_app(config=None):
+    """Cria a aplicação.
+
+    Args:
+        config (dict, optional): Configurações que sobrescrevem os padrões abaixo
+            (ex: outro `SQLALCHEMY_DATABASE_URI` para benchmarks).
+    """
     app = Flask(__name__)
     app.config['SECRET_KEY'] = "chave-super-secreta"
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///finance.db"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # URI, pool e perfil de PRAGMAs do SQLite: DATABASE_URL, DB_POOL_*, SQLITE_PRAGMA_PROFILE
+    app.config.update(database_config_from_env())
+    # PRAGMAs que sobrescrevem os do perfil (ex: {"cache_size": -64000})
+    app.config["SQLITE_PRAGMAS"] = {}
+    # Desligue (DB_AUTO_PROVISION=0) em workers cujo banco já foi preparado com `flask provision-db`
+    app.config["DB_AUTO_PROVISION"] = os.environ.get("DB_AUTO_PROVISION", "1") != "0"
+    # Cache dos relatórios: "memory" (um processo), "sqlite" (vários workers) ou "none"
+    app.config["REPORT_CACHE_BACKEND"] = "memory"
+    app.config["REPORT_CACHE_MAX_ENTRIES"] = 1024
+    app.config["REPORT_CACHE_TTL"] = 300
+    # Segundos entre os registros dos contadores do cache no log 'finance.sql' (0 desliga)
+    app.config["REPORT_CACHE_STATS_INTERVAL"] = 60
+    # Máximo de consultas do Dashboard; acima disso registra um aviso (ou falha com QUERY_BUDGET_STRICT / testes)
+    app.config["DASHBOARD_QUERY_BUDGET"] = 4
+    # Cabeçalhos X-DB-Queries/X-DB-Time e log 'finance.sql' por requisição; aviso de N+1 acima do limite
+    app.config["SQL_INSTRUMENTATION"] = True
+    app.config["SQL_N_PLUS_ONE_THRESHOLD"] = 5
+    # Identidade do usuário logado em memória (sem um SELECT por requisição); descartada em alterações e no logout
+    app.config["USER_CACHE_ENABLED"] = True
+    app.config["USER_CACHE_MAX_ENTRIES"] = 4096
+    app.config["USER_CACHE_TTL"] = 60
+    # Hash de senha (parâmetros do werkzeug; hashes antigos são refeitos no login) em um pool limitado
+    app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    app.config["PASSWORD_HASH_SALT_LENGTH"] = 16
+    app.config["PASSWORD_HASH_WORKERS"] = 2
+    app.config["PASSWORD_HASH_QUEUE_LIMIT"] = 32
+    app.config["PASSWORD_HASH_TIMEOUT"] = 10
+    # Exclusão de carteiras e importações enfileiradas para `flask worker` (exige um worker rodando)
+    app.config["JOBS_IN_BACKGROUND"] = os.environ.get("JOBS_IN_BACKGROUND", "0") == "1"
+    app.config["JOB_MAX_ATTEMPTS"] = 5
+    app.config["JOB_RETRY_BACKOFF"] = 5
+    app.config["JOB_RETRY_BACKOFF_MAX"] = 600
+    app.config["JOB_LOCK_TIMEOUT"] = 600
+    app.config["JOB_HEARTBEAT_INTERVAL"] = 60
+    app.config["JOB_POLL_INTERVAL"] = 1.0
+    # Segundos entre as desativações em lote de metas vencidas nesta aplicação (0 = só via `flask expire-goals`)
+    app.config["GOAL_SWEEP_INTERVAL"] = float(os.environ.get("GOAL_SWEEP_INTERVAL", "0"))
+
+    if config:
+        app.config.update(config)
 
     #inicializa o banco de controle de sessão
     db.init_app(app)
@@ -23,14 +75,31 @@ def create_app():
     login_manager.login_view = "auth_bp.login"
     login_manager.login_message = "Por favor, faça login para acessar esta página."
     login_manager.login_message_category = "warning"
+    report_cache.init_app(app)
+    query_stats.init_app(app)
+    system_categories.init_app(app)
+    user_cache.init_app(app)
+    password_hasher.init_app(app)
 
     with app.app_context():
-        db.create_all()         # cria tabelas
-        seeder.seed_system_categories()  # popula categorias do sistema
+        if db.engine.dialect.name == "sqlite":
+            configure_engine(db.engine, resolve_pragmas(app.config["SQLITE_PRAGMA_PROFILE"], app.config["SQLITE_PRAGMAS"]))
+
+        # Tabelas, migrações, índices, categorias de sistema e totais mensais, só se a
+        # versão do esquema gravada no banco estiver desatualizada (uma consulta)
+        if app.config["DB_AUTO_PROVISION"]:
+            migrations.provision_database()
+            # Categorias de sistema em memória; sem o provisionamento, carregadas no primeiro uso
+            system_categories.refresh()
+
+    if app.config["GOAL_SWEEP_INTERVAL"] > 0:
+        start_goal_sweeper(app, app.config["GOAL_SWEEP_INTERVAL"])
+
+    register_commands(app)
 
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(User, int(user_id))
+        return user_cache.load(user_id)
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
@@ -40,6 +109,7 @@ def create_app():
     app.register_blueprint(goal_bp)
     app.register_blueprint(objective_bp)
     app.register_blueprint(report_bp)
+    app.register_blueprint(job_bp)
 
     @app.route("/")
     def default():
@@ -50,6 +120,4 @@ def create_app():
 
 if __name__ == "__main__":
     app = create_app()
-    with app.app_context():
-        db.create_all()
     app.run(debug=True)
\ No newline at end of file
@@ -1,7 +1,8 @@
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_login import login_user, logout_user
+from flask_login import login_user, logout_user, current_user
 from extensions import db
 from models.user import User
+from utils.user_cache import user_cache
+from utils.passwords import password_hasher
 from utils.exceptions import UsuarioJaExisteError, UsuarioInexistenteError, SenhasDiferentes
 
 class AuthController():
@@ -12,7 +13,9 @@ class AuthController():
         """Autentica um usuário e inicia a sessão.
 
         Verifica se o usuário existe e se a senha corresponde ao hash salvo.
-        Se as credenciais forem válidas, realiza o login via Flask-Login.
+        Se as credenciais forem válidas, realiza o login via Flask-Login. Se o hash
+        salvo tiver sido gerado com parâmetros antigos (`PASSWORD_HASH_METHOD`), ele
+        é refeito com os atuais, aproveitando a senha em texto plano do login.
 
         Args:
             email (str): O endereço de email do usuário.
@@ -23,6 +26,7 @@ class AuthController():
 
         Raises:
             UsuarioInexistenteError: Se o usuário não for encontrado ou a senha estiver incorreta.
+            ServicoSobrecarregadoError: Se a fila de hashes de senha estiver cheia.
         """
         existing_user = User.query.filter_by(email= email).first()
 
@@ -30,6 +34,10 @@ class AuthController():
             raise UsuarioInexistenteError("Usuário não encontrado.")
         
         if(existing_user.check_password(password)):
+            if password_hasher.needs_rehash(existing_user._password):
+                existing_user.password = password_hasher.hash(password)
+                db.session.commit()
+
             login_user(existing_user)
             return existing_user
         
@@ -54,6 +62,7 @@ class AuthController():
         Raises:
             UsuarioJaExisteError: Se já existir um usuário com o email fornecido.
             SenhasDiferentes: Se as senhas enviadas não forem iguais.
+            ServicoSobrecarregadoError: Se a fila de hashes de senha estiver cheia.
         """
         #Verificar se user existe
         existing_user = User.query.filter_by(email= email).first()
@@ -65,7 +74,7 @@ class AuthController():
         if not password == confirm_password:
             raise SenhasDiferentes("As senhas precisam serem iguais.")
 
-        password_hash = generate_password_hash(password)
+        password_hash = password_hasher.hash(password)
 
         #criar novo usuário
         new_user = User(username= username, email= email, _password= password_hash)
@@ -79,10 +88,14 @@ class AuthController():
     def logout():
         """Encerra a sessão do usuário atual.
 
-        Desloga o usuário utilizando o Flask-Login.
+        Descarta a identidade do usuário do cache do `user_loader` e desloga
+        utilizando o Flask-Login.
 
         Returns:
             bool: Retorna True após a execução do logout.
         """
+        if current_user.is_authenticated:
+            user_cache.invalidate(current_user.id)
+
         logout_user()
         return True
\ No newline at end of file
@@ -1,6 +1,9 @@
-from extensions import db
+from extensions import db, report_cache
 from models.category import UserCategory
-from utils.exceptions import CategoriaJaExisteError, CarteiraInexistenteError
+from models.transaction import Transaction
+from models.goal import Goal
+from utils.data_version import bump_data_version
+from utils.exceptions import CategoriaJaExisteError, CarteiraInexistenteError, CategoriaEmUsoError
 
 class CategoryController():
     """Controlador responsável pelo gerenciamento de categorias personalizadas do usuário."""
@@ -92,7 +95,10 @@ class CategoryController():
             raise CategoriaJaExisteError("Já existe uma categoria com esse nome.")
         
         category.name = new_name
+        bump_data_version(user_id)
         db.session.commit()
+        # O nome aparece no relatório de gastos por categoria
+        report_cache.invalidate(user_id)
 
         return category
     
@@ -103,6 +109,18 @@ class CategoryController():
         Busca a categoria pelo ID e verifica a propriedade do usuário
         antes de excluí-la do banco de dados.
 
+        Com a verificação de chaves estrangeiras ligada em toda conexão (ver
+        `extensions.enable_sqlite_foreign_keys`, necessária para o ON DELETE CASCADE
+        da exclusão de carteiras), o DELETE de uma categoria ainda referenciada falha
+        com IntegrityError. Por isso:
+
+        - Categorias usadas por transações não podem ser excluídas
+          (`transactions.category_id` é obrigatório e não tem ação ON DELETE).
+        - Metas vinculadas passam a ficar sem categoria. O esquema declara ON DELETE
+          SET NULL em `goals.category_id`, mas bancos antigos só recebem a cláusula
+          quando `utils.migrations.migrate_money_columns` recria a tabela `goals`;
+          o UPDATE explícito cobre os dois casos.
+
         Args:
             category_id (int): O ID da categoria a ser excluída.
             user_id (int): O ID do usuário solicitante.
@@ -112,6 +130,7 @@ class CategoryController():
 
         Raises:
             CarteiraInexistenteError: Se a categoria não for encontrada ou não pertencer ao usuário.
+            CategoriaEmUsoError: Se existirem transações vinculadas à categoria.
         """
         category = UserCategory.query.filter_by(
             id= category_id,
@@ -121,6 +140,10 @@ class CategoryController():
         if not category:
             raise CarteiraInexistenteError("Categoria não encontrada.")
 
+        if Transaction.query.filter_by(category_id= category.id).first():
+            raise CategoriaEmUsoError("A categoria possui transações e não pode ser excluída.")
+
+        Goal.query.filter_by(category_id= category.id).update({"category_id": None})
         db.session.delete(category)
         db.session.commit()
         return True
@@ -0,0 +1,70 @@
+from flask import current_app
+from sqlalchemy.orm import contains_eager, joinedload
+from models.transaction import Transaction
+from controllers.wallet_controller import WalletController
+from controllers.transaction_controller import TransactionController
+from controllers.goal_controller import GoalController
+from controllers.objective_controller import ObjectiveController
+from utils.money import sum_money
+from utils.query_budget import QueryBudget
+
+DASHBOARD_LATEST_TRANSACTIONS = 5
+DASHBOARD_QUERY_BUDGET = 4
+
+
+class DashboardController():
+    """Controlador responsável por reunir os dados da página inicial (Dashboard)."""
+
+    @staticmethod
+    def get_overview(user_id, latest_limit=DASHBOARD_LATEST_TRANSACTIONS):
+        """Reúne carteiras, patrimônio, últimas transações, metas e objetivos do usuário.
+
+        Cada bloco é carregado com uma única consulta, independente da quantidade de
+        carteiras, transações, metas ou objetivos:
+
+        1. Carteiras ativas (o patrimônio é somado a partir delas, sem outro SUM no banco).
+        2. Últimas transações, com carteira e categoria no mesmo SELECT.
+        3. Progresso das metas ativas (`GoalController.get_goals_progress`).
+        4. Progresso dos objetivos ativos (`ObjectiveController.get_objectives_progress`).
+
+        O total de consultas é verificado por um `QueryBudget` com o limite da
+        configuração `DASHBOARD_QUERY_BUDGET`.
+
+        Args:
+            user_id (int): O ID do usuário.
+            latest_limit (int, optional): Quantidade de transações recentes.
+
+        Returns:
+            dict: Um dicionário contendo as chaves:
+                - "wallets" (list[Wallet]): As carteiras ativas.
+                - "total_balance" (float): A soma dos saldos das carteiras ativas.
+                - "latest_transactions" (list[Transaction]): As transações mais recentes.
+                - "goals" (list[dict]): O retorno de `GoalController.get_goals_progress`.
+                - "objectives" (list[dict]): O retorno de `ObjectiveController.get_objectives_progress`.
+
+        Raises:
+            OrcamentoDeConsultasExcedidoError: Se o orçamento de consultas for ultrapassado
+                com `QUERY_BUDGET_STRICT` ligado (ex: nos testes).
+        """
+        budget = current_app.config.get("DASHBOARD_QUERY_BUDGET", DASHBOARD_QUERY_BUDGET)
+
+        with QueryBudget("dashboard", budget):
+            wallets = WalletController.get_wallets_by_user(user_id)
+            total_balance = sum_money(wallet.current_balance for wallet in wallets)
+
+            latest_transactions = TransactionController._user_transactions_query(user_id)\
+                .options(contains_eager(Transaction.wallet), joinedload(Transaction.category))\
+                .order_by(Transaction.created_at.desc(), Transaction.id.desc())\
+                .limit(latest_limit)\
+                .all()
+
+            goals = GoalController.get_goals_progress(user_id)
+            objectives = ObjectiveController.get_objectives_progress(user_id, total_balance)
+
+        return {
+            "wallets": wallets,
+            "total_balance": total_balance,
+            "latest_transactions": latest_transactions,
+            "goals": goals,
+            "objectives": objectives
+        }
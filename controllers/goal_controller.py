@@ -1,7 +1,12 @@
+from sqlalchemy import select, update, func, and_, or_
 from extensions import db
 from models.goal import Goal
+from models.category import UserCategory
+from models.transaction import Transaction
+from models.wallet import Wallet
 from datetime import datetime, timedelta
 from utils.exceptions import ValorInvalidoError, MetaJaExisteError, MetaInexistenteError
+from utils.money import is_valid_amount
 
 class GoalController():
     """Controlador responsável pelo gerenciamento de metas financeiras (Goals)."""
@@ -34,6 +39,9 @@ class GoalController():
         except (ValueError, TypeError):
             raise ValorInvalidoError("Valor alvo inválido.")
 
+        if not is_valid_amount(target_amount):
+            raise ValorInvalidoError("O valor alvo deve ser positivo, com no máximo duas casas decimais.")
+
         try:
             duration = int(duration)
         except (ValueError, TypeError):
@@ -49,7 +57,8 @@ class GoalController():
         ).first()
 
 
-        if existing_goal and existing_goal.is_active:
+        # Uma meta vencida ainda não desativada pelo `expire_overdue_goals` conta como encerrada
+        if existing_goal and existing_goal.is_active and not (existing_goal.deadline and existing_goal.deadline <= datetime.today().date()):
             raise MetaJaExisteError("Já existe uma meta ativa com esse nome.") 
         
         if existing_goal:
@@ -81,29 +90,118 @@ class GoalController():
             user_id (int): O ID do usuário.
 
         Returns:
-            list[Goal]: Lista de objetos Goal que estão com is_active=True.
+            list[Goal]: Lista de objetos Goal que estão com is_active=True e dentro do prazo.
         """
-        goals = Goal.query.filter_by(user_id= user_id, is_active= True).all()
+        goals = Goal.query.filter(
+            Goal.user_id == user_id,
+            Goal.is_active == True,
+            GoalController._not_overdue(datetime.today().date())
+        ).all()
         return goals
 
     @staticmethod
-    def check_expired_goals(user_id):
-        """Verifica e desativa metas cujo prazo final já expirou.
+    def get_goals_progress(user_id):
+        """Calcula o progresso de todas as metas ativas de um usuário em uma única consulta.
 
-        Percorre todas as metas ativas do usuário e compara a data limite (deadline)
-        com a data atual. Se o prazo venceu, define is_active como False.
+        Cada meta soma as despesas do usuário feitas entre a sua data de criação e o
+        prazo final (inclusive). Metas com categoria consideram apenas as despesas
+        daquela categoria; metas sem categoria consideram todas as despesas. A soma é
+        feita pelo banco em um único SELECT agrupado por meta (LEFT JOIN das despesas
+        com as condições de cada meta), então nenhuma transação é carregada em memória.
+        Metas com o prazo vencido ficam de fora, mesmo antes de serem desativadas.
 
         Args:
-            user_id (int): O ID do usuário cujas metas serão verificadas.
+            user_id (int): O ID do usuário.
+
+        Returns:
+            list[dict]: Um dicionário por meta com as chaves "id", "name", "category_name",
+            "current", "target", "percentage" (limitada a 100), "real_percentage",
+            "remaining" e "status" ('safe', 'warning' ou 'danger').
+        """
+        expenses = select(Transaction.value, Transaction.category_id, Transaction.created_at)\
+            .join(Wallet, Transaction.wallet_id == Wallet.id)\
+            .where(Wallet.user_id == user_id, Transaction.transaction_type == "expense")\
+            .subquery()
+
+        rows = db.session.execute(
+            select(
+                Goal.id,
+                Goal.goal_name,
+                Goal.target_amount,
+                UserCategory.name.label("category_name"),
+                func.coalesce(func.sum(expenses.c.value), 0).label("current")
+            )
+            .outerjoin(UserCategory, Goal.category_id == UserCategory.id)
+            .outerjoin(expenses, and_(
+                expenses.c.created_at >= Goal.created_at,
+                or_(Goal.deadline.is_(None), expenses.c.created_at <= Goal.deadline),
+                or_(Goal.category_id.is_(None), expenses.c.category_id == Goal.category_id)
+            ))
+            .where(Goal.user_id == user_id, Goal.is_active == True, GoalController._not_overdue(datetime.today().date()))
+            .group_by(Goal.id, Goal.goal_name, Goal.target_amount, UserCategory.name)
+            .order_by(Goal.id)
+        ).all()
+
+        goals_data = []
+
+        for row in rows:
+            current_amount = float(row.current)
+            target = float(row.target_amount)
+
+            goals_data.append({
+                'id': row.id,
+                'name': row.goal_name,
+                'category_name': row.category_name or 'Sem Categoria',
+                'current': current_amount,
+                'target': target,
+                # Percentage limitado a 100 para a barra de progresso visual não quebrar o layout
+                'percentage': min(int((current_amount / target) * 100), 100),
+                # Real percentage mostra o valor real (pode passar de 100%)
+                'real_percentage': int((current_amount / target) * 100),
+                'remaining': target - current_amount,
+                # Lógica de cores baseada no consumo do orçamento
+                'status': 'safe' if current_amount <= target * 0.8 else
+                          'warning' if current_amount <= target else
+                          'danger'
+            })
+
+        return goals_data
+
+    @staticmethod
+    def _not_overdue(today):
+        """Condição das metas cujo prazo ainda não venceu (ou que não têm prazo).
+
+        As leituras usam essa condição junto com `is_active`, então uma meta vencida
+        some das telas mesmo antes de `expire_overdue_goals` desativá-la.
         """
-        goals = GoalController.get_goals_by_user(user_id)
-        today = datetime.today().date()
+        return or_(Goal.deadline.is_(None), Goal.deadline > today)
 
-        for goal in goals:
-            if goal.deadline <= today and goal.is_active:
-                goal.is_active = False
+    @staticmethod
+    def expire_overdue_goals(today=None):
+        """Desativa, de todos os usuários, as metas ativas cujo prazo final já venceu.
+
+        Um único UPDATE baseado em conjunto (sem carregar as metas) e um commit. Chamado
+        periodicamente pelo comando `flask expire-goals` ou pela thread de
+        `GOAL_SWEEP_INTERVAL`, e não mais a cada visualização da página de metas.
+
+        Args:
+            today (date, optional): A data de referência (padrão: hoje).
+
+        Returns:
+            int: A quantidade de metas desativadas.
+        """
+        today = today or datetime.today().date()
+
+        expired = db.session.execute(
+            update(Goal)
+            .where(Goal.is_active == True, Goal.deadline.is_not(None), Goal.deadline <= today)
+            .values(is_active= False)
+            .execution_options(synchronize_session= False)
+        ).rowcount
         db.session.commit()
 
+        return expired
+
     @staticmethod
     def delete_goal(goal_id, user_id):
         """Remove permanentemente uma meta do banco de dados.
@@ -178,6 +276,9 @@ class GoalController():
         except:
             raise ValorInvalidoError("Valor alvo inválido.")
 
+        if not is_valid_amount(new_target_amount):
+            raise ValorInvalidoError("O valor alvo deve ser positivo, com no máximo duas casas decimais.")
+
         goal.goal_name = new_name
         goal.target_amount = new_target_amount
         db.session.commit()
@@ -0,0 +1,251 @@
+import base64
+import hashlib
+import io
+from datetime import date
+from sqlalchemy import insert, select, func, case
+from extensions import db, report_cache
+from models.transaction import Transaction
+from models.wallet import Wallet
+from models.category import UserCategory
+from controllers.transaction_controller import TransactionController
+from controllers.rollup_controller import RollupController
+from controllers.job_controller import JobController
+from utils.statement_parser import iter_statement
+from utils.money import to_cents, from_cents
+from utils.data_version import bump_data_version
+from utils.system_categories import system_categories
+from utils.exceptions import CarteiraInexistenteError, CategoriaInexistenteError, ArquivoInvalidoError
+
+IMPORT_BATCH_SIZE = 500
+
+
+class ImportController():
+    """Controlador responsável pela importação em lote de extratos bancários (CSV/OFX)."""
+
+    @staticmethod
+    def import_statement(stream, filename, wallet_id, user_id, default_category_id=None, job_id=None):
+        """Importa as transações de um extrato para uma carteira em uma única transação do banco.
+
+        O arquivo é lido linha a linha (memória constante). Carteira e categorias são
+        validadas uma única vez por arquivo, as transações são inseridas em lotes de
+        `IMPORT_BATCH_SIZE` e o saldo da carteira recebe uma única atualização com a
+        variação líquida ao final. Os totais mensais são agregados em memória e
+        gravados com uma linha por (categoria, mês, tipo).
+
+        Assim como em `TransactionController.create_transaction`, uma despesa que
+        deixaria a carteira com saldo negativo é recusada; o saldo é acompanhado em
+        memória na ordem do arquivo. Linhas inválidas não interrompem a importação:
+        elas são ignoradas e aparecem no relatório de erros.
+
+        Executada por uma tarefa da fila (`job_id`), cada transação inserida guarda o ID
+        da tarefa. Se a tarefa já tiver gravado a importação (ex: o worker caiu depois
+        do commit, antes de marcar a tarefa como concluída), a nova tentativa não insere
+        nada e devolve o que já foi importado.
+
+        Args:
+            stream (BinaryIO): O arquivo enviado, aberto em modo binário.
+            filename (str): O nome do arquivo (a extensão define o formato: .csv ou .ofx).
+            wallet_id (int): O ID da carteira que receberá as transações.
+            user_id (int): O ID do usuário dono da carteira.
+            default_category_id (int, optional): Categoria usada nas linhas sem categoria
+                (sempre o caso em OFX).
+            job_id (int, optional): A tarefa 'statement.import' que está executando a importação.
+
+        Returns:
+            dict: Um dicionário contendo as chaves:
+                - "imported" (int): Quantidade de transações inseridas.
+                - "errors" (list[tuple[int, str]]): Linha e motivo de cada linha recusada.
+                - "net_change" (float): Variação aplicada ao saldo da carteira.
+
+        Raises:
+            CarteiraInexistenteError: Se a carteira não for encontrada.
+            CategoriaInexistenteError: Se a categoria padrão informada não existir.
+            ArquivoInvalidoError: Se o formato ou o cabeçalho do arquivo forem inválidos.
+            SaldoInsuficienteError: Se o saldo da carteira mudar durante a importação e não
+                cobrir mais a variação líquida (nada é importado).
+        """
+        wallet = Wallet.query.filter_by(
+            id= wallet_id,
+            user_id= user_id,
+            is_active= True).first()
+
+        if not wallet:
+            raise CarteiraInexistenteError("Carteira inexistente.")
+
+        if job_id is not None:
+            imported, net_change = db.session.execute(
+                select(
+                    func.count(Transaction.id),
+                    func.sum(case(
+                        (Transaction.transaction_type == "expense", -Transaction.value),
+                        else_= Transaction.value
+                    ))
+                ).where(Transaction.import_job_id == job_id)
+            ).one()
+
+            if imported:
+                return {"imported": imported, "errors": [], "net_change": net_change}
+
+        default_category = None
+        if default_category_id:
+            default_category = (
+                system_categories.get_by_id(default_category_id)
+                or
+                UserCategory.query.filter_by(id= default_category_id, user_id= user_id).first()
+            )
+
+            if not default_category:
+                raise CategoriaInexistenteError("Categoria padrão inexistente.")
+
+        # Uma consulta para todas as categorias do usuário, resolvidas por nome em memória
+        categories = {
+            category.name.lower(): category.id
+            for category in UserCategory.query.filter_by(user_id= user_id).all()
+        }
+
+        # Saldo e totais acompanhados em centavos inteiros, sem erro de arredondamento
+        starting_balance = to_cents(wallet.current_balance)
+        balance = starting_balance
+        imported = 0
+        errors = []
+        batch = []
+        # Totais mensais acumulados em memória: (categoria, ano, mês, tipo) -> [centavos, quantidade]
+        rollups = {}
+
+        try:
+            for line_number, row in iter_statement(stream, filename):
+                if isinstance(row, Exception):
+                    errors.append((line_number, str(row)))
+                    continue
+
+                if row["value"] <= 0:
+                    errors.append((line_number, "O valor da transação deve ser maior que zero."))
+                    continue
+
+                if row["category"]:
+                    category_id = categories.get(row["category"].lower())
+                    if category_id is None:
+                        errors.append((line_number, f"Categoria '{row['category']}' inexistente."))
+                        continue
+                elif default_category:
+                    category_id = default_category.id
+                else:
+                    errors.append((line_number, "Linha sem categoria e nenhuma categoria padrão selecionada."))
+                    continue
+
+                cents = to_cents(row["value"])
+
+                if row["transaction_type"] == "expense":
+                    if balance < cents:
+                        errors.append((line_number, "Saldo insuficiente na carteira para realizar esta despesa."))
+                        continue
+                    balance -= cents
+                else:
+                    balance += cents
+
+                rollup = rollups.setdefault(
+                    (category_id, row["date"].year, row["date"].month, row["transaction_type"]), [0, 0]
+                )
+                rollup[0] += cents
+                rollup[1] += 1
+
+                batch.append({
+                    "transaction_type": row["transaction_type"],
+                    "value": row["value"],
+                    "created_at": row["date"],
+                    "description": row["description"][:100],
+                    "wallet_id": wallet.id,
+                    "category_id": category_id,
+                    "import_job_id": job_id
+                })
+
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    db.session.execute(insert(Transaction), batch)
+                    imported += len(batch)
+                    batch = []
+
+            if batch:
+                db.session.execute(insert(Transaction), batch)
+                imported += len(batch)
+
+            net_change = from_cents(balance - starting_balance)
+
+            RollupController.apply_changes([{
+                "user_id": user_id,
+                "wallet_id": wallet.id,
+                "category_id": category_id,
+                "created_at": date(year, month, 1),
+                "transaction_type": transaction_type,
+                "total": from_cents(total),
+                "count": count
+            } for (category_id, year, month, transaction_type), (total, count) in rollups.items()])
+
+            if imported:
+                # O saldo lido no início pode ter mudado durante a importação:
+                # a verificação final é feita no próprio UPDATE
+                TransactionController.apply_balance_change(
+                    wallet.id, user_id, net_change, check_funds= net_change < 0
+                )
+
+            bump_data_version(user_id)
+            db.session.commit()
+            report_cache.invalidate(user_id, [(year, month) for _, year, month, _ in rollups])
+        except UnicodeDecodeError:
+            db.session.rollback()
+            raise ArquivoInvalidoError("O arquivo precisa estar codificado em UTF-8.")
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {
+            "imported": imported,
+            "errors": errors,
+            "net_change": net_change
+        }
+
+    @staticmethod
+    def enqueue_import(stream, filename, wallet_id, user_id, default_category_id=None):
+        """Enfileira a importação de um extrato para ser feita por um worker (ver `JobController`).
+
+        A carteira e o formato do arquivo são validados na hora; o conteúdo vai no
+        payload da tarefa 'statement.import', que chama `import_statement`. A chave da
+        tarefa é o hash do conteúdo com a carteira, então o mesmo arquivo enviado de
+        novo para a mesma carteira enquanto a importação não terminou não é importado
+        duas vezes. Depois que ela termina, um novo envio é uma nova importação, como
+        no caminho síncrono.
+
+        Args:
+            stream (BinaryIO): O arquivo enviado, aberto em modo binário.
+            filename (str): O nome do arquivo (.csv ou .ofx).
+            wallet_id (int): O ID da carteira que receberá as transações.
+            user_id (int): O ID do usuário dono da carteira.
+            default_category_id (int, optional): Categoria usada nas linhas sem categoria.
+
+        Returns:
+            Job: A tarefa enfileirada (ou a ainda não terminada para o mesmo arquivo e carteira).
+
+        Raises:
+            CarteiraInexistenteError: Se a carteira não for encontrada.
+            ArquivoInvalidoError: Se o formato do arquivo não for suportado.
+        """
+        wallet = Wallet.query.filter_by(id= wallet_id, user_id= user_id, is_active= True).first()
+
+        if not wallet:
+            raise CarteiraInexistenteError("Carteira inexistente.")
+
+        content = stream.read()
+        # Só escolhe o leitor: a extensão inválida falha aqui, o conteúdo é lido pelo worker
+        iter_statement(io.BytesIO(content), filename)
+
+        return JobController.enqueue(
+            "statement.import",
+            {
+                "content": base64.b64encode(content).decode("ascii"),
+                "filename": filename,
+                "wallet_id": wallet.id,
+                "user_id": user_id,
+                "default_category_id": default_category_id or None
+            },
+            user_id= user_id,
+            key= f"statement.import:{wallet.id}:{hashlib.sha256(content).hexdigest()}"
+        )
@@ -0,0 +1,463 @@
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import select, update, or_, and_, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db
+from models.job import Job, utcnow
+from utils.exceptions import (
+    TarefaInexistenteError, TarefaReassumidaError, ValorInvalidoError, CarteiraInexistenteError,
+    CategoriaInexistenteError, ArquivoInvalidoError, SaldoInsuficienteError
+)
+
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF = 5
+JOB_RETRY_BACKOFF_MAX = 600
+JOB_LOCK_TIMEOUT = 600
+JOB_HEARTBEAT_INTERVAL = 60
+JOB_POLL_INTERVAL = 1.0
+
+# Erros de regra de negócio: uma nova tentativa daria o mesmo resultado
+NON_RETRYABLE_ERRORS = (
+    ValorInvalidoError, CarteiraInexistenteError, CategoriaInexistenteError,
+    ArquivoInvalidoError, SaldoInsuficienteError
+)
+
+
+def _delete_wallet(payload, job_id):
+    # Importados aqui: os controladores importam o JobController para enfileirar
+    from controllers.wallet_controller import WalletController
+
+    try:
+        WalletController.delete_wallet(payload["wallet_id"], payload["user_id"])
+    except CarteiraInexistenteError:
+        # Já excluída (ex: por uma tentativa anterior que caiu depois do commit)
+        return {"deleted": False}
+
+    return {"deleted": True}
+
+
+def _import_statement(payload, job_id):
+    import base64
+    import io
+    from controllers.import_controller import ImportController
+
+    report = ImportController.import_statement(
+        stream= io.BytesIO(base64.b64decode(payload["content"])),
+        filename= payload["filename"],
+        wallet_id= payload["wallet_id"],
+        user_id= payload["user_id"],
+        default_category_id= payload.get("default_category_id"),
+        job_id= job_id
+    )
+
+    return {"imported": report["imported"], "errors": report["errors"], "net_change": report["net_change"]}
+
+
+def _reconcile_balances(payload, job_id):
+    from utils.reconciliation import reconcile_balances, RECONCILE_WORKERS, RECONCILE_BATCH_SIZE
+
+    results = reconcile_balances(
+        current_app._get_current_object(),
+        repair= payload.get("repair", False),
+        workers= payload.get("workers", RECONCILE_WORKERS),
+        batch_size= payload.get("batch_size", RECONCILE_BATCH_SIZE)
+    )
+    return {"batches": results["batches"], "drift": len(results["drift"]), "repaired": results["repaired"]}
+
+
+def _rebuild_rollups(payload, job_id):
+    from controllers.rollup_controller import RollupController
+
+    return {"rows": RollupController.rebuild()}
+
+
+def _monthly_report(payload, job_id):
+    from controllers.report_controller import ReportController
+
+    return ReportController.get_monthly_report(payload["user_id"], payload["month"], payload["year"])
+
+
+# Tipo da tarefa -> função que recebe o payload e o ID da tarefa e devolve um resultado serializável em JSON
+JOB_HANDLERS = {
+    "wallet.delete": _delete_wallet,
+    "statement.import": _import_statement,
+    "balances.reconcile": _reconcile_balances,
+    "rollups.rebuild": _rebuild_rollups,
+    "report.monthly": _monthly_report,
+}
+
+
+class JobController():
+    """Controlador responsável pela fila de tarefas em segundo plano (`Job`).
+
+    A requisição só grava a tarefa (`enqueue`) e responde; um ou mais workers
+    (`flask worker`) pegam as tarefas disponíveis (`claim_next`) e as executam
+    (`run_job`). Configurações:
+
+    - `JOB_MAX_ATTEMPTS`: tentativas antes de a tarefa ficar como 'failed'.
+    - `JOB_RETRY_BACKOFF` e `JOB_RETRY_BACKOFF_MAX`: espera, em segundos, antes da
+      nova tentativa (dobra a cada falha, até o máximo).
+    - `JOB_LOCK_TIMEOUT`: segundos sem renovação após os quais uma tarefa 'running'
+      é considerada abandonada (worker encerrado no meio) e volta a ficar disponível,
+      se ainda tiver tentativas; sem tentativas, fica como 'failed' (`fail_abandoned`).
+    - `JOB_HEARTBEAT_INTERVAL`: a cada quantos segundos o worker renova a reserva
+      (`locked_at`) da tarefa em execução; deve ser bem menor que `JOB_LOCK_TIMEOUT`.
+    - `JOB_POLL_INTERVAL`: segundos de espera do worker quando a fila está vazia.
+
+    O worker roda em outro processo, mas as escritas dos handlers mudam a versão dos
+    dados do usuário, que faz parte das chaves do `report_cache`: a aplicação web não
+    serve relatórios anteriores a elas, qualquer que seja o backend do cache.
+    """
+
+    @staticmethod
+    def enqueue(kind, payload, user_id=None, key=None, max_attempts=None):
+        """Grava uma tarefa na fila e faz commit.
+
+        Se `key` for informada e já existir uma tarefa ainda não terminada ('pending'
+        ou 'running') com essa chave, nada é gravado e a tarefa existente é devolvida:
+        um duplo clique ou uma requisição repetida não executa a operação duas vezes.
+        Uma tarefa já terminada ('succeeded' ou 'failed') libera a chave, então o mesmo
+        pedido pode ser refeito depois (ex: reimportar um arquivo após corrigir a
+        categoria que faltava ou após uma falha).
+
+        Args:
+            kind (str): O tipo da tarefa (uma chave de `JOB_HANDLERS`).
+            payload (dict): Os argumentos do handler (serializáveis em JSON).
+            user_id (int, optional): O usuário dono da tarefa.
+            key (str, optional): A chave de idempotência.
+            max_attempts (int, optional): Limite de tentativas (padrão: `JOB_MAX_ATTEMPTS`).
+
+        Returns:
+            Job: A tarefa criada ou a ainda não terminada com a mesma chave.
+
+        Raises:
+            ValorInvalidoError: Se o tipo da tarefa não existir.
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValorInvalidoError(f"Tipo de tarefa inválido: '{kind}'.")
+
+        now = utcnow()
+        values = {
+            "kind": kind,
+            "key": key,
+            "user_id": user_id,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": max_attempts or current_app.config.get("JOB_MAX_ATTEMPTS", JOB_MAX_ATTEMPTS),
+            "run_at": now,
+            "created_at": now
+        }
+
+        if key is None:
+            job_id = db.session.execute(sqlite_insert(Job).values(**values).returning(Job.id)).scalar()
+        else:
+            # A chave só protege tarefas em andamento: as terminadas a liberam
+            db.session.execute(
+                update(Job)
+                .where(Job.key == key, Job.status.in_(("succeeded", "failed")))
+                .values(key= None)
+                .execution_options(synchronize_session= False)
+            )
+            # Um único INSERT decide a corrida entre duas requisições com a mesma chave
+            db.session.execute(sqlite_insert(Job).values(**values).on_conflict_do_nothing(index_elements= [Job.key]))
+            job_id = db.session.execute(select(Job.id).where(Job.key == key)).scalar()
+
+        db.session.commit()
+
+        return db.session.get(Job, job_id)
+
+    @staticmethod
+    def get_job(job_id, user_id):
+        """Busca uma tarefa do usuário.
+
+        Args:
+            job_id (int): O ID da tarefa.
+            user_id (int): O ID do usuário solicitante.
+
+        Returns:
+            Job: A tarefa encontrada.
+
+        Raises:
+            TarefaInexistenteError: Se a tarefa não existir ou não pertencer ao usuário.
+        """
+        job = Job.query.filter_by(id= job_id, user_id= user_id).first()
+
+        if not job:
+            raise TarefaInexistenteError("Tarefa não encontrada.")
+
+        return job
+
+    @staticmethod
+    def get_user_jobs(user_id, limit=20):
+        """Recupera as tarefas mais recentes de um usuário.
+
+        Args:
+            user_id (int): O ID do usuário.
+            limit (int, optional): Quantidade máxima de tarefas.
+
+        Returns:
+            list[Job]: As tarefas, das mais recentes para as mais antigas.
+        """
+        return Job.query.filter_by(user_id= user_id).order_by(Job.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def claim_next(worker_id):
+        """Reserva a próxima tarefa disponível para um worker, com um único UPDATE.
+
+        Disponível é uma tarefa 'pending' cujo `run_at` já passou, ou uma 'running'
+        abandonada há mais de `JOB_LOCK_TIMEOUT` segundos que ainda tenha tentativas.
+        As abandonadas sem tentativas são encerradas antes (`fail_abandoned`): uma tarefa
+        que derruba o worker (falta de memória, kill) não roda mais que `max_attempts` vezes.
+        O UPDATE só altera a linha se ela ainda estiver disponível, então dois workers
+        nunca pegam a mesma tarefa.
+
+        Args:
+            worker_id (str): A identificação do worker (gravada em `locked_by`).
+
+        Returns:
+            Job|None: A tarefa reservada (já como 'running' e com a tentativa contada),
+            ou None se a fila estiver vazia.
+        """
+        now = utcnow()
+        abandoned = now - timedelta(seconds= current_app.config.get("JOB_LOCK_TIMEOUT", JOB_LOCK_TIMEOUT))
+        JobController.fail_abandoned(abandoned, commit= False)
+
+        available = or_(
+            and_(Job.status == "pending", Job.run_at <= now),
+            and_(Job.status == "running", Job.locked_at < abandoned, Job.attempts < Job.max_attempts)
+        )
+
+        next_job = select(Job.id).where(available).order_by(Job.run_at, Job.id).limit(1).scalar_subquery()
+
+        job_id = db.session.execute(
+            update(Job)
+            .where(Job.id == next_job, available)
+            .values(status= "running", locked_by= worker_id, locked_at= now, attempts= Job.attempts + 1)
+            .returning(Job.id)
+            .execution_options(synchronize_session= False)
+        ).scalar()
+        db.session.commit()
+
+        if job_id is None:
+            return None
+
+        return db.session.get(Job, job_id)
+
+    @staticmethod
+    def fail_abandoned(abandoned_before, commit=True):
+        """Encerra como 'failed' as tarefas abandonadas que já gastaram todas as tentativas.
+
+        Uma tarefa 'running' sem renovação desde `abandoned_before` perdeu o worker no
+        meio da execução; a tentativa já foi contada ao reservá-la.
+
+        Args:
+            abandoned_before (datetime): Limite de `locked_at` (UTC) para considerar a tarefa abandonada.
+            commit (bool, optional): Se False, deixa o commit para quem chamou.
+
+        Returns:
+            int: Quantas tarefas foram encerradas.
+        """
+        failed = db.session.execute(
+            update(Job)
+            .where(
+                Job.status == "running",
+                Job.locked_at < abandoned_before,
+                Job.attempts >= Job.max_attempts
+            )
+            .values(
+                status= "failed",
+                last_error= "Worker perdido durante a execução (tentativas esgotadas).",
+                locked_by= None, locked_at= None, finished_at= utcnow()
+            )
+            .execution_options(synchronize_session= False)
+        ).rowcount
+
+        if commit:
+            db.session.commit()
+
+        if failed:
+            current_app.logger.warning("%s tarefa(s) abandonada(s) sem tentativas restantes marcada(s) como 'failed'.", failed)
+
+        return failed
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Espera, em segundos, antes da próxima tentativa (backoff exponencial).
+
+        Args:
+            attempts (int): Quantas tentativas já falharam.
+
+        Returns:
+            float: `JOB_RETRY_BACKOFF` * 2^(tentativas - 1), limitado a `JOB_RETRY_BACKOFF_MAX`.
+        """
+        base = current_app.config.get("JOB_RETRY_BACKOFF", JOB_RETRY_BACKOFF)
+        limit = current_app.config.get("JOB_RETRY_BACKOFF_MAX", JOB_RETRY_BACKOFF_MAX)
+
+        return min(limit, base * 2 ** max(0, attempts - 1))
+
+    @staticmethod
+    def _owned(job_id, worker_id):
+        """Condição das escritas do worker na tarefa: ela continua reservada para ele."""
+        return and_(Job.id == job_id, Job.status == "running", Job.locked_by == worker_id)
+
+    @staticmethod
+    def _heartbeat(engine, job_id, worker_id, interval, stop):
+        """Renova `locked_at` da tarefa a cada `interval` segundos, até `stop` ser sinalizado.
+
+        Roda em uma thread com conexão própria, pois a sessão da tarefa pode estar no
+        meio de uma transação. Se o banco estiver ocupado por essa transação, a
+        renovação fica para a próxima volta: enquanto isso, nenhum outro worker
+        consegue gravar a reserva da tarefa.
+        """
+        owned = JobController._owned(job_id, worker_id)
+
+        while not stop.wait(interval):
+            try:
+                with engine.begin() as connection:
+                    renewed = connection.execute(update(Job).where(owned).values(locked_at= utcnow())).rowcount
+            except OperationalError:
+                continue
+
+            if not renewed:
+                return
+
+    @staticmethod
+    def run_job(job):
+        """Executa uma tarefa reservada e grava o resultado.
+
+        Enquanto o handler roda, uma thread renova a reserva (`JOB_HEARTBEAT_INTERVAL`),
+        e cada commit do handler só é aceito se a tarefa ainda estiver reservada para
+        este worker (senão, `TarefaReassumidaError` desfaz o que ele gravou). As
+        gravações do estado final também são condicionadas à reserva, então um worker
+        que perdeu a tarefa para outro não sobrescreve o resultado dele.
+
+        Em caso de sucesso a tarefa fica 'succeeded' com o retorno do handler. Em caso
+        de erro, a sessão sofre rollback (nada do que o handler gravou sem commit
+        permanece) e a tarefa volta para 'pending' com `run_at` adiado por
+        `retry_delay`, ou fica 'failed' se as tentativas acabaram ou se o erro for de
+        regra de negócio (`NON_RETRYABLE_ERRORS`, ex: arquivo inválido).
+
+        Args:
+            job (Job): A tarefa devolvida por `claim_next`.
+
+        Returns:
+            bool: True se a tarefa terminou com sucesso.
+        """
+        job_id, kind, payload = job.id, job.kind, job.payload
+        attempts, max_attempts, worker_id = job.attempts, job.max_attempts, job.locked_by
+        owned = JobController._owned(job_id, worker_id)
+        handler = JOB_HANDLERS.get(kind)
+
+        def fence(session):
+            renewed = session.execute(
+                update(Job).where(owned).values(locked_at= utcnow()).execution_options(synchronize_session= False)
+            ).rowcount
+
+            if not renewed:
+                raise TarefaReassumidaError(f"A tarefa {job_id} foi reassumida por outro worker.")
+
+        session = db.session()
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target= JobController._heartbeat,
+            args= (
+                db.engine, job_id, worker_id,
+                current_app.config.get("JOB_HEARTBEAT_INTERVAL", JOB_HEARTBEAT_INTERVAL), stop
+            ),
+            name= f"job-heartbeat-{job_id}",
+            daemon= True
+        )
+        event.listen(session, "before_commit", fence)
+        heartbeat.start()
+
+        try:
+            if handler is None:
+                raise ValorInvalidoError(f"Tipo de tarefa inválido: '{kind}'.")
+
+            result = handler(payload, job_id)
+        except Exception as e:
+            error = e
+        else:
+            error = None
+        finally:
+            event.remove(session, "before_commit", fence)
+            stop.set()
+            heartbeat.join()
+
+        if isinstance(error, TarefaReassumidaError):
+            db.session.rollback()
+            current_app.logger.warning("Tarefa %s (%s) reassumida por outro worker; nada foi gravado.", job_id, kind)
+            return False
+
+        if error is not None:
+            db.session.rollback()
+            values = {"last_error": f"{type(error).__name__}: {error}", "locked_by": None, "locked_at": None}
+
+            if attempts >= max_attempts or isinstance(error, NON_RETRYABLE_ERRORS):
+                values.update(status= "failed", finished_at= utcnow())
+            else:
+                values.update(
+                    status= "pending",
+                    run_at= utcnow() + timedelta(seconds= JobController.retry_delay(attempts))
+                )
+
+            db.session.execute(update(Job).where(owned).values(**values).execution_options(synchronize_session= False))
+            db.session.commit()
+            current_app.logger.warning(
+                "Tarefa %s (%s) falhou na tentativa %s: %s", job_id, kind, attempts, error, exc_info= error
+            )
+            return False
+
+        finished = db.session.execute(
+            update(Job).where(owned).values(
+                status= "succeeded", result= result, last_error= None,
+                locked_by= None, locked_at= None, finished_at= utcnow()
+            ).execution_options(synchronize_session= False)
+        ).rowcount
+        db.session.commit()
+
+        if not finished:
+            current_app.logger.warning("Tarefa %s (%s) reassumida por outro worker; resultado descartado.", job_id, kind)
+            return False
+
+        return True
+
+    @staticmethod
+    def work(worker_id=None, once=False, max_jobs=None):
+        """Laço do worker: reserva e executa tarefas até ser interrompido.
+
+        Deve rodar dentro de um contexto de aplicação.
+
+        Args:
+            worker_id (str, optional): A identificação do worker (padrão: 'host:pid').
+            once (bool, optional): Se True, para assim que a fila ficar vazia.
+            max_jobs (int, optional): Para depois de executar essa quantidade de tarefas.
+
+        Returns:
+            dict: "succeeded" e "failed", as tarefas executadas por este worker.
+        """
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        interval = current_app.config.get("JOB_POLL_INTERVAL", JOB_POLL_INTERVAL)
+        counts = {"succeeded": 0, "failed": 0}
+
+        while max_jobs is None or sum(counts.values()) < max_jobs:
+            job = JobController.claim_next(worker_id)
+
+            if job is None:
+                if once:
+                    break
+
+                time.sleep(interval)
+                continue
+
+            counts["succeeded" if JobController.run_job(job) else "failed"] += 1
+            # Cada tarefa começa com a sessão limpa (sem objetos carregados pela anterior)
+            db.session.remove()
+
+        return counts
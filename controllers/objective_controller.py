@@ -1,6 +1,8 @@
+from sqlalchemy.orm import joinedload
 from extensions import db
 from models.objective import Objective
 from utils.exceptions import ValorInvalidoError, ObjetivoInexistenteError
+from utils.money import is_valid_amount
 from datetime import datetime
 
 class ObjectiveController():
@@ -32,8 +34,8 @@ class ObjectiveController():
         except (ValueError, TypeError):
             raise ValorInvalidoError("Valor inválido para o objetivo.")
         
-        if target_amount <= 0:
-            raise ValorInvalidoError("O valor do objetivo deve ser positivo.")
+        if not is_valid_amount(target_amount):
+            raise ValorInvalidoError("O valor do objetivo deve ser positivo, com no máximo duas casas decimais.")
 
         try:
             due_date = None if not due_date_str else datetime.strptime(due_date_str, "%Y-%m-%d")
@@ -66,6 +68,56 @@ class ObjectiveController():
         """
         return Objective.query.filter_by(user_id=user_id, is_active=True).all()
 
+    @staticmethod
+    def get_objectives_progress(user_id, total_balance):
+        """Calcula o progresso de todos os objetivos ativos de um usuário em uma única consulta.
+
+        A carteira vinculada de cada objetivo vem no mesmo SELECT (JOIN), então o
+        progresso não dispara uma consulta por objetivo.
+
+        Lógica de Cálculo:
+        - Se o objetivo está vinculado a uma carteira específica: Usa o saldo dessa carteira.
+        - Se não está vinculado (objetivo geral): Usa `total_balance`.
+
+        Args:
+            user_id (int): O ID do usuário.
+            total_balance (float): A soma dos saldos das carteiras ativas do usuário
+                (normalmente já calculada a partir das carteiras carregadas pela tela).
+
+        Returns:
+            list[dict]: Um dicionário por objetivo com as chaves "id", "objective_name",
+            "objective_icon", "target_amount", "current_amount", "due_date", "wallet_id"
+            e "percentage".
+        """
+        objectives = Objective.query.options(joinedload(Objective.wallet))\
+            .filter_by(user_id=user_id, is_active=True)\
+            .all()
+
+        objectives_data = []
+        for objective in objectives:
+            if objective.wallet:
+                current_balance = objective.wallet.current_balance
+            else:
+                current_balance = total_balance
+
+            if objective.target_amount > 0:
+                percentage = round((current_balance / objective.target_amount) * 100, 2)
+            else:
+                percentage = 0.0
+
+            objectives_data.append({
+                'id': objective.id,
+                'objective_name': objective.objective_name,
+                'objective_icon': objective.icon,
+                'target_amount': objective.target_amount,
+                'current_amount': current_balance,
+                'due_date': objective.due_date,
+                'wallet_id': objective.wallet_id,
+                'percentage': percentage
+            })
+
+        return objectives_data
+
     @staticmethod
     def delete_objective(objective_id, user_id):
         """Remove permanentemente um objetivo do sistema.
@@ -124,8 +176,8 @@ class ObjectiveController():
         except (ValueError, TypeError):
             raise ValorInvalidoError("Valor inválido para o objetivo.")
         
-        if new_target_amount <= 0:
-            raise ValorInvalidoError("O valor do objetivo deve ser positivo.")
+        if not is_valid_amount(new_target_amount):
+            raise ValorInvalidoError("O valor do objetivo deve ser positivo, com no máximo duas casas decimais.")
 
         objective.objective_name = new_name
         objective.target_amount = new_target_amount
@@ -1,83 +1,319 @@
-from sqlalchemy import func, extract
-from extensions import db
-from models.transaction import Transaction
+from sqlalchemy import func, select, case, literal, null, union_all
+from extensions import db, report_cache
+from models.monthly_rollup import MonthlyRollup
 from models.category import Category
 from models.wallet import Wallet
+from utils.period import month_range, parse_month, month_sequence
+from utils.data_version import get_data_version
 
 class ReportController:
-    """Controlador responsável pela geração de relatórios e agregação de dados financeiros."""
+    """Controlador responsável pela geração de relatórios e agregação de dados financeiros.
+
+    Os resultados passam pelo `report_cache`, com chaves por usuário, período e versão
+    dos dados do usuário: uma escrita confirmada por qualquer processo muda a versão e
+    o próximo relatório é recalculado. Os métodos com cache aceitam `version`, a versão
+    já lida pelo chamador (ex: para o ETag); sem ela, a versão é lida do banco.
+    """
+
+    @staticmethod
+    def _version(user_id, version):
+        """Versão dos dados usada nas chaves do cache (lida do banco se não informada)."""
+        return get_data_version(user_id) if version is None else version
     
     @staticmethod
-    def get_expenses_by_category(user_id, month, year):
+    def get_expenses_by_category(user_id, month, year, version=None):
         """Retorna os gastos agrupados por categoria para um mês e ano específicos.
 
-        Realiza uma consulta agregada no banco de dados que soma o valor das transações 
-        do tipo 'despesa', agrupando-as pelo nome da categoria. Garante que apenas 
-        transações de carteiras pertencentes ao usuário sejam consideradas.
+        Lê a tabela de totais mensais (`MonthlyRollup`), somando as linhas de 'despesa'
+        do usuário no mês e agrupando-as pelo nome da categoria. O custo depende da
+        quantidade de categorias usadas no mês, e não do número de transações.
 
         Args:
             user_id (int): O ID do usuário para filtrar os dados.
             month (int): O mês numérico (1-12) para o filtro.
             year (int): O ano (ex: 2026) para o filtro.
+            version (int, optional): A versão dos dados do usuário (chave do cache).
 
         Returns:
             list[tuple]: Uma lista de tuplas onde cada tupla contém (Nome da Categoria, Valor Total).
                          Exemplo: [('Alimentação', 500.00), ('Transporte', 150.00)].
                          Retorna uma lista vazia [] se não houver dados.
+
+        Raises:
+            ValorInvalidoError: Se o mês ou o ano forem inválidos.
         """
 
-        results = db.session.query(Category.name, func.sum(Transaction.value))\
-            .join(Category, Transaction.category_id == Category.id)\
-            .join(Wallet, Transaction.wallet_id == Wallet.id)\
-            .filter(Wallet.user_id == user_id)\
-            .filter(Transaction.transaction_type == 'expense')\
-            .filter(extract('month', Transaction.created_at) == month)\
-            .filter(extract('year', Transaction.created_at) == year)\
-            .group_by(Category.name)\
-            .all()
-            
-        return results if results else []
+        start, _ = month_range(month, year)
+
+        version = ReportController._version(user_id, version)
+
+        rows = report_cache.get_or_set(
+            report_cache.period_key(user_id, start.year, start.month, "categories", version),
+            lambda: [list(row) for row in ReportController._expenses_by_category_query(user_id, month, year).all()]
+        )
+
+        # O backend compartilhado guarda JSON (listas): devolve sempre tuplas
+        return [tuple(row) for row in rows]
 
     @staticmethod
-    def get_monthly_summary(user_id, month, year):
+    def _expenses_by_category_query(user_id, month, year):
+        """Monta a consulta agregada de `get_expenses_by_category` sem executá-la."""
+        start, _ = month_range(month, year)
+
+        return db.session.query(Category.name, func.sum(MonthlyRollup.total))\
+            .join(Category, MonthlyRollup.category_id == Category.id)\
+            .filter(MonthlyRollup.user_id == user_id)\
+            .filter(MonthlyRollup.year == start.year, MonthlyRollup.month == start.month)\
+            .filter(MonthlyRollup.transaction_type == 'expense')\
+            .group_by(Category.name)
+
+    @staticmethod
+    def get_monthly_summary(user_id, month, year, version=None):
         """"Gera um resumo consolidado de Receitas, Despesas e Saldo do mês (RF9.2).
 
-        Busca todas as transações do período especificado e calcula os totais em memória.
-        O saldo mensal é calculado aritmeticamente (Total Receitas - Total Despesas),
-        representando o fluxo de caixa do mês, independente do saldo acumulado nas carteiras.
+        Uma única linha, calculada por agregação condicional (`SUM(CASE ...)`) sobre a
+        tabela de totais mensais do usuário no período, traz receitas, despesas e a
+        quantidade de transações. O saldo mensal é calculado aritmeticamente
+        (Total Receitas - Total Despesas), representando o fluxo de caixa do mês,
+        independente do saldo acumulado nas carteiras.
 
         Args:
             user_id (int): O ID do usuário dono das transações.
             month (int): O mês de referência.
             year (int): O ano de referência.
+            version (int, optional): A versão dos dados do usuário (chave do cache).
 
         Returns:
             dict: Um dicionário contendo as chaves:
                 - "income" (float): Total de entradas no mês.
                 - "expense" (float): Total de saídas no mês.
                 - "balance" (float): Saldo resultante do período (Receita - Despesa).
+                - "count" (int): Quantidade de transações no mês.
+
+        Raises:
+            ValorInvalidoError: Se o mês ou o ano forem inválidos.
         """
-        transactions = Transaction.query\
-            .join(Wallet, Transaction.wallet_id == Wallet.id)\
-            .filter(Wallet.user_id == user_id)\
-            .filter(extract('month', Transaction.created_at) == month)\
-            .filter(extract('year', Transaction.created_at) == year)\
-            .all()
-
-        total_income = sum(t.value for t in transactions if t.transaction_type == 'income')
-        total_expense = sum(t.value for t in transactions if t.transaction_type == 'expense')
-        
+        start, _ = month_range(month, year)
+
+        version = ReportController._version(user_id, version)
+
+        return report_cache.get_or_set(
+            report_cache.period_key(user_id, start.year, start.month, "summary", version),
+            lambda: ReportController._compute_monthly_summary(user_id, month, year)
+        )
+
+    @staticmethod
+    def _compute_monthly_summary(user_id, month, year):
+        """Calcula no banco o resumo de `get_monthly_summary`, sem passar pelo cache."""
+        income, expense, count = db.session.execute(
+            ReportController._monthly_summary_query(user_id, month, year)
+        ).one()
+
+        return ReportController._summary(income, expense, count)
+
+    @staticmethod
+    def _summary(income, expense, count):
+        """Monta o dicionário de `get_monthly_summary` a partir dos totais do mês."""
+        total_income = income or 0.0
+        total_expense = expense or 0.0
+
         # O saldo aqui é puramente matemático do mês (Receita - Despesa)
         monthly_balance = total_income - total_expense
 
         return {
             "income": total_income,
             "expense": total_expense,
-            "balance": monthly_balance
+            "balance": monthly_balance,
+            "count": count or 0
         }
 
     @staticmethod
-    def get_consolidated_wallet_balance(user_id):
+    def _monthly_summary_query(user_id, month, year):
+        """Monta a consulta de `get_monthly_summary` sem executá-la.
+
+        Sempre devolve exatamente uma linha (income, expense, count), mesmo sem dados no mês.
+        """
+        start, _ = month_range(month, year)
+
+        def total_of(transaction_type):
+            return func.sum(case((MonthlyRollup.transaction_type == transaction_type, MonthlyRollup.total), else_= 0))
+
+        return select(
+                total_of('income').label("income"),
+                total_of('expense').label("expense"),
+                func.sum(MonthlyRollup.count).label("count")
+            )\
+            .where(MonthlyRollup.user_id == user_id)\
+            .where(MonthlyRollup.year == start.year, MonthlyRollup.month == start.month)
+
+    @staticmethod
+    def get_monthly_report(user_id, month, year, version=None):
+        """Reúne o resumo do mês, as despesas por categoria e o patrimônio em uma única ida ao banco.
+
+        Equivale a chamar `get_monthly_summary`, `get_expenses_by_category` e
+        `get_consolidated_wallet_balance`, mas as três consultas são enviadas juntas
+        (`UNION ALL`). Usa as mesmas entradas do `report_cache` dos métodos
+        individuais: se todas estiverem em cache, o banco nem é consultado; se faltar
+        alguma, a consulta combinada regrava as três.
+
+        Args:
+            user_id (int): O ID do usuário.
+            month (int): O mês de referência.
+            year (int): O ano de referência.
+            version (int, optional): A versão dos dados do usuário (chave do cache).
+
+        Returns:
+            dict: Um dicionário contendo as chaves:
+                - "summary" (dict): O mesmo retorno de `get_monthly_summary`.
+                - "categories" (list[tuple]): O mesmo retorno de `get_expenses_by_category`.
+                - "balance" (float): O mesmo retorno de `get_consolidated_wallet_balance`.
+
+        Raises:
+            ValorInvalidoError: Se o mês ou o ano forem inválidos.
+        """
+        start, _ = month_range(month, year)
+
+        version = ReportController._version(user_id, version)
+
+        keys = {
+            "summary": report_cache.period_key(user_id, start.year, start.month, "summary", version),
+            "categories": report_cache.period_key(user_id, start.year, start.month, "categories", version),
+            "balance": report_cache.user_key(user_id, "balance", version)
+        }
+
+        def load():
+            report = {"summary": None, "categories": [], "balance": 0.0}
+
+            for kind, name, income, expense, count in db.session.execute(
+                ReportController._monthly_report_query(user_id, month, year)
+            ):
+                if kind == "summary":
+                    report["summary"] = ReportController._summary(income, expense, count)
+                elif kind == "category":
+                    report["categories"].append([name, expense])
+                else:
+                    report["balance"] = income if income else 0.0
+
+            return {keys[part]: value for part, value in report.items()}
+
+        values = report_cache.get_or_set_many(keys.values(), load)
+
+        return {
+            "summary": values[keys["summary"]],
+            # O backend compartilhado guarda JSON (listas): devolve sempre tuplas
+            "categories": [tuple(row) for row in values[keys["categories"]]],
+            "balance": values[keys["balance"]]
+        }
+
+    @staticmethod
+    def _monthly_report_query(user_id, month, year):
+        """Monta a consulta combinada de `get_monthly_report` sem executá-la.
+
+        Cada linha tem as colunas (kind, name, income, expense, count), onde kind é:
+        - "summary": uma linha com o resumo do mês (`_monthly_summary_query`).
+        - "category": uma linha por categoria, com o total gasto em expense.
+        - "balance": uma linha com o patrimônio em income.
+        """
+        start, _ = month_range(month, year)
+        summary = ReportController._monthly_summary_query(user_id, month, year)
+
+        return union_all(
+            summary.with_only_columns(literal("summary").label("kind"), null().label("name"), *summary.selected_columns),
+            select(literal("category"), Category.name, literal(0), func.sum(MonthlyRollup.total), func.sum(MonthlyRollup.count))
+                .join(Category, MonthlyRollup.category_id == Category.id)
+                .where(MonthlyRollup.user_id == user_id)
+                .where(MonthlyRollup.year == start.year, MonthlyRollup.month == start.month)
+                .where(MonthlyRollup.transaction_type == 'expense')
+                .group_by(Category.name),
+            select(literal("balance"), null(), func.sum(Wallet.current_balance), literal(0), func.count(Wallet.id))
+                .where(Wallet.user_id == user_id, Wallet.is_active == True)
+        )
+
+    @staticmethod
+    def get_category_month_range(user_id, start, end):
+        """Monta a matriz categoria × mês de receitas e despesas de um intervalo de meses.
+
+        Todos os meses do intervalo vêm de uma única consulta agrupada sobre a tabela de
+        totais mensais (`MonthlyRollup`), em vez de uma chamada de `get_monthly_summary`
+        e `get_expenses_by_category` por mês. As linhas retornadas são tuplas simples,
+        distribuídas direto nas listas da resposta.
+
+        Args:
+            user_id (int): O ID do usuário.
+            start (str): O primeiro mês, no formato 'AAAA-MM'.
+            end (str): O último mês (inclusive), no formato 'AAAA-MM'.
+
+        Returns:
+            dict: Um dicionário contendo as chaves:
+                - "months" (list[str]): Os meses do intervalo ('AAAA-MM'), na ordem das colunas.
+                - "categories" (list[str]): As categorias com movimento, na ordem das linhas.
+                - "income" / "expense" (dict): "matrix" (uma lista por categoria, um valor por
+                  mês), "totals" (total de cada mês) e "deltas" (variação em relação ao mês
+                  anterior; None no primeiro mês).
+                - "balance" (dict): "totals" (receitas - despesas de cada mês) e "deltas".
+
+        Raises:
+            ValorInvalidoError: Se algum mês for inválido, `start` for posterior a `end` ou o
+                intervalo passar de `MAX_RANGE_MONTHS` meses.
+        """
+        first, last = parse_month(start), parse_month(end)
+        months = month_sequence(first, last)
+        column = {period: index for index, period in enumerate(months)}
+
+        rows = db.session.execute(ReportController._category_month_range_query(user_id, first, last)).all()
+
+        categories = sorted({row[0] for row in rows})
+        line = {name: index for index, name in enumerate(categories)}
+        matrix = {
+            kind: [[0.0] * len(months) for _ in categories]
+            for kind in ("income", "expense")
+        }
+
+        for name, year, month, transaction_type, total in rows:
+            matrix[transaction_type][line[name]][column[(year, month)]] = total
+
+        def deltas(totals):
+            return [None] + [round(current - previous, 2) for previous, current in zip(totals, totals[1:])]
+
+        report = {
+            "months": [f"{year:04d}-{month:02d}" for year, month in months],
+            "categories": categories
+        }
+
+        for kind in ("income", "expense"):
+            totals = [round(sum(values), 2) for values in zip(*matrix[kind])] or [0.0] * len(months)
+            report[kind] = {"matrix": matrix[kind], "totals": totals, "deltas": deltas(totals)}
+
+        balance = [round(income - expense, 2) for income, expense in zip(report["income"]["totals"], report["expense"]["totals"])]
+        report["balance"] = {"totals": balance, "deltas": deltas(balance)}
+
+        return report
+
+    @staticmethod
+    def _category_month_range_query(user_id, first, last):
+        """Monta a consulta agrupada de `get_category_month_range` sem executá-la.
+
+        Args:
+            first (tuple[int, int]): O primeiro mês (ano, mês).
+            last (tuple[int, int]): O último mês (ano, mês).
+        """
+        period = MonthlyRollup.year * 12 + MonthlyRollup.month
+
+        return select(
+                Category.name,
+                MonthlyRollup.year,
+                MonthlyRollup.month,
+                MonthlyRollup.transaction_type,
+                func.sum(MonthlyRollup.total)
+            )\
+            .join(Category, MonthlyRollup.category_id == Category.id)\
+            .where(MonthlyRollup.user_id == user_id)\
+            .where(MonthlyRollup.year.between(first[0], last[0]))\
+            .where(period.between(first[0] * 12 + first[1], last[0] * 12 + last[1]))\
+            .group_by(Category.name, MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.transaction_type)
+
+    @staticmethod
+    def get_consolidated_wallet_balance(user_id, version=None):
         """Calcula o patrimônio total somando o saldo atual de todas as carteiras (RF9.3).
 
         Esta função oferece um "snapshot" da riqueza atual do usuário. Considera apenas 
@@ -85,13 +321,24 @@ class ReportController:
 
         Args:
             user_id (int): O ID do usuário.
+            version (int, optional): A versão dos dados do usuário (chave do cache).
 
         Returns:
             float: A soma total dos saldos das carteiras. 
                    Retorna 0.0 se o usuário não tiver carteiras ou saldo.
         """
-        result = db.session.query(func.sum(Wallet.current_balance))\
-            .filter(Wallet.user_id == user_id, Wallet.is_active == True)\
-            .scalar() # scalar() retorna um único valor
-            
-        return result if result else 0.0
\ No newline at end of file
+        def load():
+            result = ReportController._consolidated_balance_query(user_id)\
+                .scalar() # scalar() retorna um único valor
+
+            return result if result else 0.0
+
+        version = ReportController._version(user_id, version)
+
+        return report_cache.get_or_set(report_cache.user_key(user_id, "balance", version), load)
+
+    @staticmethod
+    def _consolidated_balance_query(user_id):
+        """Monta a consulta de `get_consolidated_wallet_balance` sem executá-la."""
+        return db.session.query(func.sum(Wallet.current_balance))\
+            .filter(Wallet.user_id == user_id, Wallet.is_active == True)
@@ -0,0 +1,180 @@
+from sqlalchemy import func, Integer, cast, select, insert, delete, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db, report_cache
+from models.monthly_rollup import MonthlyRollup
+from models.transaction import Transaction
+from models.wallet import Wallet
+from utils.data_version import bump_all_data_versions
+
+ROLLUP_KEY = ("wallet_id", "category_id", "year", "month", "transaction_type")
+
+
+class RollupController():
+    """Controlador responsável pela tabela de totais mensais (`MonthlyRollup`).
+
+    Os métodos de escrita não fazem commit: devem ser chamados dentro da mesma
+    transação do banco que altera as transações, para que os totais nunca fiquem
+    visíveis fora de sincronia com o histórico.
+    """
+
+    @staticmethod
+    def apply_changes(changes):
+        """Soma variações de total e quantidade às linhas agregadas (criando as que faltarem).
+
+        Usa `INSERT ... ON CONFLICT DO UPDATE`, então a soma é feita pelo próprio
+        banco e não depende de um valor lido antes. Linhas que ficam sem nenhuma
+        transação são removidas; só as chaves que receberam variação negativa são
+        verificadas (pela chave primária), sem varrer a tabela.
+
+        Args:
+            changes (list[dict]): Variações com as chaves "user_id", "wallet_id",
+                "category_id", "created_at" (date), "transaction_type", "total" e "count".
+        """
+        rows = [{
+            "user_id": change["user_id"],
+            "wallet_id": change["wallet_id"],
+            "category_id": change["category_id"],
+            "year": change["created_at"].year,
+            "month": change["created_at"].month,
+            "transaction_type": change["transaction_type"],
+            "total": change["total"],
+            "count": change["count"]
+        } for change in changes]
+
+        if not rows:
+            return
+
+        statement = sqlite_insert(MonthlyRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements= list(ROLLUP_KEY),
+            set_= {
+                "total": MonthlyRollup.total + statement.excluded.total,
+                "count": MonthlyRollup.count + statement.excluded.count
+            }
+        )
+        db.session.execute(statement, rows)
+
+        decremented = [
+            {f"key_{column}": row[column] for column in ROLLUP_KEY}
+            for row in rows if row["count"] < 0
+        ]
+
+        if decremented:
+            # Um DELETE por chave primária (executemany, pelo Core), sem varrer a tabela
+            table = MonthlyRollup.__table__
+            db.session.connection().execute(
+                delete(table)
+                .where(*(table.c[column] == bindparam(f"key_{column}") for column in ROLLUP_KEY))
+                .where(table.c.count <= 0),
+                decremented
+            )
+
+    @staticmethod
+    def record_transaction(user_id, wallet_id, category_id, created_at, transaction_type, value, sign=1):
+        """Registra (sign=1) ou remove (sign=-1) uma transação dos totais do seu mês.
+
+        Args:
+            user_id (int): O ID do dono da carteira.
+            wallet_id (int): O ID da carteira da transação.
+            category_id (int): O ID da categoria da transação.
+            created_at (date): A data de competência da transação.
+            transaction_type (str): 'income' ou 'expense'.
+            value (float): O valor da transação.
+            sign (int, optional): 1 para somar a transação, -1 para retirá-la.
+        """
+        RollupController.apply_changes([{
+            "user_id": user_id,
+            "wallet_id": wallet_id,
+            "category_id": category_id,
+            "created_at": created_at,
+            "transaction_type": transaction_type,
+            "total": sign * value,
+            "count": sign
+        }])
+
+    @staticmethod
+    def _aggregate_transactions_query():
+        """Monta o SELECT que recalcula os totais mensais direto da tabela de transações."""
+        year = cast(func.strftime("%Y", Transaction.created_at), Integer)
+        month = cast(func.strftime("%m", Transaction.created_at), Integer)
+
+        return select(
+                Transaction.wallet_id,
+                Transaction.category_id,
+                year.label("year"),
+                month.label("month"),
+                Transaction.transaction_type,
+                Wallet.user_id,
+                func.sum(Transaction.value).label("total"),
+                func.count(Transaction.id).label("count")
+            )\
+            .join(Wallet, Transaction.wallet_id == Wallet.id)\
+            .group_by(Transaction.wallet_id, Transaction.category_id, year, month, Transaction.transaction_type)
+
+    @staticmethod
+    def rebuild():
+        """Recria toda a tabela de totais mensais a partir das transações, em um único commit.
+
+        Returns:
+            int: A quantidade de linhas agregadas geradas.
+        """
+        db.session.execute(delete(MonthlyRollup))
+        db.session.execute(
+            insert(MonthlyRollup).from_select(
+                ["wallet_id", "category_id", "year", "month", "transaction_type", "user_id", "total", "count"],
+                RollupController._aggregate_transactions_query()
+            )
+        )
+        bump_all_data_versions()
+        db.session.commit()
+        report_cache.clear()
+
+        return db.session.query(func.count()).select_from(MonthlyRollup).scalar()
+
+    @staticmethod
+    def ensure_populated():
+        """Gera os totais mensais em bancos criados antes da tabela existir.
+
+        Só reconstrói se a tabela estiver vazia e houver transações gravadas.
+
+        Returns:
+            bool: True se a tabela foi reconstruída.
+        """
+        has_rollups = db.session.query(MonthlyRollup.wallet_id).limit(1).first()
+        has_transactions = db.session.query(Transaction.id).limit(1).first()
+
+        if has_rollups or not has_transactions:
+            return False
+
+        RollupController.rebuild()
+        return True
+
+    @staticmethod
+    def find_inconsistencies():
+        """Compara a tabela de totais mensais com as transações gravadas.
+
+        Returns:
+            list[dict]: Um item por grupo divergente, com as chaves "key" (tupla
+            wallet_id, category_id, year, month, transaction_type), "expected"
+            e "stored" (cada uma um par (total, count), ou None se o grupo não existir).
+        """
+        expected = {
+            tuple(row[:5]): (row.total, row.count)
+            for row in db.session.execute(RollupController._aggregate_transactions_query())
+        }
+        stored = {
+            (row.wallet_id, row.category_id, row.year, row.month, row.transaction_type): (row.total, row.count)
+            for row in MonthlyRollup.query.all()
+        }
+
+        problems = []
+
+        for key in sorted(expected.keys() | stored.keys(), key= str):
+            want, have = expected.get(key), stored.get(key)
+
+            if want == have:
+                continue
+
+            problems.append({"key": key, "expected": want, "stored": have})
+
+        return problems
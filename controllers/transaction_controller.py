@@ -1,10 +1,18 @@
-from extensions import db
+from extensions import db, report_cache
 from models.transaction import Transaction
 from models.wallet import Wallet
-from models.category import UserCategory, SystemCategory
+from models.category import UserCategory
+from controllers.rollup_controller import RollupController
 from utils.exceptions import SaldoInsuficienteError, CarteiraInexistenteError, ValorInvalidoError, TransacaoInexistenteError
-from sqlalchemy import extract
+from utils.pagination import keyset_paginate, DEFAULT_PAGE_SIZE
+from utils.period import month_filter
+from utils.data_version import bump_data_version
+from utils.system_categories import system_categories
+from utils.money import MAX_AMOUNT, to_cents, has_cents_precision
+from sqlalchemy import update, delete, select, case, func
+from sqlalchemy.orm import joinedload, contains_eager
 from datetime import datetime
+import math
 
 class TransactionController():
     """Controlador responsável pelo gerenciamento de transações financeiras (receitas e despesas)."""
@@ -14,8 +22,10 @@ class TransactionController():
         """Cria uma nova transação e atualiza o saldo da carteira correspondente.
 
         Recebe a data como string e realiza a conversão para datetime. Valida
-        a existência da carteira e da categoria (seja do sistema ou do usuário).
-        Se for despesa, verifica saldo. Por fim, atualiza o saldo da carteira.
+        a existência da categoria (seja do sistema ou do usuário). A existência
+        da carteira, a verificação de saldo (se for despesa) e a atualização do
+        saldo acontecem em um único UPDATE condicional (ver `apply_balance_change`).
+        Os totais mensais (`MonthlyRollup`) são atualizados no mesmo commit.
 
         Args:
             transaction_type (str): Tipo da transação ("income" ou "expense").
@@ -39,7 +49,15 @@ class TransactionController():
         except (ValueError, TypeError):
             raise ValorInvalidoError("O valor da transação deve ser um número válido.")
         
-        if value <= 0:
+        # NaN passaria pela comparação abaixo; infinito e valores enormes estourariam os centavos
+        if not math.isfinite(value) or value > MAX_AMOUNT:
+            raise ValorInvalidoError(f"O valor da transação deve ser um número entre 0 e {MAX_AMOUNT}.")
+
+        # Mais casas decimais seriam arredondadas ao gravar (0.004 viraria 0 centavos)
+        if not has_cents_precision(value):
+            raise ValorInvalidoError("O valor da transação deve ter no máximo duas casas decimais.")
+
+        if to_cents(value) <= 0:
             raise ValorInvalidoError("O valor da transação deve ser maior que zero.")
         
         try:
@@ -47,26 +65,23 @@ class TransactionController():
         except (ValueError, TypeError):
             raise ValorInvalidoError("Data da transação inválida.")
         
-        wallet = Wallet.query.filter_by(
-            id= wallet_id, 
-            user_id= user_id, 
-            is_active= True).first()
-        
-        if not wallet:
-            raise CarteiraInexistenteError("Carteira inexistente.")
-        
+        # Categorias de sistema vêm do registro em memória; só as do usuário vão ao banco
         category = (
-            UserCategory.query.filter_by(id= category_id, user_id= user_id).first()
+            system_categories.get_by_id(category_id)
             or
-            SystemCategory.query.filter_by(id= category_id).first()            
+            UserCategory.query.filter_by(id= category_id, user_id= user_id).first()
         )
 
         if not category:
             raise CarteiraInexistenteError("Categoria inexistente.")
 
-        # Saldo insuficiente
-        if transaction_type == "expense" and wallet.current_balance < value:
-            raise SaldoInsuficienteError("Saldo insuficiente na carteira para realizar esta despesa.")
+        # Atualiza o saldo (e bloqueia despesas sem saldo) antes de inserir a transação
+        TransactionController.apply_balance_change(
+            wallet_id,
+            user_id,
+            value if transaction_type == "income" else -value,
+            check_funds= transaction_type == "expense"
+        )
 
         transaction = Transaction(
             transaction_type= transaction_type,
@@ -77,16 +92,103 @@ class TransactionController():
             created_at= created_at
         )
 
-        if transaction_type == "income":
-            wallet.current_balance += value
-        else:
-            wallet.current_balance -= value
-
         db.session.add(transaction)
+        RollupController.record_transaction(
+            user_id, wallet_id, category_id, created_at.date(), transaction_type, value
+        )
+        bump_data_version(user_id)
         db.session.commit()
+        report_cache.invalidate(user_id, [created_at])
 
         return transaction
-            
+
+    @staticmethod
+    def apply_balance_change(wallet_id, user_id, delta, check_funds=False):
+        """Aplica uma variação ao saldo de uma carteira com um único UPDATE condicional.
+
+        A leitura, a verificação de saldo e a escrita acontecem na mesma instrução SQL
+        (`current_balance = current_balance + delta`), então requisições simultâneas não
+        conseguem aprovar duas despesas com base no mesmo saldo nem sobrescrever a
+        atualização uma da outra. Não faz commit: a variação entra na mesma transação
+        do banco que a operação que a originou. Se nenhuma linha for atualizada, a
+        sessão sofre rollback antes da exceção.
+
+        Args:
+            wallet_id (int): O ID da carteira.
+            user_id (int): O ID do usuário dono da carteira.
+            delta (float|ColumnElement): A variação do saldo (negativa para saídas). Pode ser
+                uma expressão SQL, avaliada no momento do UPDATE.
+            check_funds (bool, optional): Se True, só atualiza se o saldo resultante não ficar negativo.
+
+        Raises:
+            CarteiraInexistenteError: Se a carteira não existir, estiver inativa ou não pertencer ao usuário.
+            SaldoInsuficienteError: Se `check_funds` for True e o saldo não cobrir a variação.
+        """
+        new_balance = Wallet.current_balance + delta
+
+        statement = update(Wallet)\
+            .where(Wallet.id == wallet_id, Wallet.user_id == user_id, Wallet.is_active == True)\
+            .values(current_balance= new_balance)\
+            .execution_options(synchronize_session= False)
+
+        if check_funds:
+            statement = statement.where(new_balance >= 0)
+
+        result = db.session.execute(statement)
+
+        if result.rowcount == 0:
+            db.session.rollback()
+
+            wallet = Wallet.query.filter_by(id= wallet_id, user_id= user_id, is_active= True).first()
+
+            if not wallet:
+                raise CarteiraInexistenteError("Carteira inexistente.")
+
+            raise SaldoInsuficienteError("Saldo insuficiente na carteira para realizar esta despesa.")
+
+    @staticmethod
+    def _signed_value_change(transaction_id, new_value=0):
+        """Expressão SQL da variação de saldo ao trocar o valor atual da transação por `new_value`.
+
+        O valor antigo é lido dentro do próprio UPDATE da carteira, e não de um SELECT
+        anterior, para não usar um valor já alterado por outra requisição. Com
+        `new_value=0` a expressão representa o estorno completo (exclusão).
+        """
+        change = select(case(
+                (Transaction.transaction_type == "income", new_value - Transaction.value),
+                else_= Transaction.value - new_value
+            ))\
+            .where(Transaction.id == transaction_id)\
+            .scalar_subquery()
+
+        return func.coalesce(change, 0)
+
+    @staticmethod
+    def _locked_snapshot(transaction_id):
+        """Lê os dados atuais de uma transação depois que a carteira já foi atualizada.
+
+        Deve ser chamada após `apply_balance_change`: o UPDATE da carteira já abriu a
+        transação de escrita, então nenhuma outra requisição consegue alterar ou excluir
+        a linha entre esta leitura e o commit.
+
+        Returns:
+            Row: Os campos value, category_id, created_at e transaction_type.
+
+        Raises:
+            TransacaoInexistenteError: Se a transação foi excluída por outra requisição
+                (a sessão sofre rollback antes da exceção).
+        """
+        current = db.session.execute(
+            select(Transaction.value, Transaction.category_id, Transaction.created_at, Transaction.transaction_type)
+            .where(Transaction.id == transaction_id)
+        ).one_or_none()
+
+        if current is None:
+            db.session.rollback()
+            raise TransacaoInexistenteError("Transação inexistente.")
+
+        return current
+
 
     @staticmethod
     def get_transactions_by_wallet(wallet_id):
@@ -100,6 +202,43 @@ class TransactionController():
         """
         return Transaction.query.filter_by(wallet_id=wallet_id).order_by(Transaction.created_at.desc()).order_by(Transaction.id.desc()).all()
 
+    @staticmethod
+    def get_transactions_by_wallet_page(wallet_id, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+        """Recupera uma página das transações de uma carteira, paginada por cursor.
+
+        Args:
+            wallet_id (int): O ID da carteira.
+            after (str, optional): Cursor para buscar a próxima página (transações mais antigas).
+            before (str, optional): Cursor para buscar a página anterior (transações mais recentes).
+            per_page (int, optional): Quantidade de transações por página.
+
+        Returns:
+            dict: A página no formato de `keyset_paginate` ("items", "next_cursor",
+            "prev_cursor" e "per_page").
+
+        Raises:
+            ValorInvalidoError: Se algum dos cursores for inválido.
+        """
+        # A categoria de cada linha é exibida no extrato: carrega junto para evitar N+1
+        query = Transaction.query.filter_by(wallet_id=wallet_id)\
+            .options(joinedload(Transaction.category))
+
+        return keyset_paginate(query, Transaction.created_at, Transaction.id, after, before, per_page)
+
+    @staticmethod
+    def _user_transactions_query(user_id, month=None, year=None):
+        """Monta a consulta (sem ordenação) das transações de um usuário, filtrada por mês/ano se informados.
+
+        Raises:
+            ValorInvalidoError: Se o mês ou o ano informados forem inválidos.
+        """
+        query = Transaction.query.join(Wallet).filter(Wallet.user_id == user_id)
+
+        if month is None or year is None:
+            return query
+
+        return query.filter(month_filter(Transaction.created_at, month, year))
+
     @staticmethod
     def get_user_transactions(user_id, month=None, year=None):
         """Recupera o histórico de transações de um usuário.
@@ -116,23 +255,49 @@ class TransactionController():
         Returns:
             list[Transaction]: Lista de transações ordenadas por data (mais recentes primeiro).
         """
-        if month is None or year is None:
-            return Transaction.query.join(Wallet).filter(
-                Wallet.user_id == user_id
-            ).order_by(Transaction.created_at.desc()).order_by(Transaction.id.desc()).all()
-        
-        return Transaction.query.join(Wallet).filter(
-            Wallet.user_id == user_id,
-            extract("month", Transaction.created_at) == month,
-            extract("year", Transaction.created_at) == year
-        ).order_by(Transaction.created_at.desc()).order_by(Transaction.id.desc()).all()
+        return TransactionController._user_transactions_query(user_id, month, year)\
+            .order_by(Transaction.created_at.desc()).order_by(Transaction.id.desc()).all()
+
+    @staticmethod
+    def get_user_transactions_page(user_id, month=None, year=None, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+        """Recupera uma página do histórico de transações de um usuário, paginada por cursor.
+
+        Aplica os mesmos filtros de `get_user_transactions`, mas carrega apenas
+        `per_page` registros por vez. Os totais do período devem vir de uma
+        agregação separada (ex: `ReportController.get_monthly_summary`), já que
+        a página contém só parte das transações.
+
+        Args:
+            user_id (int): O ID do usuário.
+            month (int, optional): O mês numérico (1-12).
+            year (int, optional): O ano com 4 dígitos.
+            after (str, optional): Cursor para buscar a próxima página (transações mais antigas).
+            before (str, optional): Cursor para buscar a página anterior (transações mais recentes).
+            per_page (int, optional): Quantidade de transações por página.
+
+        Returns:
+            dict: A página no formato de `keyset_paginate` ("items", "next_cursor",
+            "prev_cursor" e "per_page").
+
+        Raises:
+            ValorInvalidoError: Se algum dos cursores for inválido.
+        """
+        # Categoria e carteira de cada linha são exibidas no extrato: a carteira já
+        # está no JOIN da consulta e a categoria vem no mesmo SELECT, evitando N+1
+        query = TransactionController._user_transactions_query(user_id, month, year)\
+            .options(contains_eager(Transaction.wallet), joinedload(Transaction.category))
+
+        return keyset_paginate(query, Transaction.created_at, Transaction.id, after, before, per_page)
 
     @staticmethod
     def delete_transaction(transaction_id, user_id):
         """Exclui uma transação e reverte o impacto no saldo da carteira.
 
         Se a transação excluída era uma receita, o valor é subtraído da carteira.
-        Se era uma despesa, o valor é devolvido (somado) à carteira.
+        Se era uma despesa, o valor é devolvido (somado) à carteira. O estorno usa
+        o valor gravado no momento do UPDATE, e a exclusão confere se a linha ainda
+        existia, então duas exclusões simultâneas não estornam o valor duas vezes.
+        A transação também é retirada dos totais mensais no mesmo commit.
 
         Args:
             transaction_id (int): O ID da transação a ser excluída.
@@ -149,24 +314,30 @@ class TransactionController():
 
         if not transaction:
             raise TransacaoInexistenteError("Transação inexistente.") 
-        
-        wallet = Wallet.query.filter_by(
-            id= transaction.wallet_id,
-            user_id= user_id,
-            is_active= True
-        ).first()
-
-        if not wallet:
-            raise CarteiraInexistenteError("Carteira inexistente.") 
-        
 
-        if transaction.transaction_type == "income":
-            wallet.current_balance -= transaction.value
-        else:
-            wallet.current_balance += transaction.value
+        TransactionController.apply_balance_change(
+            transaction.wallet_id,
+            user_id,
+            TransactionController._signed_value_change(transaction_id)
+        )
+
+        # Relido depois do UPDATE da carteira, que já bloqueia o banco para escrita:
+        # são os dados que de fato saem dos totais mensais
+        current = TransactionController._locked_snapshot(transaction_id)
+
+        db.session.execute(
+            delete(Transaction)
+            .where(Transaction.id == transaction_id)
+            .execution_options(synchronize_session= False)
+        )
 
-        db.session.delete(transaction)
+        RollupController.record_transaction(
+            user_id, transaction.wallet_id, current.category_id,
+            current.created_at, current.transaction_type, current.value, sign= -1
+        )
+        bump_data_version(user_id)
         db.session.commit()
+        report_cache.invalidate(user_id, [current.created_at])
 
         return True
 
@@ -174,9 +345,10 @@ class TransactionController():
     def edit_transaction(transaction_id, value, date_str, description, category_id, user_id):
         """Edita uma transação existente e recalcula o saldo da carteira.
 
-        A função reverte o impacto da transação original no saldo da carteira,
-        valida a nova data e valor, verifica se há fundos suficientes (se for despesa)
-        e aplica as alterações.
+        A função valida a nova data e valor e aplica ao saldo da carteira a diferença
+        entre o valor novo e o valor gravado, verificando se há fundos suficientes
+        (se for despesa) no mesmo UPDATE condicional (ver `apply_balance_change`).
+        Os totais mensais da versão antiga e da nova são ajustados no mesmo commit.
 
         Args:
             transaction_id (int): O ID da transação a ser editada.
@@ -205,7 +377,15 @@ class TransactionController():
         except (ValueError, TypeError):
             raise ValorInvalidoError("O valor da transação deve ser um número válido.")
         
-        if value <= 0:
+        # NaN passaria pela comparação abaixo; infinito e valores enormes estourariam os centavos
+        if not math.isfinite(value) or value > MAX_AMOUNT:
+            raise ValorInvalidoError(f"O valor da transação deve ser um número entre 0 e {MAX_AMOUNT}.")
+
+        # Mais casas decimais seriam arredondadas ao gravar (0.004 viraria 0 centavos)
+        if not has_cents_precision(value):
+            raise ValorInvalidoError("O valor da transação deve ter no máximo duas casas decimais.")
+
+        if to_cents(value) <= 0:
             raise ValorInvalidoError("O valor da transação deve ser maior que zero.")
         
         try:
@@ -213,34 +393,41 @@ class TransactionController():
         except (ValueError, TypeError):
             raise ValorInvalidoError("Data da transação inválida.")
 
-        wallet_id = transaction.wallet_id
-
-        wallet = Wallet.query.filter_by(
-            id= wallet_id,
-            user_id= user_id,
-            is_active= True
-        ).first()   
-
-        if not wallet:
-            raise CarteiraInexistenteError("Carteira inexistente.")
-        
-        if transaction.transaction_type == "income":
-            wallet.current_balance -= transaction.value
-        else:        
-            wallet.current_balance += transaction.value
+        TransactionController.apply_balance_change(
+            transaction.wallet_id,
+            user_id,
+            TransactionController._signed_value_change(transaction_id, value),
+            check_funds= transaction.transaction_type == "expense"
+        )
 
-        if transaction.transaction_type == "expense" and wallet.current_balance < value:
-            raise SaldoInsuficienteError("Saldo insuficiente na carteira para realizar esta despesa.")
-        
-        transaction.value = value
-        transaction.created_at = created_at
-        transaction.description = description
-        transaction.category_id = category_id
-        
-        if transaction.transaction_type == "income":
-            wallet.current_balance += transaction.value
-        else:
-            wallet.current_balance -= transaction.value  
+        current = TransactionController._locked_snapshot(transaction_id)
+
+        db.session.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction_id)
+            .values(
+                value= value,
+                created_at= created_at,
+                description= description,
+                category_id= category_id
+            )
+            .execution_options(synchronize_session= False)
+        )
 
+        # Retira a versão antiga dos totais mensais e soma a nova (mês e categoria podem ter mudado)
+        RollupController.apply_changes([
+            {
+                "user_id": user_id, "wallet_id": transaction.wallet_id,
+                "category_id": current.category_id, "created_at": current.created_at,
+                "transaction_type": current.transaction_type, "total": -current.value, "count": -1
+            },
+            {
+                "user_id": user_id, "wallet_id": transaction.wallet_id,
+                "category_id": category_id, "created_at": created_at.date(),
+                "transaction_type": current.transaction_type, "total": value, "count": 1
+            }
+        ])
+        bump_data_version(user_id)
         db.session.commit()
+        report_cache.invalidate(user_id, [current.created_at, created_at])
         return transaction
\ No newline at end of file
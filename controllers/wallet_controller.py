@@ -1,7 +1,13 @@
-from extensions import db
+from extensions import db, report_cache
 from models.wallet import Wallet
-from models.category import SystemCategory
+from models.transaction import Transaction
+from models.objective import Objective
+from models.monthly_rollup import MonthlyRollup
 from controllers.transaction_controller import TransactionController
+from controllers.job_controller import JobController
+from utils.data_version import bump_data_version, get_data_version
+from utils.system_categories import system_categories
+from utils.money import MAX_AMOUNT, is_valid_amount
 from utils.exceptions import ValorInvalidoError, CarteiraJaExisteError, CategoriaInexistenteError, CarteiraInexistenteError
 from datetime import datetime
 
@@ -33,6 +39,11 @@ class WalletController():
             initial_balance = float(initial_balance)
         except (ValueError, TypeError):
             raise ValorInvalidoError("O valor inicial deve ser um número válido.")
+
+        if not is_valid_amount(initial_balance, positive= False):
+            raise ValorInvalidoError(
+                f"O valor inicial deve ser um número entre -{MAX_AMOUNT} e {MAX_AMOUNT}, com no máximo duas casas decimais."
+            )
         
         existing_wallet = Wallet.query.filter_by(
             user_id= user_id, 
@@ -55,9 +66,11 @@ class WalletController():
 
             db.session.add(wallet)
             
+        bump_data_version(user_id)
         db.session.commit()
+        report_cache.invalidate(user_id, [])
 
-        category = SystemCategory.query.filter_by(name= "Depósito inicial").first()
+        category = system_categories.get("Depósito inicial")
 
         if not category:
             raise CategoriaInexistenteError("Categoria padrão 'Depósito inicial' não encontrada.")
@@ -134,22 +147,40 @@ class WalletController():
             raise CarteiraInexistenteError("Carteira não encontrada.")
 
         wallet.is_active = False
+        bump_data_version(user_id)
         db.session.commit()
+        # Carteiras inativas saem do patrimônio; os totais mensais não mudam
+        report_cache.invalidate(user_id, [])
         return wallet
 
     @staticmethod  
-    def delete_wallet(wallet_id, user_id):
+    def delete_wallet(wallet_id, user_id, background=False):
         """Exclui permanentemente uma carteira e todas as suas transações (Hard Delete).
 
-        Busca a carteira validando a propriedade pelo usuário. Realiza uma exclusão em cascata:
-        remove todas as transações vinculadas antes de deletar a carteira do banco de dados.
+        Busca a carteira validando a propriedade pelo usuário. Realiza uma exclusão em cascata
+        baseada em conjuntos: um único DELETE remove todas as transações vinculadas (e outro os
+        totais mensais da carteira), os objetivos ligados à carteira são desvinculados e a
+        carteira é removida, tudo em um único commit.
+        Os saldos não precisam ser ajustados, pois a própria carteira deixa de existir.
+
+        Em bancos novos o esquema já declara ON DELETE CASCADE / SET NULL. Bancos antigos
+        recebem essas cláusulas quando `utils.migrations.migrate_money_columns` recria
+        `transactions`, `goals` e `objectives` (`_rebuild_table`, no `provision-db`); as
+        instruções explícitas garantem o mesmo resultado em bancos que ainda não passaram
+        por essa reconstrução.
+
+        Com `background=True`, a propriedade é validada e a exclusão é enfileirada como
+        a tarefa 'wallet.delete' (ver `JobController`), executada depois por um worker.
+        A chave da tarefa inclui a versão dos dados do usuário, então um pedido repetido
+        antes da exclusão devolve a mesma tarefa.
 
         Args:
             wallet_id (int): O ID da carteira a ser excluída.
             user_id (int): O ID do usuário solicitante.
+            background (bool, optional): Se True, enfileira a exclusão em vez de executá-la.
 
         Returns:
-            bool: Retorna True se a exclusão for bem-sucedida.
+            bool|Job: True se a exclusão for bem-sucedida, ou a tarefa enfileirada com `background`.
 
         Raises:
             CarteiraInexistenteError: Se a carteira não for encontrada ou não pertencer ao usuário.
@@ -158,14 +189,22 @@ class WalletController():
 
         if not wallet:
             raise CarteiraInexistenteError("Carteira não encontrada.")
-        
-        transactions = TransactionController.get_transactions_by_wallet(wallet_id)
 
-        for transaction in transactions:
-            TransactionController.delete_transaction(transaction.id, user_id) # deleta todas as transações da carteira
-
-        db.session.delete(wallet)
+        if background:
+            return JobController.enqueue(
+                "wallet.delete",
+                {"wallet_id": wallet.id, "user_id": user_id},
+                user_id= user_id,
+                key= f"wallet.delete:{wallet.id}:{get_data_version(user_id)}"
+            )
+        
+        Objective.query.filter_by(wallet_id= wallet.id).update({"wallet_id": None})
+        Transaction.query.filter_by(wallet_id= wallet.id).delete()
+        MonthlyRollup.query.filter_by(wallet_id= wallet.id).delete()
+        Wallet.query.filter_by(id= wallet.id).delete()
+        bump_data_version(user_id)
         db.session.commit()
+        report_cache.invalidate(user_id)
 
         return True
     
@@ -1,5 +1,20 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.cache import ReportCache
+from utils.database import apply_pragmas
 
 db = SQLAlchemy()
-login_manager = LoginManager()
\ No newline at end of file
+login_manager = LoginManager()
+report_cache = ReportCache()
+
+@event.listens_for(Engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Liga a verificação de chaves estrangeiras (desligada por padrão no SQLite) em cada conexão.
+
+    Sem isso, cláusulas como ON DELETE CASCADE são ignoradas pelo banco. Vale para
+    qualquer engine; as da aplicação recebem em seguida o perfil completo de
+    `SQLITE_PRAGMA_PROFILE` (ver `utils.database.configure_engine`).
+    """
+    apply_pragmas(dbapi_connection, {"foreign_keys": "ON"})
@@ -14,6 +14,10 @@ class Category(db.Model):
                     se a instância é uma 'SystemCategory' ou 'UserCategory'.
     """
     __tablename__ = "categories"
+    __table_args__ = (
+        # Busca de categorias do sistema pelo nome (ex: 'Depósito inicial')
+        db.Index("ix_categories_type_name", "type", "name"),
+    )
 
     id = db.Column(db.Integer, primary_key= True)
     name = db.Column(db.String(100), nullable= False)
@@ -47,6 +51,9 @@ class UserCategory(Category):
     def __repr__(self):
         return f"<UserCategory {self.name}>"
 
+# A coluna user_id só existe a partir da subclasse, então o índice é declarado aqui
+db.Index("ix_categories_user_id_name", UserCategory.user_id, Category.name)
+
 class SystemCategory(Category):
     """Subclasse para categorias de uso exclusivo do sistema (Internal Use Only).
 
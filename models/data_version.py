@@ -0,0 +1,21 @@
+from extensions import db
+
+class UserDataVersion(db.Model):
+    """Modelo de dados que guarda a versão dos dados financeiros de cada usuário.
+
+    O número é incrementado na mesma transação do banco de toda escrita que muda
+    os relatórios do usuário (transações, carteiras, categorias). Ele identifica o
+    estado dos dados sem precisar recalcular nada: as rotas JSON de relatório usam
+    a versão para montar o ETag e responder `304 Not Modified`.
+
+    Attributes:
+        user_id (int): O usuário dono dos dados (Primary Key).
+        version (int): Contador crescente de alterações.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete= "CASCADE"), primary_key= True)
+    version = db.Column(db.Integer, nullable= False, default= 0)
+
+    def __repr__(self):
+        return f"<UserDataVersion {self.user_id} ! {self.version}>"
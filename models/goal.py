@@ -1,4 +1,5 @@
 from extensions import db
+from utils.money import Money
 
 class Goal(db.Model):
     """Modelo de dados que representa uma Meta Financeira (Goal).
@@ -10,7 +11,7 @@ class Goal(db.Model):
     Attributes:
         id (int): Identificador único da meta (Primary Key).
         goal_name (str): O nome descritivo da meta.
-        target_amount (float): O valor alvo a ser respeitado.
+        target_amount (float): O valor alvo a ser respeitado (gravado em centavos).
         created_at (date): A data em que a meta foi estabelecida.
         is_active (bool): Flag que indica se a meta está vigente (True) ou encerrada (False).
         deadline (date, optional): A data limite para o cumprimento da meta.
@@ -19,10 +20,14 @@ class Goal(db.Model):
         category (UserCategory): Relacionamento ORM para acessar os dados da categoria vinculada.
     """
     __tablename__ = "goals"
+    __table_args__ = (
+        db.Index("ix_goals_user_id_goal_name", "user_id", "goal_name"),
+        db.Index("ix_goals_user_id_is_active", "user_id", "is_active"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     goal_name = db.Column(db.String(100), nullable=False)
-    target_amount = db.Column(db.Float, nullable=False)
+    target_amount = db.Column(Money, nullable=False)
     created_at = db.Column(db.Date, nullable= False)
     is_active = db.Column(db.Boolean, default=True)
 
@@ -31,7 +36,7 @@ class Goal(db.Model):
 
     # Foreign key
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=True)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
 
     category = db.relationship("UserCategory", backref="goals")
 
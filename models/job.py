@@ -0,0 +1,83 @@
+from extensions import db
+from datetime import datetime, timezone
+
+
+def utcnow():
+    """Data e hora atuais em UTC, sem fuso (o SQLite grava DATETIME sem fuso)."""
+    return datetime.now(timezone.utc).replace(tzinfo= None)
+
+
+class Job(db.Model):
+    """Modelo de dados que representa uma tarefa da fila de trabalhos em segundo plano.
+
+    Operações pesadas (excluir uma carteira com histórico longo, importar extratos,
+    reconciliar saldos, gerar relatórios) são gravadas aqui pela requisição e
+    executadas depois por um worker (`flask worker`). A fila fica no próprio banco
+    da aplicação, então sobrevive a reinícios.
+
+    Ciclo de vida (`status`): 'pending' -> 'running' -> 'succeeded' ou, esgotadas as
+    tentativas, 'failed'. Uma falha com tentativas restantes volta para 'pending' com
+    `run_at` no futuro (backoff exponencial).
+
+    Attributes:
+        id (int): Identificador único da tarefa (Primary Key).
+        kind (str): O tipo da tarefa (ex: 'wallet.delete'), que define o handler executado.
+        key (str, optional): Chave de idempotência: enfileirar de novo com a mesma chave
+                             enquanto a tarefa não terminou devolve a existente em vez
+                             de criar outra (ao terminar, a tarefa libera a chave).
+        user_id (int, optional): O usuário dono da tarefa (None para tarefas de manutenção).
+        payload (dict): Os argumentos do handler, em JSON.
+        status (str): 'pending', 'running', 'succeeded' ou 'failed'.
+        attempts (int): Quantas vezes a tarefa já foi iniciada.
+        max_attempts (int): Limite de tentativas antes de 'failed'.
+        run_at (datetime): Quando a tarefa pode ser executada (UTC).
+        locked_by (str, optional): O worker que está executando a tarefa.
+        locked_at (datetime, optional): Quando o worker pegou a tarefa (UTC).
+        last_error (str, optional): A mensagem do último erro.
+        result (dict, optional): O retorno do handler, em JSON.
+        created_at (datetime): Quando a tarefa foi enfileirada (UTC).
+        finished_at (datetime, optional): Quando a tarefa terminou (UTC).
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Próxima tarefa disponível para os workers
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+        # Tarefas de um usuário, mais recentes primeiro
+        db.Index("ix_jobs_user_id_id", "user_id", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key= True)
+    kind = db.Column(db.String(50), nullable= False)
+    key = db.Column(db.String(200), unique= True, nullable= True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete= "CASCADE"), nullable= True)
+    payload = db.Column(db.JSON, nullable= False, default= dict)
+
+    status = db.Column(db.String(20), nullable= False, default= "pending")
+    attempts = db.Column(db.Integer, nullable= False, default= 0)
+    max_attempts = db.Column(db.Integer, nullable= False, default= 5)
+    run_at = db.Column(db.DateTime, nullable= False, default= utcnow)
+    locked_by = db.Column(db.String(100), nullable= True)
+    locked_at = db.Column(db.DateTime, nullable= True)
+
+    last_error = db.Column(db.Text, nullable= True)
+    result = db.Column(db.JSON, nullable= True)
+    created_at = db.Column(db.DateTime, nullable= False, default= utcnow)
+    finished_at = db.Column(db.DateTime, nullable= True)
+
+    def to_dict(self):
+        """Retorna o estado da tarefa para as rotas de acompanhamento (JSON)."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_at": self.run_at.isoformat() if self.run_at else None,
+            "last_error": self.last_error,
+            "result": self.result,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} ! {self.status}>"
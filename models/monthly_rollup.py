@@ -0,0 +1,39 @@
+from extensions import db
+from utils.money import Money
+
+class MonthlyRollup(db.Model):
+    """Modelo de dados que guarda os totais mensais pré-agregados das transações.
+
+    Cada linha acumula a soma e a quantidade de transações de uma combinação
+    (usuário, carteira, categoria, ano, mês, tipo). A tabela é mantida de forma
+    incremental pelo `TransactionController`, na mesma transação do banco que
+    cria, edita ou exclui a transação, e permite que os relatórios leiam apenas
+    as linhas do mês consultado em vez de agregar todo o histórico.
+
+    Attributes:
+        user_id (int): Dono da carteira (copiado para filtrar sem JOIN).
+        wallet_id (int): Carteira das transações agregadas.
+        category_id (int): Categoria das transações agregadas.
+        year (int): Ano de competência (de `Transaction.created_at`).
+        month (int): Mês de competência (1-12).
+        transaction_type (str): 'income' ou 'expense'.
+        total (float): Soma dos valores das transações do grupo (gravada em centavos).
+        count (int): Quantidade de transações do grupo.
+    """
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        db.Index("ix_monthly_rollups_user_id_year_month", "user_id", "year", "month"),
+    )
+
+    wallet_id = db.Column(db.Integer, db.ForeignKey("wallets.id", ondelete= "CASCADE"), primary_key= True)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), primary_key= True)
+    year = db.Column(db.Integer, primary_key= True)
+    month = db.Column(db.Integer, primary_key= True)
+    transaction_type = db.Column(db.String(20), primary_key= True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable= False)
+
+    total = db.Column(Money, nullable= False, default= 0.0)
+    count = db.Column(db.Integer, nullable= False, default= 0)
+
+    def __repr__(self):
+        return f"<MonthlyRollup {self.year}-{self.month:02d} {self.transaction_type} ! {self.total}>"
@@ -1,4 +1,5 @@
 from extensions import db
+from utils.money import Money
 
 class Objective(db.Model):
     """Modelo de dados que representa um Objetivo Financeiro (Sonho/Aquisição).
@@ -15,7 +16,7 @@ class Objective(db.Model):
     Attributes:
         id (int): Identificador único do objetivo.
         objective_name (str): O título do objetivo.
-        target_amount (float): O valor total necessário para realizar o objetivo.
+        target_amount (float): O valor total necessário para realizar o objetivo (gravado em centavos).
         due_date (datetime, optional): A data planejada para a realização.
         is_active (bool): Flag de status. Se False, o objetivo foi concluído ou desistido.
         icon (str, optional): Um emoji ou código de ícone para representação visual no Dashboard.
@@ -27,17 +28,20 @@ class Objective(db.Model):
         wallet (Wallet): Relacionamento ORM com a carteira vinculada.
     """
     __tablename__ = "objectives"
+    __table_args__ = (
+        db.Index("ix_objectives_user_id_is_active", "user_id", "is_active"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     objective_name = db.Column(db.String(100), nullable=False)
-    target_amount = db.Column(db.Float, nullable=False)
+    target_amount = db.Column(Money, nullable=False)
     due_date = db.Column(db.DateTime, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     icon = db.Column(db.String(10), nullable=True)
 
     # Foreign key
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    wallet_id = db.Column(db.Integer, db.ForeignKey("wallets.id"), nullable=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey("wallets.id", ondelete="SET NULL"), nullable=True)
 
     user = db.relationship("User", backref="objectives")
     wallet = db.relationship("Wallet", backref="objectives")
@@ -1,4 +1,5 @@
 from extensions import db
+from utils.money import Money
 from datetime import datetime, timezone
 
 class Transaction(db.Model):
@@ -16,30 +17,45 @@ class Transaction(db.Model):
         id (int): Identificador único da transação (Primary Key).
         transaction_type (str): Define a natureza do movimento. Valores esperados:
                                 'income' (Receita) ou 'expense' (Despesa).
-        value (float): O valor monetário absoluto da transação.
+        value (float): O valor monetário absoluto da transação (gravado em centavos, ver `Money`).
         created_at (date): Data de competência da transação. Se não informada,
                            assume a data atual (UTC) automaticamente.
         description (str, optional): Um texto curto para detalhes extras (ex: 'Almoço no Shopping').
         
         wallet_id (int): Chave estrangeira da carteira afetada.
         category_id (int): Chave estrangeira da categoria que classifica este gasto/ganho.
+        import_job_id (int, optional): A tarefa de importação ('statement.import') que
+                                       inseriu a transação. Permite que uma nova tentativa
+                                       da mesma tarefa saiba que ela já foi gravada.
         
         wallet (Wallet): Relacionamento ORM para acessar o objeto da carteira.
         category (Category): Relacionamento ORM para acessar o objeto da categoria.
     """
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Extrato da carteira e filtros por período (ordenados por data e id)
+        db.Index("ix_transactions_wallet_id_created_at", "wallet_id", "created_at", "id"),
+        # Agregações por categoria (metas e relatórios)
+        db.Index("ix_transactions_category_id_created_at", "category_id", "created_at"),
+        # Transações gravadas por uma tarefa de importação
+        db.Index("ix_transactions_import_job_id", "import_job_id"),
+    )
 
     id = db.Column(db.Integer, primary_key= True)
     transaction_type = db.Column(db.String(20), nullable= False)
-    value = db.Column(db.Float, nullable= False)
+    value = db.Column(Money, nullable= False)
     created_at = db.Column(db.Date, default= lambda: datetime.now(timezone.utc).date())
     description = db.Column(db.String(100), nullable= True)
 
-    wallet_id = db.Column(db.Integer, db.ForeignKey("wallets.id"), nullable= False)
+    wallet_id = db.Column(db.Integer, db.ForeignKey("wallets.id", ondelete= "CASCADE"), nullable= False)
     category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable= False)
+    # Sem chave estrangeira: as tarefas terminadas podem ser apagadas sem afetar o extrato
+    import_job_id = db.Column(db.Integer, nullable= True)
 
     category = db.relationship("Category", backref= "transactions", lazy= True)
-    wallet = db.relationship("Wallet", backref= "transactions", lazy= True)
+    # passive_deletes: ao excluir a carteira, as transações são removidas pelo banco (ON DELETE CASCADE)
+    # em vez de carregadas uma a uma pelo ORM
+    wallet = db.relationship("Wallet", backref= db.backref("transactions", passive_deletes= True), lazy= True)
 
     def __repr__(self):
         return f"<Transaction {self.transaction_type} ! {self.value}>"
\ No newline at end of file
@@ -1,6 +1,6 @@
 from extensions import db
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import password_hasher
 
 class User(db.Model, UserMixin):
     """Modelo de dados que representa um usuário registrado no sistema.
@@ -36,7 +36,7 @@ class User(db.Model, UserMixin):
         self._password = password_value
 
     def check_password(self, password):
-        return check_password_hash(self._password, password)
+        return password_hasher.verify(self._password, password)
 
     def __repr__(self):
         return f"<User {self.email}>"
\ No newline at end of file
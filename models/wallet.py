@@ -1,4 +1,5 @@
 from extensions import db
+from utils.money import Money
 from datetime import datetime, timezone
 
 class Wallet(db.Model):
@@ -17,7 +18,8 @@ class Wallet(db.Model):
         wallet_name (str): Nome identificador (ex: 'Nubank', 'Cofre', 'Investimentos').
         initial_balance (float): O saldo existente no momento do cadastro da carteira. 
                                  Geralmente estático após a criação.
-        current_balance (float): O saldo atualizado em tempo real.
+        current_balance (float): O saldo atualizado em tempo real (gravado em centavos, como
+                                 `initial_balance`; ver `Money`).
                                  ATENÇÃO: Este campo deve ser recalculado ou atualizado 
                                  sempre que uma transação de receita/despesa for realizada.
         is_active (bool): Flag de 'Soft Delete'. Se False, a carteira é arquivada.
@@ -25,11 +27,15 @@ class Wallet(db.Model):
         user_id (int): Chave estrangeira do usuário proprietário.
     """
     __tablename__ = "wallets"
+    __table_args__ = (
+        db.Index("ix_wallets_user_id_is_active", "user_id", "is_active"),
+        db.Index("ix_wallets_user_id_wallet_name", "user_id", "wallet_name"),
+    )
 
     id = db.Column(db.Integer, primary_key= True)
     wallet_name = db.Column(db.String(100), nullable= False)
-    initial_balance = db.Column(db.Float, default= 0.0)
-    current_balance = db.Column(db.Float, default= 0.0)
+    initial_balance = db.Column(Money, default= 0.0)
+    current_balance = db.Column(Money, default= 0.0)
     is_active = db.Column(db.Boolean, default= True)
     created_at = db.Column(db.DateTime, default= lambda: datetime.now(timezone.utc).date())
 
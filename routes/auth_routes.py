@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from controllers.auth_controller import AuthController
-from utils.exceptions import UsuarioJaExisteError, UsuarioInexistenteError, SenhasDiferentes
+from utils.exceptions import UsuarioJaExisteError, UsuarioInexistenteError, SenhasDiferentes, ServicoSobrecarregadoError
 
 auth_bp = Blueprint("auth_bp", __name__, url_prefix="/auth")
 
@@ -39,7 +39,7 @@ def login():
 
     try: 
         user = AuthController.login(email, password)
-    except (UsuarioInexistenteError, UsuarioJaExisteError) as e:
+    except (UsuarioInexistenteError, UsuarioJaExisteError, ServicoSobrecarregadoError) as e:
         flash(str(e), "error")
         return redirect(url_for("auth_bp.login_page"))
     except Exception as e:
@@ -79,7 +79,7 @@ def register():
 
     try:
         user = AuthController.register(username, email, password, confirm_password)
-    except (UsuarioJaExisteError, SenhasDiferentes) as e:
+    except (UsuarioJaExisteError, SenhasDiferentes, ServicoSobrecarregadoError) as e:
         flash(str(e), "error")
         return redirect(url_for("auth_bp.register_page"))
     except Exception as e:
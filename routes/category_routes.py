@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, flash, request, redirect, url_for
 from flask_login import login_required, current_user
 from controllers.category_controller import CategoryController
-from utils.exceptions import CategoriaJaExisteError, CategoriaInexistenteError
+from utils.exceptions import CategoriaJaExisteError, CategoriaInexistenteError, CategoriaEmUsoError
 
 category_bp = Blueprint("category_bp", __name__, url_prefix="/category")
 
@@ -91,7 +91,7 @@ def delete_category(category_id):
     """
     try: 
         CategoryController.delete_category(category_id, current_user.id)
-    except CategoriaInexistenteError as e:
+    except (CategoriaInexistenteError, CategoriaEmUsoError) as e:
         flash(str(e), "warning")
         return redirect(url_for("category_bp.category_index_page"))
     except Exception as e:
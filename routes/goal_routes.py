@@ -2,7 +2,6 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from controllers.goal_controller import GoalController
 from controllers.category_controller import CategoryController
-from controllers.transaction_controller import TransactionController
 from utils.exceptions import ValorInvalidoError, MetaJaExisteError, MetaInexistenteError
 
 goal_bp = Blueprint("goal_bp", __name__, url_prefix="/goal")
@@ -12,54 +11,18 @@ goal_bp = Blueprint("goal_bp", __name__, url_prefix="/goal")
 def goal_index_page():
     """Exibe o painel de metas (orçamentos) do usuário.
 
-    Realiza o processamento em tempo real do progresso de cada meta:
-    1. Verifica e atualiza metas expiradas.
-    2. Itera sobre cada meta ativa.
-    3. Soma as transações do tipo 'despesa' que ocorreram dentro do prazo da meta.
-       - Se a meta tem categoria, soma apenas despesas daquela categoria.
-       - Se não tem categoria, soma todas as despesas do usuário.
-    4. Calcula a porcentagem de consumo e define o status visual (safe, warning, danger).
+    Busca o progresso de todas as metas ativas e dentro do prazo em uma única
+    consulta agregada (ver `GoalController.get_goals_progress`), com a porcentagem
+    de consumo e o status visual (safe, warning, danger) de cada uma. A página só
+    lê: metas vencidas são desativadas em lote por `flask expire-goals` (ou pela
+    thread de `GOAL_SWEEP_INTERVAL`).
 
     Returns:
         str: O template 'goal/index.html' com a lista de dados processados (goals_data)
         e as categorias disponíveis para criação de novas metas.
     """
-    # Verificar prazos das metas
-    GoalController.check_expired_goals(current_user.id)
-
     categories = CategoryController.get_user_categories(current_user.id)
-    goals = GoalController.get_goals_by_user(current_user.id)
-
-    goals_data = []
-
-    #Temporario
-    for goal in goals:
-        current_amount = 0
-        if goal.category:
-            for transaction in goal.category.transactions:
-                if transaction.transaction_type == "expense" and transaction.created_at >= goal.created_at and transaction.created_at <= goal.deadline:
-                    current_amount += transaction.value
-        else:
-            for transaction in TransactionController.get_user_transactions(current_user.id):
-                if transaction.transaction_type == "expense" and transaction.created_at >= goal.created_at and transaction.created_at <= goal.deadline:
-                    current_amount += transaction.value
-        
-        goals_data.append({
-            'id': goal.id,
-            'name': goal.goal_name,
-            'category_name': goal.category.name if goal.category else 'Sem Categoria',
-            'current': float(current_amount),
-            'target': float(goal.target_amount),
-            # Percentage limitado a 100 para a barra de progresso visual não quebrar o layout
-            'percentage': min(int((current_amount / goal.target_amount) * 100), 100),
-            # Real percentage mostra o valor real (pode passar de 100%)
-            'real_percentage': int((current_amount / goal.target_amount) * 100),
-            'remaining': float(goal.target_amount - current_amount),
-            # Lógica de cores baseada no consumo do orçamento
-            'status': 'safe' if current_amount <= goal.target_amount * 0.8 else
-                      'warning' if current_amount <= goal.target_amount else
-                      'danger'
-        })
+    goals_data = GoalController.get_goals_progress(current_user.id)
 
     return render_template('goal/index.html', 
                            goals_data=goals_data,
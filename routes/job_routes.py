@@ -0,0 +1,86 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, url_for
+from flask_login import login_required, current_user
+from controllers.job_controller import JobController
+from utils.data_version import get_data_version
+from utils.exceptions import TarefaInexistenteError
+
+job_bp = Blueprint("job_bp", __name__, url_prefix="/jobs")
+
+@job_bp.route("/", methods=["GET"])
+@login_required
+def job_list_json():
+    """Lista as tarefas em segundo plano mais recentes do usuário, em JSON.
+
+    Query Params:
+        limit (int, optional): Quantidade máxima de tarefas (1-100). Default: 20.
+
+    Returns:
+        Response: {"jobs": [...]}, cada tarefa no formato de `Job.to_dict`.
+    """
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    jobs = JobController.get_user_jobs(current_user.id, limit= limit)
+
+    return jsonify({"jobs": [job.to_dict() for job in jobs]})
+
+@job_bp.route("/<int:job_id>", methods=["GET"])
+@login_required
+def job_status_json(job_id):
+    """Retorna o estado de uma tarefa do usuário, para acompanhamento (polling).
+
+    Enquanto a tarefa estiver 'pending' ou 'running', a resposta sugere no
+    cabeçalho `Retry-After` quando consultar de novo.
+
+    Args:
+        job_id (int): O ID da tarefa.
+
+    Returns:
+        Response: A tarefa no formato de `Job.to_dict`, ou JSON de erro com status 404.
+    """
+    try:
+        job = JobController.get_job(job_id, current_user.id)
+    except TarefaInexistenteError as e:
+        return jsonify({"error": str(e)}), 404
+
+    response = jsonify(job.to_dict())
+
+    if job.status in ("pending", "running"):
+        response.headers["Retry-After"] = "1"
+
+    return response
+
+@job_bp.route("/report", methods=["POST"])
+@login_required
+def job_enqueue_report():
+    """Enfileira a geração do relatório mensal (o mesmo de `ReportController.get_monthly_report`).
+
+    O resultado fica em "result" da tarefa. Pedidos repetidos para o mesmo mês,
+    enquanto a tarefa não terminou e sem alterações nos dados do usuário entre eles,
+    devolvem a mesma tarefa.
+
+    Query Params:
+        month (int, optional): O mês (1-12). Default: Mês atual.
+        year (int, optional): O ano. Default: Ano atual.
+
+    Returns:
+        Response: A tarefa com status 202 e o endereço de acompanhamento em `Location`,
+        ou JSON de erro com status 400.
+    """
+    today = datetime.now()
+    month = request.values.get("month", today.month, type=int)
+    year = request.values.get("year", today.year, type=int)
+
+    if not 1 <= month <= 12 or year < 1:
+        return jsonify({"error": "Mês ou ano inválido."}), 400
+
+    job = JobController.enqueue(
+        "report.monthly",
+        {"user_id": current_user.id, "month": month, "year": year},
+        user_id= current_user.id,
+        key= f"report.monthly:{current_user.id}:{year:04d}-{month:02d}:{get_data_version(current_user.id)}"
+    )
+
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers["Location"] = url_for("job_bp.job_status_json", job_id= job.id)
+    return response
@@ -1,7 +1,6 @@
 from flask import Blueprint, render_template
 from flask_login import login_required, current_user
-from controllers.wallet_controller import WalletController
-from controllers.report_controller import ReportController
+from controllers.dashboard_controller import DashboardController
 
 main_bp = Blueprint("main_bp", __name__)
 
@@ -10,16 +9,19 @@ main_bp = Blueprint("main_bp", __name__)
 def dashboard_page():
     """Exibe a página principal (Dashboard) do usuário logado.
 
-    Recupera as carteiras do usuário e calcula o saldo total consolidado
-    somando o saldo atual de cada carteira.
+    Recupera as carteiras do usuário, o saldo total consolidado (somado a partir
+    das próprias carteiras), as últimas transações e o andamento das metas e
+    objetivos, tudo por `DashboardController.get_overview`.
 
     Returns:
         str: O template 'index.html' renderizado com as variáveis de contexto:
              - user: O objeto do usuário atual.
              - wallets: A lista de carteiras recuperadas.
              - total_balance: O somatório dos saldos das carteiras.
+             - latest_transactions: As transações mais recentes.
+             - goals: O progresso das metas ativas.
+             - objectives: O progresso dos objetivos ativos.
     """
-    wallets = WalletController.get_wallets_by_user(current_user.id)
+    overview = DashboardController.get_overview(current_user.id)
 
-    total_balance = ReportController.get_consolidated_wallet_balance(current_user.id)
-    return render_template("index.html", user= current_user, wallets= wallets, total_balance=total_balance)
\ No newline at end of file
+    return render_template("index.html", user= current_user, **overview)
@@ -4,6 +4,7 @@ from controllers.objective_controller import ObjectiveController
 from controllers.category_controller import CategoryController
 from controllers.wallet_controller import WalletController
 from utils.exceptions import ValorInvalidoError, ObjetivoInexistenteError
+from utils.money import sum_money
 from datetime import datetime, timedelta    
 
 objective_bp = Blueprint("objective_bp", __name__, url_prefix="/objectives")
@@ -26,32 +27,10 @@ def objective_index_page():
     """
     wallets = WalletController.get_wallets_by_user(current_user.id)
     categories = CategoryController.get_user_categories(current_user.id)
-    objectives = ObjectiveController.get_objectives_user(current_user.id)
-
-    #Temporario
-    objectives_data = []
-    for objective in objectives:
-        if objective.wallet:
-            current_balance = objective.wallet.current_balance
-        else:
-            current_balance = sum(wallet.current_balance for wallet in wallets)
-
-        if objective.target_amount > 0:
-            percentage = round((current_balance / objective.target_amount) * 100, 2)
-        else:
-            percentage = 0.0
-
-
-        objectives_data.append({
-            'id': objective.id,
-            'objective_name': objective.objective_name,
-            'objective_icon': objective.icon,
-            'target_amount': objective.target_amount,
-            'current_amount': current_balance,
-            'due_date': objective.due_date,
-            'wallet_id': objective.wallet_id,
-            'percentage': percentage
-        })
+    objectives_data = ObjectiveController.get_objectives_progress(
+        current_user.id,
+        sum_money(wallet.current_balance for wallet in wallets)
+    )
 
     return render_template('objective/index.html', 
                            objectives_data=objectives_data, 
@@ -1,5 +1,8 @@
-from flask import Blueprint, render_template, request, jsonify
+import hashlib
+from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, Response
 from controllers.report_controller import ReportController
+from utils.exceptions import ValorInvalidoError
+from utils.data_version import get_data_version
 from datetime import datetime
 from flask_login import login_required, current_user
 
@@ -14,9 +17,8 @@ def report_page():
 
     Processos realizados:
     1. Captura filtros de Mês/Ano da URL (padrão: data atual).
-    2. Busca Patrimônio Total acumulado.
-    3. Busca Resumo Mensal de Entradas/Saídas.
-    4. Busca e formata dados de Categorias para renderização no Chart.js.
+    2. Busca Patrimônio Total, Resumo Mensal e Categorias juntos (`ReportController.get_monthly_report`).
+    3. Formata os dados de Categorias para renderização no Chart.js.
 
     Query Params:
         month (int, optional): O mês para filtragem (1-12). Default: Mês atual.
@@ -32,23 +34,168 @@ def report_page():
     selected_month = request.args.get("month", today.month, type=int)
     selected_year = request.args.get("year", today.year, type=int)
 
-    # 1. Dados Consolidados
-    total_patrimony = ReportController.get_consolidated_wallet_balance(current_user.id)
-
-    # 2. Resumo Mensal
-    monthly_summary = ReportController.get_monthly_summary(current_user.id, selected_month, selected_year)
-
-    # 3. Dados por Categoria
-    category_data = ReportController.get_expenses_by_category(current_user.id, selected_month, selected_year)
+    try:
+        # Patrimônio, resumo mensal e dados por categoria em uma única consulta
+        report = ReportController.get_monthly_report(current_user.id, selected_month, selected_year)
+    except ValorInvalidoError as e:
+        flash(str(e), "warning")
+        return redirect(url_for("report_bp.report_page"))
     
     # Prepara dados para o Chart.js (separa labels e values)
-    cat_labels = [row[0] for row in category_data] # Nomes das categorias
-    cat_values = [row[1] for row in category_data] # Valores somados
+    cat_labels = [row[0] for row in report["categories"]] # Nomes das categorias
+    cat_values = [row[1] for row in report["categories"]] # Valores somados
 
     return render_template("report/index.html",
-                           total_patrimony=total_patrimony,
-                           monthly_summary=monthly_summary,
+                           total_patrimony=report["balance"],
+                           monthly_summary=report["summary"],
                            cat_labels=cat_labels,
                            cat_values=cat_values,
                            selected_month=selected_month,
-                           selected_year=selected_year)
\ No newline at end of file
+                           selected_year=selected_year)
+
+def _selected_period():
+    """Lê o mês e o ano da query string (padrão: mês atual)."""
+    today = datetime.now()
+    return (request.args.get("month", today.month, type=int),
+            request.args.get("year", today.year, type=int))
+
+
+def _conditional_json(name, load, *params):
+    """Responde um relatório em JSON com ETag forte, ou `304` se o cliente já tiver a versão atual.
+
+    O ETag é derivado do usuário, da versão dos seus dados (ver `UserDataVersion`), do
+    relatório e dos parâmetros. Quando ele coincide com o `If-None-Match` da requisição,
+    o relatório nem chega a ser calculado. Senão, `load` recebe a mesma versão, usada
+    nas chaves do `report_cache`: o corpo servido nunca é de uma versão anterior à do ETag.
+
+    Args:
+        name (str): O nome do relatório (faz parte do ETag).
+        load (Callable): Função que recebe a versão dos dados e monta o corpo da resposta.
+        *params: Os parâmetros que mudam o conteúdo (ex: mês e ano).
+
+    Returns:
+        Response: JSON com status 200, `304 Not Modified` ou JSON de erro com status 400.
+    """
+    version = get_data_version(current_user.id)
+    etag = hashlib.sha256(f"{current_user.id}:{version}:{name}:{params}".encode()).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = Response(status= 304)
+    else:
+        try:
+            response = jsonify(load(version))
+        except ValorInvalidoError as e:
+            return jsonify({"error": str(e)}), 400
+
+    response.set_etag(etag)
+    # O navegador guarda a resposta, mas confirma com o servidor (If-None-Match) antes de reutilizá-la
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@report_bp.route("/api/summary", methods=["GET"])
+@login_required
+def report_summary_json():
+    """Resumo do mês (receitas, despesas, saldo e quantidade de transações) em JSON.
+
+    Query Params:
+        month (int, optional): O mês (1-12). Default: Mês atual.
+        year (int, optional): O ano. Default: Ano atual.
+
+    Returns:
+        Response: {"month", "year", "income", "expense", "balance", "count"}, ou 304/400.
+    """
+    month, year = _selected_period()
+
+    return _conditional_json(
+        "summary",
+        lambda version: dict(
+            ReportController.get_monthly_summary(current_user.id, month, year, version), month= month, year= year
+        ),
+        month, year
+    )
+
+
+@report_bp.route("/api/categories", methods=["GET"])
+@login_required
+def report_categories_json():
+    """Despesas do mês por categoria em JSON, no formato usado pelo gráfico (Chart.js).
+
+    Query Params:
+        month (int, optional): O mês (1-12). Default: Mês atual.
+        year (int, optional): O ano. Default: Ano atual.
+
+    Returns:
+        Response: {"month", "year", "labels", "values"}, ou 304/400.
+    """
+    month, year = _selected_period()
+
+    def load(version):
+        category_data = ReportController.get_expenses_by_category(current_user.id, month, year, version)
+        return {
+            "month": month,
+            "year": year,
+            "labels": [row[0] for row in category_data],
+            "values": [row[1] for row in category_data]
+        }
+
+    return _conditional_json("categories", load, month, year)
+
+
+@report_bp.route("/api/patrimony", methods=["GET"])
+@login_required
+def report_patrimony_json():
+    """Patrimônio total (soma das carteiras ativas) em JSON.
+
+    Returns:
+        Response: {"total"}, ou 304.
+    """
+    return _conditional_json(
+        "patrimony",
+        lambda version: {"total": ReportController.get_consolidated_wallet_balance(current_user.id, version)}
+    )
+
+
+def _selected_range():
+    """Lê o intervalo de meses ('AAAA-MM') da query string (padrão: os últimos 12 meses)."""
+    today = datetime.now()
+    first = today.year * 12 + today.month - 12  # 11 meses antes do atual (meses contados a partir de 0)
+
+    return (request.args.get("start") or f"{first // 12:04d}-{first % 12 + 1:02d}",
+            request.args.get("end") or f"{today.year:04d}-{today.month:02d}")
+
+
+@report_bp.route("/api/range", methods=["GET"])
+@login_required
+def report_range_json():
+    """Matriz categoria × mês de receitas e despesas de um intervalo, com variações mensais, em JSON.
+
+    Query Params:
+        start (str, optional): O primeiro mês ('AAAA-MM'). Default: 11 meses antes do atual.
+        end (str, optional): O último mês ('AAAA-MM'). Default: Mês atual.
+
+    Returns:
+        Response: O relatório de `ReportController.get_category_month_range`, ou 304/400.
+    """
+    start, end = _selected_range()
+
+    return _conditional_json(
+        "range",
+        lambda version: ReportController.get_category_month_range(current_user.id, start, end),
+        start, end
+    )
+
+
+@report_bp.route("/range", methods=["GET"])
+@login_required
+def report_range_page():
+    """Exibe a evolução mensal de receitas e despesas por categoria em um intervalo de meses.
+
+    A página só traz o formulário e os gráficos: os dados vêm de `report_range_json`.
+
+    Returns:
+        str: O template 'report/range.html'.
+    """
+    start, end = _selected_range()
+
+    return render_template("report/range.html", start= start, end= end)
@@ -1,9 +1,12 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from controllers.wallet_controller import WalletController
 from controllers.category_controller import CategoryController
 from controllers.transaction_controller import TransactionController
-from utils.exceptions import CarteiraInexistenteError, SaldoInsuficienteError, CarteiraInexistenteError, ValorInvalidoError, TransacaoInexistenteError
+from controllers.report_controller import ReportController
+from controllers.import_controller import ImportController
+from utils.exceptions import CarteiraInexistenteError, SaldoInsuficienteError, CarteiraInexistenteError, ValorInvalidoError, TransacaoInexistenteError, CategoriaInexistenteError, ArquivoInvalidoError
+from utils.pagination import normalize_page_size
 from datetime import datetime
 
 
@@ -14,38 +17,50 @@ transaction_bp = Blueprint("transaction_bp", __name__, url_prefix="/transaction"
 def transaction_page():
     """Exibe o histórico de transações filtrado por mês e ano.
 
-    Calcula os totais (Receitas, Despesas e Saldo) com base nas transações
-    do período selecionado. Se nenhum mês/ano for informado, utiliza a data atual.
+    A listagem é paginada por cursor (`after`/`before`), carregando apenas uma
+    página por vez. Os totais (Receitas, Despesas e Saldo) vêm de uma agregação
+    separada do período inteiro, então não mudam ao navegar entre as páginas.
+    Se nenhum mês/ano for informado, utiliza a data atual.
 
     Query Args:
         month (int, optional): Mês para filtro (padrão: mês atual).
         year (int, optional): Ano para filtro (padrão: ano atual).
+        after (str, optional): Cursor da próxima página.
+        before (str, optional): Cursor da página anterior.
+        per_page (int, optional): Quantidade de transações por página.
 
     Returns:
-        str: O template 'transaction/index.html' com a lista de transações e o sumário financeiro.
+        str: O template 'transaction/index.html' com a página de transações e o sumário financeiro.
     """
     today = datetime.now()
 
     selected_month = request.args.get("month", today.month, type=int)
     selected_year = request.args.get("year", today.year, type=int)
+    per_page = normalize_page_size(request.args.get("per_page"))
 
-    transactions = TransactionController.get_user_transactions(
-        user_id=current_user.id,
-        month=selected_month,
-        year=selected_year
-    )
-    
-    total_income = sum(t.value for t in transactions if t.transaction_type == "income")
-    total_expense = sum(t.value for t in transactions if t.transaction_type == "expense")
-    total_balance = total_income - total_expense
+    try:
+        page = TransactionController.get_user_transactions_page(
+            user_id=current_user.id,
+            month=selected_month,
+            year=selected_year,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            per_page=per_page
+        )
+        summary = ReportController.get_monthly_summary(current_user.id, selected_month, selected_year)
+    except ValorInvalidoError as e:
+        flash(str(e), "warning")
+        return redirect(url_for("transaction_bp.transaction_page"))
 
     categories = CategoryController.get_user_categories(user_id= current_user.id)
 
     return render_template("transaction/index.html", 
-                           transactions=transactions, 
-                           total_income=total_income, 
-                           total_expense=total_expense, 
-                           total_balance=total_balance,
+                           transactions=page["items"], 
+                           page=page,
+                           total_income=summary["income"], 
+                           total_expense=summary["expense"], 
+                           total_balance=summary["balance"],
+                           total_count=summary["count"],
                            categories = categories,
                            selected_month=selected_month,
                            selected_year=selected_year)
@@ -106,6 +121,76 @@ def transaction_create():
     flash("Transação criada com sucesso!", "success")
     return redirect(url_for("main_bp.dashboard_page"))
 
+@transaction_bp.route("/import", methods=["GET"])
+@login_required
+def transaction_import_page():
+    """Exibe o formulário de importação de extratos (CSV/OFX).
+
+    Returns:
+        str: O template 'transaction/import.html'.
+    """
+    wallets = WalletController.get_wallets_by_user(user_id= current_user.id)
+    categories = CategoryController.get_user_categories(user_id= current_user.id)
+
+    return render_template("transaction/import.html", user_wallets= wallets, user_categories= categories)
+
+@transaction_bp.route("/import", methods=["POST"])
+@login_required
+def transaction_import():
+    """Processa a importação de um extrato bancário.
+
+    Delega a leitura e a gravação em lote ao ImportController. Em caso de sucesso,
+    renderiza novamente o formulário com o relatório (quantidade importada e
+    erros por linha), já que as linhas recusadas precisam ser exibidas ao usuário.
+    Com `JOBS_IN_BACKGROUND`, a importação é enfileirada para um worker.
+
+    Returns:
+        str|Werkzeug.wrappers.response.Response: O template com o relatório da importação
+        ou redirecionamento para o formulário em caso de falha.
+    """
+    statement = request.files.get("statement")
+    wallet_id = request.form.get("wallet_id")
+    category_id = request.form.get("category_id")
+
+    if not statement or not statement.filename:
+        flash("Selecione um arquivo para importar.", "warning")
+        return redirect(url_for("transaction_bp.transaction_import_page"))
+
+    try:
+        if current_app.config["JOBS_IN_BACKGROUND"]:
+            # O worker (`flask worker`) faz a importação; o resultado fica em /jobs/<id>
+            job = ImportController.enqueue_import(
+                stream=statement.stream,
+                filename=statement.filename,
+                wallet_id=wallet_id,
+                user_id=current_user.id,
+                default_category_id=category_id
+            )
+            flash(f"Importação agendada (tarefa #{job.id}).", "success")
+            return redirect(url_for("transaction_bp.transaction_import_page"))
+
+        report = ImportController.import_statement(
+            stream=statement.stream,
+            filename=statement.filename,
+            wallet_id=wallet_id,
+            user_id=current_user.id,
+            default_category_id=category_id
+        )
+    except (CarteiraInexistenteError, CategoriaInexistenteError, ArquivoInvalidoError, SaldoInsuficienteError) as e:
+        flash(str(e), "warning")
+        return redirect(url_for("transaction_bp.transaction_import_page"))
+    except Exception as e:
+        flash("Ocorreu um erro ao importar o extrato.", "error")
+        print("Erro não tratado:", e)
+        return redirect(url_for("transaction_bp.transaction_import_page"))
+
+    flash(f"{report['imported']} transação(ões) importada(s).", "success" if not report["errors"] else "warning")
+
+    wallets = WalletController.get_wallets_by_user(user_id= current_user.id)
+    categories = CategoryController.get_user_categories(user_id= current_user.id)
+
+    return render_template("transaction/import.html", user_wallets= wallets, user_categories= categories, report= report)
+
 @transaction_bp.route("/<int:transaction_id>/delete", methods=["POST"])
 @login_required
 def delete_transaction(transaction_id):
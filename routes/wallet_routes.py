@@ -1,9 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from controllers.wallet_controller import WalletController
 from controllers.transaction_controller import TransactionController
 from controllers.category_controller import CategoryController
 from utils.exceptions import ValorInvalidoError, CarteiraJaExisteError, CarteiraInexistenteError
+from utils.pagination import normalize_page_size
 
 wallet_bp = Blueprint("wallet_bp", __name__, url_prefix="/wallet")
 
@@ -50,12 +51,17 @@ def create_wallet():
 def wallet_detail_page(wallet_id):
     """Exibe os detalhes de uma carteira específica.
 
-    Mostra o saldo atual e o histórico de transações vinculadas a esta carteira.
-    Verifica se a carteira pertence ao usuário logado.
+    Mostra o saldo atual e o histórico de transações vinculadas a esta carteira,
+    paginado por cursor (`after`/`before`). Verifica se a carteira pertence ao usuário logado.
 
     Args:
         wallet_id (int): O ID da carteira a ser visualizada.
 
+    Query Args:
+        after (str, optional): Cursor da próxima página.
+        before (str, optional): Cursor da página anterior.
+        per_page (int, optional): Quantidade de transações por página.
+
     Returns:
         str: O template 'wallet/detail.html' com dados da carteira, transações e categorias.
     """
@@ -65,10 +71,20 @@ def wallet_detail_page(wallet_id):
         flash(str(e), "error")
         return redirect(url_for("main_bp.dashboard_page"))  
     
-    transactions = TransactionController.get_transactions_by_wallet(wallet_id)
+    try:
+        page = TransactionController.get_transactions_by_wallet_page(
+            wallet_id,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            per_page=normalize_page_size(request.args.get("per_page"))
+        )
+    except ValorInvalidoError as e:
+        flash(str(e), "warning")
+        return redirect(url_for("wallet_bp.wallet_detail_page", wallet_id=wallet_id))
+
     categories = CategoryController.get_user_categories(user_id=current_user.id)
 
-    return render_template("wallet/detail.html", wallet= wallet, transactions= transactions, categories= categories)
+    return render_template("wallet/detail.html", wallet= wallet, transactions= page["items"], page= page, categories= categories)
 
 @wallet_bp.route("/<int:wallet_id>/delete", methods=["POST"])
 @login_required
@@ -76,6 +92,7 @@ def delete_wallet(wallet_id):
     """Remove uma carteira do sistema.
 
     Exclui a carteira permanentemente (ou logicamente, dependendo da implementação do Controller).
+    Com `JOBS_IN_BACKGROUND`, a exclusão é enfileirada para um worker.
 
     Args:
         wallet_id (int): O ID da carteira a ser removida.
@@ -84,11 +101,14 @@ def delete_wallet(wallet_id):
         Werkzeug.wrappers.response.Response: Redirecionamento para o dashboard.
     """
     try:
+        if current_app.config["JOBS_IN_BACKGROUND"]:
+            # Carteiras com histórico longo: a exclusão fica para o worker (`flask worker`)
+            job = WalletController.delete_wallet(wallet_id, current_user.id, background= True)
+            flash(f"Exclusão da carteira agendada (tarefa #{job.id}).", "success")
+            return redirect(url_for("main_bp.dashboard_page"))
+
         WalletController.delete_wallet(wallet_id, current_user.id)
         #wallet = WalletController.deactivate_wallet(wallet_id, current_user.id)
-    except AcessoNegadoError as e:
-        flash(str(e), "error")
-        return redirect(url_for("main_bp.dashboard_page"))
     except CarteiraInexistenteError as e:
         flash(str(e), "error")
         return redirect(url_for("main_bp.dashboard_page"))
@@ -0,0 +1,859 @@
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+
+def timed(function, repeat=3):
+    """Executa uma função algumas vezes e devolve o melhor tempo.
+
+    Args:
+        function (Callable): A função a medir (sem argumentos).
+        repeat (int, optional): Quantidade de execuções.
+
+    Returns:
+        tuple[float, Any]: O menor tempo em segundos e o retorno da última execução.
+    """
+    best, result = None, None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def benchmark_money_aggregation(rows=1_000_000, users=1_000, seed=42):
+    """Compara agregações de um livro-caixa grande gravado em reais (REAL) e em centavos (INTEGER).
+
+    Monta em memória duas tabelas com os mesmos lançamentos aleatórios (valores com
+    duas casas decimais) e mede, para cada uma, a soma agrupada por usuário e mês
+    feita pelo SQLite e a soma feita em Python sobre todas as linhas (como fazia o
+    antigo `get_monthly_summary`). Também mede o erro do total em relação à soma exata.
+    Não usa o banco da aplicação.
+
+    Args:
+        rows (int, optional): Quantidade de lançamentos.
+        users (int, optional): Quantidade de usuários distintos.
+        seed (int, optional): Semente do gerador aleatório (resultados reproduzíveis).
+
+    Returns:
+        dict: Para "float" e "cents", os tempos em segundos ("sql_group_by" e
+        "python_sum") e o "error" do total em reais. Inclui também "rows".
+    """
+    generator = random.Random(seed)
+    ledger = [
+        (generator.randint(1, users), generator.randint(1, 12), generator.randint(1, 500_000))
+        for _ in range(rows)
+    ]
+    exact_total = sum(Decimal(cents) for _, _, cents in ledger) / 100
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE ledger_float (user_id INTEGER, month INTEGER, value REAL)")
+    connection.execute("CREATE TABLE ledger_cents (user_id INTEGER, month INTEGER, value INTEGER)")
+    connection.executemany("INSERT INTO ledger_float VALUES (?, ?, ?)",
+                           ((user_id, month, cents / 100) for user_id, month, cents in ledger))
+    connection.executemany("INSERT INTO ledger_cents VALUES (?, ?, ?)", ledger)
+
+    results = {"rows": rows}
+
+    for name, table, to_units in (("float", "ledger_float", lambda total: total),
+                                  ("cents", "ledger_cents", lambda total: Decimal(total) / 100)):
+        group_by, _ = timed(lambda: connection.execute(
+            f"SELECT user_id, month, SUM(value) FROM {table} GROUP BY user_id, month"
+        ).fetchall())
+
+        python_sum, total = timed(lambda: sum(
+            value for (value,) in connection.execute(f"SELECT value FROM {table}")
+        ))
+
+        results[name] = {
+            "sql_group_by": group_by,
+            "python_sum": python_sum,
+            "error": float(abs(Decimal(to_units(total)) - exact_total))
+        }
+
+    connection.close()
+    return results
+
+
+def benchmark_report_round_trips(rows=100_000, users=10, seed=42):
+    """Compara o relatório mensal montado em três consultas separadas e na consulta combinada.
+
+    Cria um banco SQLite temporário (fora do banco da aplicação) com `rows` transações
+    aleatórias distribuídas entre `users` usuários ao longo de 2025, gera os totais
+    mensais e mede, sem o `report_cache`, para o mês de junho do primeiro usuário:
+
+    - "ledger_python": o resumo do mês carregando as transações no ORM e somando em
+      Python (como fazia o antigo `get_monthly_summary`).
+    - "separate": `get_monthly_summary`, `get_expenses_by_category` e
+      `get_consolidated_wallet_balance`, uma consulta cada.
+    - "combined": `get_monthly_report`, em uma única consulta.
+
+    Args:
+        rows (int, optional): Quantidade de transações.
+        users (int, optional): Quantidade de usuários (uma carteira e cinco categorias cada).
+        seed (int, optional): Semente do gerador aleatório (resultados reproduzíveis).
+
+    Returns:
+        dict: Para cada modo, o tempo em segundos ("seconds") e a quantidade de
+        comandos enviados ao banco ("queries"). Inclui também "rows".
+    """
+    from flask import Flask
+    from sqlalchemy import event, insert
+    from extensions import db
+    from models.user import User
+    from models.wallet import Wallet
+    from models.category import UserCategory
+    from models.transaction import Transaction
+    from models.monthly_rollup import MonthlyRollup
+    from controllers.report_controller import ReportController
+    from controllers.rollup_controller import RollupController
+
+    generator = random.Random(seed)
+    results = {"rows": rows}
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(directory, "benchmark.db")
+        db.init_app(app)
+
+        with app.app_context():
+            db.create_all()
+
+            db.session.execute(insert(User), [
+                {"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@benchmark", "_password": "-"}
+                for user_id in range(1, users + 1)
+            ])
+            db.session.execute(insert(Wallet), [
+                {"id": user_id, "wallet_name": "Carteira", "user_id": user_id, "initial_balance": 0, "current_balance": 0}
+                for user_id in range(1, users + 1)
+            ])
+            db.session.execute(insert(UserCategory), [
+                {"id": (user_id - 1) * 5 + index, "name": f"Categoria {index}", "user_id": user_id}
+                for user_id in range(1, users + 1) for index in range(1, 6)
+            ])
+
+            ledger = []
+            for _ in range(rows):
+                user_id = generator.randint(1, users)
+                ledger.append({
+                    "transaction_type": generator.choice(("income", "expense", "expense")),
+                    "value": generator.randint(1, 100_000) / 100,
+                    "created_at": date(2025, generator.randint(1, 12), generator.randint(1, 28)),
+                    "wallet_id": user_id,
+                    "category_id": (user_id - 1) * 5 + generator.randint(1, 5)
+                })
+            db.session.execute(insert(Transaction), ledger)
+
+            db.session.execute(insert(MonthlyRollup).from_select(
+                ["wallet_id", "category_id", "year", "month", "transaction_type", "user_id", "total", "count"],
+                RollupController._aggregate_transactions_query()
+            ))
+            db.session.commit()
+
+            def ledger_python():
+                transactions = Transaction.query.join(Wallet)\
+                    .filter(Wallet.user_id == 1)\
+                    .filter(Transaction.created_at >= date(2025, 6, 1), Transaction.created_at < date(2025, 7, 1))\
+                    .all()
+
+                return {
+                    "income": sum(t.value for t in transactions if t.transaction_type == "income"),
+                    "expense": sum(t.value for t in transactions if t.transaction_type == "expense")
+                }
+
+            def separate():
+                return (ReportController._compute_monthly_summary(1, 6, 2025),
+                        ReportController._expenses_by_category_query(1, 6, 2025).all(),
+                        ReportController._consolidated_balance_query(1).scalar())
+
+            def combined():
+                return db.session.execute(ReportController._monthly_report_query(1, 6, 2025)).all()
+
+            statements = []
+
+            def count_statement(*args):
+                statements.append(1)
+
+            event.listen(db.engine, "before_cursor_execute", count_statement)
+
+            try:
+                for name, function in (("ledger_python", ledger_python), ("separate", separate), ("combined", combined)):
+                    db.session.rollback()
+                    statements.clear()
+                    function()
+                    queries = len(statements)
+
+                    seconds, _ = timed(lambda: (function(), db.session.rollback()), repeat= 20)
+                    results[name] = {"seconds": seconds, "queries": queries}
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count_statement)
+
+            db.session.remove()
+            db.engine.dispose()
+
+    return results
+
+
+def _percentile(values, percent):
+    """Percentil por posição (nearest-rank) de uma lista de valores."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def benchmark_routes(sizes=(100, 1_000, 5_000), users=5, wallets=2, requests=20, cache="memory", seed=42):
+    """Mede as rotas da aplicação, pelo cliente de teste do Flask, com massas de dados crescentes.
+
+    Para cada tamanho, cria um banco SQLite temporário com `seed_synthetic_data`
+    (`users` usuários, `wallets` carteiras cada e `size` transações por carteira),
+    entra como o primeiro usuário e chama cada rota `requests` vezes (após uma
+    chamada de aquecimento). As rotas de criação gravam um registro novo a cada chamada.
+
+    Args:
+        sizes (Iterable[int], optional): Transações por carteira em cada rodada.
+        users (int, optional): Quantidade de usuários gerados.
+        wallets (int, optional): Carteiras por usuário.
+        requests (int, optional): Chamadas medidas por rota.
+        cache (str, optional): O `REPORT_CACHE_BACKEND` usado ("memory", "sqlite" ou "none").
+        seed (int, optional): Semente dos dados sintéticos.
+
+    Returns:
+        dict: "parameters" (os argumentos da execução) e "runs", uma entrada por tamanho
+        com "size", "transactions" (total gerado) e "routes": para cada rota, as latências
+        "p50_ms", "p90_ms", "p99_ms" e "max_ms", as consultas por requisição
+        ("queries_mean" e "queries_max", do cabeçalho `X-DB-Queries`), o pico de
+        memória alocada em uma chamada ("peak_kib", via `tracemalloc`) e os "status" HTTP.
+    """
+    import logging
+    import tracemalloc
+    from app import create_app
+    from extensions import db
+    from models.wallet import Wallet
+    from models.category import UserCategory
+    from utils.seeder import seed_synthetic_data, synthetic_email, SYNTHETIC_PASSWORD
+
+    sql_logger = logging.getLogger("finance.sql")
+    previous_level = sql_logger.level
+    results = {
+        "parameters": {"sizes": list(sizes), "users": users, "wallets": wallets,
+                       "requests": requests, "cache": cache, "seed": seed},
+        "runs": []
+    }
+
+    # As linhas de log por requisição atrapalhariam a saída (avisos de N+1 continuam aparecendo)
+    sql_logger.setLevel(logging.WARNING)
+
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                app = create_app({
+                    "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(directory, "benchmark.db"),
+                    "REPORT_CACHE_BACKEND": cache
+                })
+
+                with app.app_context():
+                    generated = seed_synthetic_data(users= users, wallets= wallets, transactions= size, seed= seed)
+                    user_id = generated["user_ids"][0]
+                    wallet_id = Wallet.query.filter_by(user_id= user_id).first().id
+                    category_id = UserCategory.query.filter_by(user_id= user_id).first().id
+
+                today = date.today()
+                period = f"month={today.month}&year={today.year}"
+                counter = iter(range(1_000_000))
+
+                routes = [
+                    ("dashboard", "GET", "/dashboard", None),
+                    ("transaction_list", "GET", f"/transaction?{period}", None),
+                    ("wallet_detail", "GET", f"/wallet/{wallet_id}", None),
+                    ("goals", "GET", "/goal/", None),
+                    ("objectives", "GET", "/objectives/", None),
+                    ("categories", "GET", "/category/index", None),
+                    ("report", "GET", f"/teste/?{period}", None),
+                    ("report_summary_json", "GET", f"/teste/api/summary?{period}", None),
+                    ("report_range_json", "GET", "/teste/api/range", None),
+                    ("transaction_create", "POST", "/transaction/create", lambda: {
+                        "value": "12.34", "date": str(today), "description": "Benchmark",
+                        "wallet_id": wallet_id, "category_id": category_id, "transaction_type": "expense"
+                    }),
+                    ("category_create", "POST", "/category/create",
+                     lambda: {"category_name": f"Benchmark {next(counter)}"}),
+                    ("goal_create", "POST", "/goal/create", lambda: {
+                        "goal_name": f"Benchmark {next(counter)}", "target_amount": "500",
+                        "category_id": category_id, "duration": "1", "unit": "monthly"
+                    }),
+                    ("objective_create", "POST", "/objectives/create", lambda: {
+                        "objective_name": f"Benchmark {next(counter)}", "target_amount": "5000",
+                        "wallet_id": wallet_id, "icon": "🎯", "due_date": ""
+                    }),
+                ]
+
+                client = app.test_client()
+                client.post("/auth/login", data= {"email": synthetic_email(1, seed), "password": SYNTHETIC_PASSWORD})
+
+                def call(method, url, data):
+                    return client.open(url, method= method, data= data() if data else None)
+
+                run = {"size": size, "transactions": generated["transactions"], "routes": {}}
+
+                for name, method, url, data in routes:
+                    call(method, url, data)
+
+                    latencies, queries, statuses = [], [], set()
+
+                    for _ in range(requests):
+                        started = time.perf_counter()
+                        response = call(method, url, data)
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        queries.append(int(response.headers.get("X-DB-Queries", 0)))
+                        statuses.add(response.status_code)
+
+                    tracemalloc.start()
+                    try:
+                        call(method, url, data)
+                        _, peak = tracemalloc.get_traced_memory()
+                    finally:
+                        tracemalloc.stop()
+
+                    run["routes"][name] = {
+                        "p50_ms": round(_percentile(latencies, 50), 3),
+                        "p90_ms": round(_percentile(latencies, 90), 3),
+                        "p99_ms": round(_percentile(latencies, 99), 3),
+                        "max_ms": round(max(latencies), 3),
+                        "queries_mean": round(sum(queries) / len(queries), 2),
+                        "queries_max": max(queries),
+                        "peak_kib": round(peak / 1024, 1),
+                        "status": sorted(statuses)
+                    }
+
+                results["runs"].append(run)
+
+                with app.app_context():
+                    db.session.remove()
+                    db.engine.dispose()
+    finally:
+        sql_logger.setLevel(previous_level)
+
+    return results
+
+
+def benchmark_sqlite_profiles(profiles=None, writes=2_000, reads=5_000, threads=4, rows=50_000, seed=42):
+    """Mede a vazão de escrita e de leitura de cada perfil de PRAGMAs do SQLite.
+
+    Para cada perfil, cria um banco temporário com um livro-caixa de `rows` linhas
+    (fora do banco da aplicação) e mede, com `threads` threads concorrentes:
+
+    - "writes_per_s": commits por segundo, cada um com um INSERT (como um lançamento).
+    - "reads_per_s": consultas agregadas por segundo (soma de um usuário em um mês)
+      enquanto uma thread extra continua gravando; "writes_during_reads" conta os
+      commits que essa thread conseguiu fazer no mesmo intervalo.
+    - "locked_errors": quantas operações falharam com 'database is locked'.
+
+    Args:
+        profiles (Iterable[str], optional): Os perfis de `SQLITE_PRAGMA_PROFILES` (padrão: todos).
+        writes (int, optional): Total de commits na fase de escrita.
+        reads (int, optional): Total de consultas na fase de leitura.
+        threads (int, optional): Threads concorrentes em cada fase.
+        rows (int, optional): Linhas do livro-caixa inicial.
+        seed (int, optional): Semente do gerador aleatório.
+
+    Returns:
+        dict: Os resultados por perfil.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+    from utils.database import SQLITE_PRAGMA_PROFILES, resolve_pragmas, configure_engine
+
+    results = {}
+
+    for profile in profiles or SQLITE_PRAGMA_PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine("sqlite:///" + os.path.join(directory, "benchmark.db"),
+                                   pool_size= threads + 1, max_overflow= 0)
+            configure_engine(engine, resolve_pragmas(profile))
+
+            generator = random.Random(seed)
+            with engine.begin() as connection:
+                connection.exec_driver_sql(
+                    "CREATE TABLE ledger (id INTEGER PRIMARY KEY, user_id INTEGER, month INTEGER, value INTEGER)")
+                connection.exec_driver_sql("CREATE INDEX ix_ledger_user_month ON ledger (user_id, month)")
+                connection.execute(text("INSERT INTO ledger (user_id, month, value) VALUES (:user_id, :month, :value)"), [
+                    {"user_id": generator.randint(1, 1_000), "month": generator.randint(1, 12),
+                     "value": generator.randint(1, 100_000)}
+                    for _ in range(rows)
+                ])
+
+            insert_row = text("INSERT INTO ledger (user_id, month, value) VALUES (:user_id, :month, :value)")
+            sum_month = text("SELECT SUM(value) FROM ledger WHERE user_id = :user_id AND month = :month")
+            locked = []
+
+            def write(count, worker):
+                local = random.Random(seed + worker)
+                done = 0
+
+                for _ in range(count):
+                    try:
+                        with engine.begin() as connection:
+                            connection.execute(insert_row, {"user_id": local.randint(1, 1_000),
+                                                            "month": local.randint(1, 12), "value": 100})
+                        done += 1
+                    except OperationalError:
+                        locked.append(1)
+
+                return done
+
+            def read(count, worker):
+                local = random.Random(seed + worker)
+
+                with engine.connect() as connection:
+                    for _ in range(count):
+                        try:
+                            connection.execute(sum_month, {"user_id": local.randint(1, 1_000),
+                                                           "month": local.randint(1, 12)}).scalar()
+                        except OperationalError:
+                            locked.append(1)
+                        connection.rollback()
+
+            with ThreadPoolExecutor(max_workers= threads) as executor:
+                started = time.perf_counter()
+                written = sum(executor.map(write, [writes // threads] * threads, range(threads)))
+                write_seconds = time.perf_counter() - started
+
+            stop = threading.Event()
+            background_writes = []
+
+            def keep_writing():
+                count = 0
+                while not stop.is_set():
+                    count += write(1, threads)
+                background_writes.append(count)
+
+            writer = threading.Thread(target= keep_writing)
+            writer.start()
+
+            with ThreadPoolExecutor(max_workers= threads) as executor:
+                started = time.perf_counter()
+                list(executor.map(read, [reads // threads] * threads, range(threads)))
+                read_seconds = time.perf_counter() - started
+
+            stop.set()
+            writer.join()
+            engine.dispose()
+
+            results[profile] = {
+                "writes_per_s": round(written / write_seconds, 1),
+                "reads_per_s": round(reads // threads * threads / read_seconds, 1),
+                "writes_during_reads": background_writes[0],
+                "locked_errors": len(locked)
+            }
+
+    return results
+
+
+def benchmark_user_loader(requests=2_000, threads=4, seed=42):
+    """Compara a vazão de requisições autenticadas com e sem o cache do `user_loader`.
+
+    Para cada modo, cria um banco temporário com um usuário sintético pequeno, abre
+    `threads` clientes de teste logados (um por thread) e divide entre eles
+    `requests` chamadas a uma página leve (`/category/index`).
+
+    Args:
+        requests (int, optional): Total de requisições medidas em cada modo.
+        threads (int, optional): Threads concorrentes (cada uma com a sua sessão).
+        seed (int, optional): Semente dos dados sintéticos.
+
+    Returns:
+        dict: Para "cached" e "uncached", as chaves "requests_per_s",
+        "queries_per_request" (do cabeçalho `X-DB-Queries`) e "status" (códigos HTTP).
+    """
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+    from app import create_app
+    from extensions import db
+    from utils.seeder import seed_synthetic_data, synthetic_email, SYNTHETIC_PASSWORD
+
+    sql_logger = logging.getLogger("finance.sql")
+    previous_level = sql_logger.level
+    results = {}
+
+    sql_logger.setLevel(logging.WARNING)
+
+    try:
+        for mode, enabled in (("uncached", False), ("cached", True)):
+            with tempfile.TemporaryDirectory() as directory:
+                app = create_app({
+                    "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(directory, "benchmark.db"),
+                    "USER_CACHE_ENABLED": enabled
+                })
+
+                with app.app_context():
+                    seed_synthetic_data(users= 1, wallets= 1, transactions= 10, goals= 0, objectives= 0, seed= seed)
+
+                clients = []
+
+                for _ in range(max(1, threads)):
+                    client = app.test_client()
+                    client.post("/auth/login", data= {"email": synthetic_email(1, seed), "password": SYNTHETIC_PASSWORD})
+                    client.get("/category/index")
+                    clients.append(client)
+
+                def run(client, count):
+                    queries, statuses = 0, set()
+
+                    for _ in range(count):
+                        response = client.get("/category/index")
+                        queries += int(response.headers.get("X-DB-Queries", 0))
+                        statuses.add(response.status_code)
+
+                    return queries, statuses
+
+                per_client = requests // len(clients)
+
+                with ThreadPoolExecutor(max_workers= len(clients)) as executor:
+                    started = time.perf_counter()
+                    outcomes = list(executor.map(run, clients, [per_client] * len(clients)))
+                    seconds = time.perf_counter() - started
+
+                total = per_client * len(clients)
+                results[mode] = {
+                    "requests_per_s": round(total / seconds, 1),
+                    "queries_per_request": round(sum(queries for queries, _ in outcomes) / total, 2),
+                    "status": sorted(set().union(*(statuses for _, statuses in outcomes)))
+                }
+
+                with app.app_context():
+                    db.session.remove()
+                    db.engine.dispose()
+    finally:
+        sql_logger.setLevel(previous_level)
+
+    return results
+
+
+def benchmark_login_burst(logins=64, threads=8, workers=(0, 2), queue_limit=32, probes=50, seed=42):
+    """Mede o p99 do login durante uma rajada e o efeito dela sobre as outras rotas.
+
+    Para cada valor de `workers` (`PASSWORD_HASH_WORKERS`; 0 faz o hash na própria
+    requisição), cria um banco temporário com um usuário sintético e:
+
+    1. Mede `probes` chamadas a uma página leve (`/category/index`) sem carga ("idle").
+    2. Dispara `logins` logins a partir de `threads` threads (um cliente por thread)
+       e, ao mesmo tempo, chama a mesma página em uma thread à parte ("during_burst").
+
+    Args:
+        logins (int, optional): Total de logins da rajada.
+        threads (int, optional): Threads concorrentes fazendo login.
+        workers (Iterable[int], optional): Os tamanhos de pool comparados.
+        queue_limit (int, optional): O `PASSWORD_HASH_QUEUE_LIMIT` usado.
+        probes (int, optional): Chamadas à página leve na medição sem carga.
+        seed (int, optional): Semente dos dados sintéticos.
+
+    Returns:
+        dict: Uma entrada por tamanho de pool ("inline" para 0, "pool_<n>" nos demais),
+        com "login" (p50_ms, p99_ms, ok e rejected: logins recusados por fila cheia) e
+        "other_route" ("idle" e "during_burst", cada um com p50_ms, p99_ms e count).
+    """
+    import logging
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from app import create_app
+    from extensions import db
+    from utils.seeder import seed_synthetic_data, synthetic_email, SYNTHETIC_PASSWORD
+
+    sql_logger = logging.getLogger("finance.sql")
+    previous_level = sql_logger.level
+    results = {}
+    credentials = {"email": synthetic_email(1, seed), "password": SYNTHETIC_PASSWORD}
+
+    def summary(latencies):
+        return {
+            "p50_ms": round(_percentile(latencies, 50), 2),
+            "p99_ms": round(_percentile(latencies, 99), 2),
+            "count": len(latencies)
+        }
+
+    sql_logger.setLevel(logging.WARNING)
+
+    try:
+        for pool_size in workers:
+            with tempfile.TemporaryDirectory() as directory:
+                app = create_app({
+                    "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(directory, "benchmark.db"),
+                    "PASSWORD_HASH_WORKERS": pool_size,
+                    "PASSWORD_HASH_QUEUE_LIMIT": queue_limit
+                })
+
+                with app.app_context():
+                    seed_synthetic_data(users= 1, wallets= 1, transactions= 10, goals= 0, objectives= 0, seed= seed)
+
+                prober = app.test_client()
+                prober.post("/auth/login", data= credentials)
+
+                def probe():
+                    started = time.perf_counter()
+                    prober.get("/category/index")
+                    return (time.perf_counter() - started) * 1000
+
+                probe()
+                idle = [probe() for _ in range(probes)]
+
+                done = threading.Event()
+                during_burst = []
+
+                def keep_probing():
+                    while not done.is_set():
+                        during_burst.append(probe())
+
+                def login_many(count):
+                    client = app.test_client()
+                    outcomes = []
+
+                    for _ in range(count):
+                        started = time.perf_counter()
+                        response = client.post("/auth/login", data= credentials)
+                        elapsed = (time.perf_counter() - started) * 1000
+                        # Sucesso redireciona para o dashboard; recusa volta para o login
+                        outcomes.append((elapsed, "/dashboard" in response.headers.get("Location", "")))
+                        client.get("/auth/logout")
+
+                    return outcomes
+
+                background = threading.Thread(target= keep_probing)
+                background.start()
+
+                try:
+                    with ThreadPoolExecutor(max_workers= threads) as executor:
+                        outcomes = [
+                            outcome
+                            for batch in executor.map(login_many, [logins // threads] * threads)
+                            for outcome in batch
+                        ]
+                finally:
+                    done.set()
+                    background.join()
+
+                login_latencies = [elapsed for elapsed, ok in outcomes if ok] or [0.0]
+
+                results["inline" if pool_size == 0 else f"pool_{pool_size}"] = {
+                    "login": dict(
+                        summary(login_latencies),
+                        ok= sum(1 for _, ok in outcomes if ok),
+                        rejected= sum(1 for _, ok in outcomes if not ok)
+                    ),
+                    "other_route": {"idle": summary(idle), "during_burst": summary(during_burst or [0.0])}
+                }
+
+                with app.app_context():
+                    db.session.remove()
+                    db.engine.dispose()
+    finally:
+        sql_logger.setLevel(previous_level)
+
+    return results
+
+
+def stress_balances(threads=8, operations=200, initial_balance="100.00", seed=42):
+    """Dispara lançamentos simultâneos na mesma carteira e compara o saldo final com o livro-caixa.
+
+    Cria um banco temporário com um usuário, uma carteira e uma categoria. Cada thread
+    faz `operations` operações sorteadas (receita, despesa, edição ou exclusão de uma
+    transação qualquer, inclusive de outra thread) pelos métodos do
+    `TransactionController`. As despesas são grandes em relação ao saldo, para que as
+    recusas por saldo insuficiente aconteçam junto com as outras escritas. Ao final, o
+    saldo gravado deve ser igual à soma das transações (`find_drift`). O saldo pode
+    terminar negativo: excluir ou reduzir uma receita já gasta não é bloqueado.
+
+    Args:
+        threads (int, optional): Threads concorrentes.
+        operations (int, optional): Operações por thread.
+        initial_balance (str, optional): O saldo inicial da carteira.
+        seed (int, optional): Semente do sorteio das operações.
+
+    Returns:
+        dict: As chaves "operations" (total), "outcomes" (quantidade por resultado: "ok"
+        ou o nome da exceção), "balance" (saldo gravado), "expected" (soma das
+        transações), "drift" (o retorno de `find_drift`) e "seconds".
+    """
+    import logging
+    import threading
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import select, func, case
+    from app import create_app
+    from extensions import db
+    from models.transaction import Transaction
+    from models.wallet import Wallet
+    from controllers.auth_controller import AuthController
+    from controllers.wallet_controller import WalletController
+    from controllers.category_controller import CategoryController
+    from controllers.transaction_controller import TransactionController
+    from utils.reconciliation import find_drift
+
+    sql_logger = logging.getLogger("finance.sql")
+    previous_level = sql_logger.level
+    sql_logger.setLevel(logging.WARNING)
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            app = create_app({
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(directory, "stress.db"),
+                "PASSWORD_HASH_WORKERS": 0
+            })
+
+            with app.app_context():
+                user = AuthController.register("stress", "stress@example.com", "stress", "stress")
+                user_id = user.id
+                wallet_id = WalletController.create_wallet("Stress", initial_balance, user_id).id
+                category_id = CategoryController.create_category("Stress", user_id).id
+                db.session.remove()
+
+            transaction_ids = []
+            lock = threading.Lock()
+
+            def run(worker):
+                generator = random.Random(seed + worker)
+                outcomes = Counter()
+
+                for _ in range(operations):
+                    action = generator.choice(("income", "expense", "expense", "edit", "delete"))
+                    value = f"{generator.uniform(0.01, 60):.2f}"
+
+                    with lock:
+                        target = generator.choice(transaction_ids) if transaction_ids else None
+
+                    if action in ("edit", "delete") and target is None:
+                        continue
+
+                    # Um contexto (e uma sessão do banco) por operação, como em uma requisição
+                    with app.app_context():
+                        try:
+                            if action in ("income", "expense"):
+                                transaction = TransactionController.create_transaction(
+                                    action, value, wallet_id, category_id, user_id, "stress", "2026-01-15"
+                                )
+                                with lock:
+                                    transaction_ids.append(transaction.id)
+                            elif action == "edit":
+                                TransactionController.edit_transaction(
+                                    target, value, "2026-01-15", "stress", category_id, user_id
+                                )
+                            else:
+                                TransactionController.delete_transaction(target, user_id)
+
+                            outcomes["ok"] += 1
+                        except Exception as e:
+                            db.session.rollback()
+                            outcomes[type(e).__name__] += 1
+
+                return outcomes
+
+            started = time.perf_counter()
+
+            with ThreadPoolExecutor(max_workers= threads) as executor:
+                outcomes = sum(executor.map(run, range(threads)), Counter())
+
+            seconds = time.perf_counter() - started
+
+            with app.app_context():
+                balance = db.session.get(Wallet, wallet_id).current_balance
+                expected = db.session.execute(
+                    select(func.sum(case(
+                        (Transaction.transaction_type == "income", Transaction.value),
+                        else_= -Transaction.value
+                    ))).where(Transaction.wallet_id == wallet_id)
+                ).scalar()
+                drift = find_drift(user_id, user_id)
+                db.session.remove()
+                db.engine.dispose()
+    finally:
+        sql_logger.setLevel(previous_level)
+
+    return {
+        "operations": threads * operations,
+        "outcomes": dict(outcomes),
+        "balance": balance,
+        "expected": expected,
+        "drift": drift,
+        "seconds": round(seconds, 2)
+    }
+
+
+def check_query_counts(sizes=(1, 200), per_page=100, seed=42):
+    """Verifica que as listagens executam a mesma quantidade de consultas com poucas e muitas linhas.
+
+    Para cada tamanho, cria um banco temporário com `seed_synthetic_data` (um usuário,
+    duas carteiras e `size` transações por carteira no mês atual, espalhadas por todas
+    as categorias sintéticas) e abre, com `per_page` linhas por página, o extrato do
+    mês, o detalhe de uma carteira e o dashboard. Uma carteira ou categoria carregada
+    sob demanda por linha (N+1) faria a contagem crescer com o tamanho, já que a
+    página maior referencia mais categorias distintas.
+
+    Args:
+        sizes (Iterable[int], optional): Transações por carteira em cada rodada (a primeira é a referência).
+        per_page (int, optional): Linhas por página nas listagens.
+        seed (int, optional): Semente dos dados sintéticos.
+
+    Returns:
+        dict: Para cada rota, "queries" (tamanho -> consultas executadas) e "ok"
+        (False se algum tamanho diferiu da referência).
+    """
+    import logging
+    from app import create_app
+    from extensions import db
+    from models.wallet import Wallet
+    from utils.seeder import seed_synthetic_data, synthetic_email, SYNTHETIC_PASSWORD, SYNTHETIC_CATEGORIES
+
+    sql_logger = logging.getLogger("finance.sql")
+    previous_level = sql_logger.level
+    sql_logger.setLevel(logging.WARNING)
+
+    today = date.today()
+    results = {}
+
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                app = create_app({
+                    "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(directory, "query_counts.db"),
+                    "REPORT_CACHE_BACKEND": "none"
+                })
+
+                with app.app_context():
+                    seed_synthetic_data(
+                        users= 1, wallets= 2, transactions= size, categories= len(SYNTHETIC_CATEGORIES),
+                        goals= 0, objectives= 0, start= today.replace(day= 1), end= today, seed= seed
+                    )
+                    wallet_id = db.session.execute(db.select(Wallet.id).order_by(Wallet.id)).scalars().first()
+
+                client = app.test_client()
+                client.post("/auth/login", data= {"email": synthetic_email(1, seed), "password": SYNTHETIC_PASSWORD})
+
+                routes = {
+                    "transaction_list": f"/transaction?month={today.month}&year={today.year}&per_page={per_page}",
+                    "wallet_detail": f"/wallet/{wallet_id}?per_page={per_page}",
+                    "dashboard": "/dashboard"
+                }
+
+                for name, url in routes.items():
+                    result = results.setdefault(name, {"queries": {}, "ok": True})
+                    count = int(client.get(url).headers["X-DB-Queries"])
+                    reference = next(iter(result["queries"].values()), count)
+
+                    result["queries"][size] = count
+                    result["ok"] = result["ok"] and count == reference
+
+                with app.app_context():
+                    db.session.remove()
+                    db.engine.dispose()
+    finally:
+        sql_logger.setLevel(previous_level)
+
+    return results
@@ -0,0 +1,464 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from flask import current_app, has_app_context
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 300
+DEFAULT_FLUSH_INTERVAL = 5
+DEFAULT_STATS_INTERVAL = 60
+
+EXTENSION_KEY = "report_cache"
+STATS_EXTENSION_KEY = "report_cache_stats_at"
+
+# O mesmo logger das medidas de SQL por requisição (ver `utils.query_stats`)
+logger = logging.getLogger("finance.sql")
+
+
+class MemoryCacheBackend():
+    """Cache LRU com expiração (TTL) mantido na memória do processo.
+
+    Indicado quando a aplicação roda em um único processo: cada worker teria a
+    sua própria cópia, e a invalidação feita em um não chegaria aos outros.
+
+    Args:
+        max_entries (int): Quantidade máxima de entradas; a menos usada recentemente sai primeiro.
+        ttl (float): Tempo de vida de cada entrada, em segundos.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        """Busca uma entrada válida.
+
+        Returns:
+            tuple[bool, Any]: (True, valor) se a entrada existir e não tiver expirado;
+            (False, None) caso contrário.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._counters["misses"] += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return True, entry[1]
+
+    def set(self, key, value):
+        """Grava uma entrada, descartando as menos usadas se o limite for atingido."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last= False)
+                self._counters["evictions"] += 1
+
+    def delete_prefix(self, prefix):
+        """Remove todas as entradas cuja chave começa com `prefix`."""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+
+            for key in keys:
+                del self._entries[key]
+
+            self._counters["invalidations"] += len(keys)
+
+    def stats(self):
+        """Retorna os contadores do cache e a quantidade de entradas atuais."""
+        with self._lock:
+            return dict(self._counters, entries= len(self._entries))
+
+
+class SQLiteCacheBackend():
+    """Cache LRU com expiração (TTL) gravado em um arquivo SQLite local.
+
+    Todos os workers da mesma máquina apontam para o mesmo arquivo, então uma
+    invalidação feita por um deles vale para todos. Os valores são gravados em JSON
+    e os contadores ficam no próprio arquivo (são compartilhados entre os workers).
+
+    Uma leitura não escreve no arquivo: o último uso das entradas lidas e os
+    contadores ficam acumulados no processo e são gravados de uma vez a cada
+    `flush_interval` segundos (ou na próxima gravação), para que as leituras dos
+    workers não disputem o lock de escrita do SQLite.
+
+    Args:
+        path (str): O caminho do arquivo do cache.
+        max_entries (int): Quantidade máxima de entradas; a menos usada recentemente sai primeiro.
+        ttl (float): Tempo de vida de cada entrada, em segundos.
+        flush_interval (float): Segundos entre as gravações do uso e dos contadores acumulados.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._counters = {}
+        self._flushed_at = time.monotonic()
+
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_last_used ON cache_entries (last_used)")
+            connection.execute("CREATE TABLE IF NOT EXISTS cache_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    @contextmanager
+    def _connect(self):
+        """Abre uma conexão curta com o arquivo do cache (commit ao sair do bloco)."""
+        connection = sqlite3.connect(self.path, timeout= 5)
+
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _count(self, name, amount=1):
+        """Acumula um contador no processo (gravado no arquivo por `_flush`)."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def _flush(self, connection):
+        """Grava o último uso das entradas lidas e os contadores acumulados desde o último flush."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            counters, self._counters = self._counters, {}
+            self._flushed_at = time.monotonic()
+
+        if touched:
+            connection.executemany(
+                "UPDATE cache_entries SET last_used = MAX(last_used, ?) WHERE key = ?",
+                [(used, key) for key, used in touched.items()]
+            )
+
+        if counters:
+            connection.executemany(
+                "INSERT INTO cache_counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                list(counters.items())
+            )
+
+    def get(self, key):
+        """Busca uma entrada válida.
+
+        Returns:
+            tuple[bool, Any]: (True, valor) se a entrada existir e não tiver expirado;
+            (False, None) caso contrário.
+        """
+        now = time.time()
+
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+
+        if row is None:
+            self._count("misses")
+        else:
+            with self._lock:
+                self._touched[key] = now
+            self._count("hits")
+
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            with self._connect() as connection:
+                self._flush(connection)
+
+        return (False, None) if row is None else (True, json.loads(row[0]))
+
+    def set(self, key, value):
+        """Grava uma entrada, descartando as expiradas e as menos usadas se o limite for atingido."""
+        now = time.time()
+
+        with self._connect() as connection:
+            self._flush(connection)
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl, now)
+            )
+            connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+
+            evicted = connection.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+
+            if evicted:
+                self._count("evictions", evicted)
+
+    def delete_prefix(self, prefix):
+        """Remove todas as entradas cuja chave começa com `prefix`."""
+        with self._connect() as connection:
+            # Intervalo [prefix, prefix + U+FFFF) em vez de LIKE, que não usa a chave primária
+            removed = connection.execute(
+                "DELETE FROM cache_entries WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff")
+            ).rowcount
+
+            if removed:
+                self._count("invalidations", removed)
+
+    def stats(self):
+        """Retorna os contadores do cache e a quantidade de entradas atuais."""
+        with self._connect() as connection:
+            self._flush(connection)
+            counters = dict(connection.execute("SELECT name, value FROM cache_counters").fetchall())
+            entries = connection.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+        stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        stats.update(counters)
+        stats["entries"] = entries
+        return stats
+
+
+class ReportCache():
+    """Cache dos relatórios por usuário e período, com invalidação disparada pelas escritas.
+
+    As chaves seguem o formato '<usuário>:<AAAA-MM>:<relatório>:<versão>' para os dados
+    de um mês e '<usuário>:balance:<versão>' para o patrimônio, onde versão é a versão
+    dos dados do usuário (`get_data_version`). Toda escrita confirmada incrementa a
+    versão, então as entradas anteriores deixam de ser alcançadas mesmo quando a
+    escrita foi feita por outro processo (worker da fila, comandos `flask`) que não
+    tem acesso a este cache. A invalidação por período (`invalidate`) só libera o
+    espaço mais cedo. O backend é escolhido em `init_app` pela configuração
+    `REPORT_CACHE_BACKEND`:
+
+    - "memory" (padrão): `MemoryCacheBackend`, para um único processo.
+    - "sqlite": `SQLiteCacheBackend` em `REPORT_CACHE_PATH`, compartilhado entre workers.
+    - "none": desliga o cache (toda leitura vai ao banco).
+
+    `REPORT_CACHE_MAX_ENTRIES` e `REPORT_CACHE_TTL` (segundos) limitam o tamanho e a idade;
+    `REPORT_CACHE_FLUSH_INTERVAL` é o `flush_interval` do backend "sqlite".
+
+    A cada `REPORT_CACHE_STATS_INTERVAL` segundos (0 desliga), ao fim de uma requisição,
+    os contadores do cache da aplicação em execução são registrados em JSON no logger
+    'finance.sql', que é onde a taxa de acertos do backend "memory" fica visível.
+
+    Cada aplicação guarda o seu próprio backend em `app.extensions`, já que as chaves
+    (usuário e versão dos dados) só fazem sentido dentro de um banco. Pelo mesmo motivo,
+    o arquivo padrão do backend "sqlite" leva no nome um resumo de `SQLALCHEMY_DATABASE_URI`:
+    aplicações com bancos diferentes (benchmarks, comandos de verificação) nunca dividem
+    entradas, mesmo usando a mesma pasta `instance`. Um `REPORT_CACHE_PATH` explícito
+    deve ser exclusivo de um banco.
+    """
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Cria o backend configurado para a aplicação."""
+        kind = app.config.setdefault("REPORT_CACHE_BACKEND", "memory")
+        max_entries = app.config.setdefault("REPORT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        ttl = app.config.setdefault("REPORT_CACHE_TTL", DEFAULT_TTL)
+
+        if kind == "memory":
+            backend = MemoryCacheBackend(max_entries, ttl)
+        elif kind == "sqlite":
+            path = app.config.setdefault("REPORT_CACHE_PATH", self.default_path(app))
+            flush_interval = app.config.setdefault("REPORT_CACHE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+            os.makedirs(os.path.dirname(path), exist_ok= True)
+            backend = SQLiteCacheBackend(path, max_entries, ttl, flush_interval)
+        elif kind == "none":
+            backend = None
+        else:
+            raise ValueError(f"REPORT_CACHE_BACKEND inválido: '{kind}'.")
+
+        app.extensions[EXTENSION_KEY] = backend
+        app.extensions[STATS_EXTENSION_KEY] = time.monotonic()
+
+        stats_interval = app.config.setdefault("REPORT_CACHE_STATS_INTERVAL", DEFAULT_STATS_INTERVAL)
+
+        if backend is None or stats_interval <= 0:
+            return
+
+        @app.after_request
+        def log_report_cache_stats(response):
+            self.log_stats_if_due(stats_interval)
+            return response
+
+    def log_stats_if_due(self, interval):
+        """Registra os contadores no logger 'finance.sql' se `interval` segundos já passaram.
+
+        Args:
+            interval (float): Segundos mínimos entre dois registros da mesma aplicação.
+
+        Returns:
+            bool: True se os contadores foram registrados agora.
+        """
+        now = time.monotonic()
+
+        with self._stats_lock:
+            if now - current_app.extensions.get(STATS_EXTENSION_KEY, 0) < interval:
+                return False
+
+            current_app.extensions[STATS_EXTENSION_KEY] = now
+
+        stats = self.stats()
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["hit_rate"] = round(stats.get("hits", 0) / lookups, 4) if lookups else None
+
+        logger.info(json.dumps({"report_cache": stats}, ensure_ascii= False))
+        return True
+
+    @staticmethod
+    def default_path(app):
+        """Monta o caminho padrão do arquivo do cache, único para o banco da aplicação.
+
+        Returns:
+            str: '<instance>/report_cache-<resumo do URI do banco>.db'.
+        """
+        uri = str(app.config.get("SQLALCHEMY_DATABASE_URI", ""))
+        digest = hashlib.sha1(uri.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(app.instance_path, f"report_cache-{digest}.db")
+
+    @property
+    def backend(self):
+        """O backend da aplicação atual (None sem contexto de aplicação ou com o cache desligado)."""
+        if not has_app_context():
+            return None
+
+        return current_app.extensions.get(EXTENSION_KEY)
+
+    @staticmethod
+    def period_key(user_id, year, month, name, version):
+        """Monta a chave de um relatório mensal na versão `version` dos dados do usuário."""
+        return f"{user_id}:{int(year):04d}-{int(month):02d}:{name}:{int(version)}"
+
+    @staticmethod
+    def user_key(user_id, name, version):
+        """Monta a chave de um relatório que não depende do período, na versão `version` dos dados."""
+        return f"{user_id}:{name}:{int(version)}"
+
+    def get_or_set(self, key, loader):
+        """Devolve o valor em cache ou executa `loader` e guarda o resultado.
+
+        Args:
+            key (str): A chave (ver `period_key` e `user_key`).
+            loader (Callable): Função sem argumentos que calcula o valor (precisa ser
+                serializável em JSON para o backend "sqlite").
+
+        Returns:
+            Any: O valor em cache ou o recém-calculado.
+        """
+        backend = self.backend
+
+        if backend is None:
+            return loader()
+
+        found, value = backend.get(key)
+
+        if found:
+            return value
+
+        value = loader()
+        backend.set(key, value)
+        return value
+
+    def get_or_set_many(self, keys, loader):
+        """Como `get_or_set`, para vários valores calculados de uma só vez.
+
+        Se todas as chaves estiverem em cache, devolve-as sem executar `loader`; basta
+        faltar uma para `loader` ser executado (uma única vez) e todos os valores serem
+        regravados.
+
+        Args:
+            keys (Iterable[str]): As chaves desejadas.
+            loader (Callable): Função sem argumentos que devolve um dict chave -> valor
+                com todas as chaves.
+
+        Returns:
+            dict: Os valores por chave.
+        """
+        backend = self.backend
+
+        if backend is None:
+            return loader()
+
+        values = {}
+
+        for key in keys:
+            found, value = backend.get(key)
+
+            if not found:
+                break
+
+            values[key] = value
+        else:
+            return values
+
+        values = loader()
+
+        for key, value in values.items():
+            backend.set(key, value)
+
+        return values
+
+    def invalidate(self, user_id, periods=None):
+        """Descarta os relatórios de um usuário afetados por uma escrita.
+
+        O patrimônio do usuário é sempre descartado. Os relatórios mensais são
+        descartados apenas nos períodos informados, ou todos se `periods` for None.
+        Deve ser chamado depois do commit da escrita.
+
+        Args:
+            user_id (int): O ID do usuário.
+            periods (Iterable[tuple[int, int]|date], optional): Os períodos tocados, como
+                pares (ano, mês) ou datas.
+        """
+        backend = self.backend
+
+        if backend is None:
+            return
+
+        if periods is None:
+            backend.delete_prefix(f"{user_id}:")
+            return
+
+        backend.delete_prefix(f"{user_id}:balance:")
+
+        for period in set(periods):
+            year, month = (period.year, period.month) if hasattr(period, "year") else period
+            backend.delete_prefix(f"{user_id}:{int(year):04d}-{int(month):02d}:")
+
+    def clear(self):
+        """Descarta todas as entradas (ex: depois de reconstruir os totais mensais)."""
+        backend = self.backend
+
+        if backend is not None:
+            backend.delete_prefix("")
+
+    def stats(self):
+        """Retorna os contadores de acertos, faltas, descartes e invalidações do backend.
+
+        Returns:
+            dict: Os contadores e o nome do backend ("backend"). Sem backend, apenas
+            {"backend": "none"}.
+        """
+        backend = self.backend
+
+        if backend is None:
+            return {"backend": "none"}
+
+        stats = backend.stats()
+        stats["backend"] = "sqlite" if isinstance(backend, SQLiteCacheBackend) else "memory"
+        return stats
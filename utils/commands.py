@@ -0,0 +1,365 @@
+import json
+import time
+import click
+from extensions import report_cache
+from utils import migrations, query_plan, reconciliation, benchmark, seeder
+from controllers.rollup_controller import RollupController
+from controllers.job_controller import JobController
+from controllers.goal_controller import GoalController
+
+
+def run_worker_process(once, max_jobs):
+    """Ponto de entrada de cada processo extra de `flask worker` (cria a sua própria aplicação)."""
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        return JobController.work(once= once, max_jobs= max_jobs)
+
+
+def register_commands(app):
+    """Registra os comandos de manutenção do banco no CLI do Flask (`flask <comando>`).
+
+    Args:
+        app (Flask): A aplicação onde os comandos serão registrados.
+    """
+
+    @app.cli.command("provision-db")
+    @click.option("--force", is_flag= True, help= "Provisiona mesmo que a versão do esquema já esteja atualizada.")
+    def provision_db_command(force):
+        """Cria tabelas, índices e categorias de sistema e grava a versão do esquema no banco."""
+        if not migrations.provision_database(force= force):
+            click.echo(f"Banco já está na versão {migrations.SCHEMA_VERSION} do esquema.")
+
+    @app.cli.command("create-indexes")
+    def create_indexes_command():
+        """Cria os índices declarados nos modelos que ainda não existem no banco."""
+        created = migrations.create_missing_indexes()
+
+        if not created:
+            click.echo("Nenhum índice pendente.")
+
+    @app.cli.command("check-indexes")
+    def check_indexes_command():
+        """Lista os índices declarados nos modelos que estão ausentes no banco."""
+        missing = migrations.find_missing_indexes()
+
+        if not missing:
+            click.echo("[OK] Todos os índices estão presentes.")
+            return
+
+        for index in missing:
+            columns = ", ".join(column.name for column in index.columns)
+            click.echo(f"[FALTANDO] {index.name} em {index.table.name} ({columns})")
+
+        raise SystemExit(1)
+
+    @app.cli.command("migrate-money")
+    def migrate_money_command():
+        """Converte para centavos inteiros as colunas monetárias de um banco antigo."""
+        migrated = migrations.migrate_money_columns()
+
+        if not migrated:
+            click.echo("Nenhuma coluna monetária pendente.")
+
+    @app.cli.command("check-query-plans")
+    def check_query_plans_command():
+        """Falha se alguma consulta de listagem ou relatório fizer varredura completa de tabela."""
+        problems = query_plan.check_query_plans()
+
+        if not problems:
+            click.echo("[OK] Todas as consultas monitoradas usam índices.")
+            return
+
+        for name, scans in problems.items():
+            for detail in scans:
+                click.echo(f"[SCAN] {name}: {detail}")
+
+        raise SystemExit(1)
+
+    @app.cli.command("check-query-counts")
+    @click.option("--sizes", default= "1,200", show_default= True, help= "Transações por carteira em cada rodada.")
+    def check_query_counts_command(sizes):
+        """Confere que extrato, detalhe da carteira e dashboard fazem as mesmas consultas com poucas e muitas linhas."""
+        results = benchmark.check_query_counts(sizes= [int(size) for size in sizes.split(",")])
+
+        for name, result in results.items():
+            counts = ", ".join(f"{size} linhas: {count}" for size, count in result["queries"].items())
+            click.echo(f"{'[OK]' if result['ok'] else '[ERRO]'} {name}: {counts}")
+
+        if not all(result["ok"] for result in results.values()):
+            raise SystemExit(1)
+
+    @app.cli.command("rebuild-rollups")
+    @click.option("--background", is_flag= True, help= "Enfileira a reconstrução para o worker em vez de executá-la.")
+    def rebuild_rollups_command(background):
+        """Recria a tabela de totais mensais a partir de todas as transações."""
+        if background:
+            job = JobController.enqueue("rollups.rebuild", {})
+            click.echo(f"[OK] Tarefa #{job.id} enfileirada ({job.status}).")
+            return
+
+        rows = RollupController.rebuild()
+        click.echo(f"[OK] {rows} linha(s) de totais mensais geradas.")
+
+    @app.cli.command("expire-goals")
+    @click.option("--every", type= float, help= "Repete a cada N segundos (sem a opção, roda uma vez).")
+    def expire_goals_command(every):
+        """Desativa, em um único UPDATE, as metas vencidas de todos os usuários."""
+        while True:
+            expired = GoalController.expire_overdue_goals()
+            click.echo(f"[OK] {expired} meta(s) vencida(s) desativada(s).")
+
+            if not every:
+                return
+
+            time.sleep(every)
+
+    @app.cli.command("check-rollups")
+    def check_rollups_command():
+        """Falha se a tabela de totais mensais divergir das transações gravadas."""
+        problems = RollupController.find_inconsistencies()
+
+        if not problems:
+            click.echo("[OK] Totais mensais consistentes com as transações.")
+            return
+
+        for problem in problems:
+            wallet_id, category_id, year, month, transaction_type = problem["key"]
+            click.echo(
+                f"[DIVERGENTE] carteira {wallet_id}, categoria {category_id}, {month:02d}/{year} "
+                f"({transaction_type}): esperado {problem['expected']}, gravado {problem['stored']}"
+            )
+
+        click.echo("Execute 'flask rebuild-rollups' para corrigir.")
+        raise SystemExit(1)
+
+    @app.cli.command("cache-stats")
+    def cache_stats_command():
+        """Mostra os contadores do cache de relatórios "sqlite" (compartilhados por todos os workers)."""
+        stats = report_cache.stats()
+
+        if stats["backend"] != "sqlite":
+            # O cache em memória é de cada processo: o deste comando acabou de ser criado
+            click.echo(
+                f"Backend '{stats['backend']}': os contadores da aplicação em execução são registrados "
+                "no log 'finance.sql' a cada REPORT_CACHE_STATS_INTERVAL segundos."
+            )
+            raise SystemExit(1)
+
+        click.echo(json.dumps(stats, indent= 2))
+
+    @app.cli.command("reconcile-balances")
+    @click.option("--repair", is_flag= True, help= "Corrige os saldos divergentes.")
+    @click.option("--workers", default= reconciliation.RECONCILE_WORKERS, show_default= True,
+                  help= "Quantidade de lotes verificados em paralelo.")
+    @click.option("--batch-size", default= reconciliation.RECONCILE_BATCH_SIZE, show_default= True,
+                  help= "Quantidade de usuários por lote.")
+    @click.option("--background", is_flag= True, help= "Enfileira a verificação para o worker em vez de executá-la.")
+    def reconcile_balances_command(repair, workers, batch_size, background):
+        """Compara o saldo de cada carteira com a soma das suas transações."""
+        if background:
+            job = JobController.enqueue(
+                "balances.reconcile", {"repair": repair, "workers": workers, "batch_size": batch_size}
+            )
+            click.echo(f"[OK] Tarefa #{job.id} enfileirada ({job.status}).")
+            return
+
+        report = reconciliation.reconcile_balances(app, repair, workers, batch_size)
+
+        for item in report["drift"]:
+            click.echo(
+                f"[DIVERGENTE] carteira {item['wallet_id']} (usuário {item['user_id']}): "
+                f"gravado {item['stored']:.2f}, esperado {item['expected']:.2f}, diferença {item['drift']:+.2f}"
+            )
+
+        click.echo(f"{report['batches']} lote(s) verificados, {len(report['drift'])} carteira(s) divergentes.")
+
+        if repair:
+            click.echo(f"[OK] {report['repaired']} carteira(s) corrigidas.")
+        elif report["drift"]:
+            click.echo("Execute com --repair para corrigir.")
+            raise SystemExit(1)
+
+    @app.cli.command("benchmark-money")
+    @click.option("--rows", default= 1_000_000, show_default= True, help= "Quantidade de lançamentos.")
+    def benchmark_money_command(rows):
+        """Compara a agregação de um livro-caixa grande em reais (REAL) e em centavos (INTEGER)."""
+        results = benchmark.benchmark_money_aggregation(rows)
+
+        click.echo(f"{results['rows']} lançamentos")
+        click.echo(f"{'armazenamento':<15}{'SUM/GROUP BY':>15}{'soma Python':>15}{'erro (R$)':>15}")
+
+        for name in ("float", "cents"):
+            result = results[name]
+            click.echo(
+                f"{name:<15}{result['sql_group_by'] * 1000:>12.1f} ms{result['python_sum'] * 1000:>12.1f} ms"
+                f"{result['error']:>15.6f}"
+            )
+
+    @app.cli.command("benchmark-reports")
+    @click.option("--rows", default= 100_000, show_default= True, help= "Quantidade de transações.")
+    def benchmark_reports_command(rows):
+        """Compara o relatório mensal em três consultas separadas e em uma consulta combinada."""
+        results = benchmark.benchmark_report_round_trips(rows)
+
+        click.echo(f"{results['rows']} transações")
+        click.echo(f"{'modo':<15}{'tempo':>12}{'consultas':>12}")
+
+        for name in ("ledger_python", "separate", "combined"):
+            result = results[name]
+            click.echo(f"{name:<15}{result['seconds'] * 1000:>9.2f} ms{result['queries']:>12}")
+
+    @app.cli.command("benchmark-sqlite")
+    @click.option("--writes", default= 2_000, show_default= True, help= "Commits na fase de escrita.")
+    @click.option("--reads", default= 5_000, show_default= True, help= "Consultas na fase de leitura.")
+    @click.option("--threads", default= 4, show_default= True, help= "Threads concorrentes.")
+    def benchmark_sqlite_command(writes, reads, threads):
+        """Compara a vazão de escrita e leitura de cada perfil de PRAGMAs do SQLite."""
+        results = benchmark.benchmark_sqlite_profiles(writes= writes, reads= reads, threads= threads)
+
+        click.echo(f"{'perfil':<12}{'escritas/s':>12}{'leituras/s':>12}{'escritas na leitura':>22}{'locked':>8}")
+
+        for profile, result in results.items():
+            click.echo(
+                f"{profile:<12}{result['writes_per_s']:>12.0f}{result['reads_per_s']:>12.0f}"
+                f"{result['writes_during_reads']:>22}{result['locked_errors']:>8}"
+            )
+
+    @app.cli.command("seed-data")
+    @click.option("--users", default= 10, show_default= True, help= "Quantidade de usuários.")
+    @click.option("--wallets", default= 2, show_default= True, help= "Carteiras por usuário.")
+    @click.option("--transactions", default= 500, show_default= True, help= "Transações por carteira.")
+    @click.option("--categories", default= 6, show_default= True, help= "Categorias por usuário.")
+    @click.option("--goals", default= 3, show_default= True, help= "Metas por usuário.")
+    @click.option("--objectives", default= 2, show_default= True, help= "Objetivos por usuário.")
+    @click.option("--start", type= click.DateTime(["%Y-%m-%d"]), help= "Primeira data (padrão: 1 ano antes do fim).")
+    @click.option("--end", type= click.DateTime(["%Y-%m-%d"]), help= "Última data (padrão: hoje).")
+    @click.option("--expense-ratio", default= 0.7, show_default= True, help= "Proporção de despesas.")
+    @click.option("--distribution", type= click.Choice(["lognormal", "uniform"]), default= "lognormal", show_default= True)
+    @click.option("--seed", default= 42, show_default= True, help= "Semente do gerador (mesma semente, mesmos dados).")
+    def seed_data_command(users, wallets, transactions, categories, goals, objectives, start, end,
+                          expense_ratio, distribution, seed):
+        """Gera usuários, carteiras, transações, metas e objetivos sintéticos no banco."""
+        counts = seeder.seed_synthetic_data(
+            users= users, wallets= wallets, transactions= transactions, categories= categories,
+            goals= goals, objectives= objectives, start= start.date() if start else None,
+            end= end.date() if end else None, expense_ratio= expense_ratio,
+            value_distribution= distribution, seed= seed
+        )
+
+        click.echo(
+            f"{counts['users']} usuários, {counts['wallets']} carteiras, {counts['transactions']} transações, "
+            f"{counts['goals']} metas e {counts['objectives']} objetivos gerados."
+        )
+        click.echo(f"Login: {seeder.synthetic_email(1, seed)} / {seeder.SYNTHETIC_PASSWORD}")
+
+    @app.cli.command("benchmark-routes")
+    @click.option("--sizes", default= "100,1000,5000", show_default= True, help= "Transações por carteira em cada rodada.")
+    @click.option("--users", default= 5, show_default= True, help= "Quantidade de usuários gerados.")
+    @click.option("--wallets", default= 2, show_default= True, help= "Carteiras por usuário.")
+    @click.option("--requests", default= 20, show_default= True, help= "Chamadas medidas por rota.")
+    @click.option("--cache", type= click.Choice(["memory", "sqlite", "none"]), default= "memory", show_default= True)
+    @click.option("--output", default= "benchmark_routes.json", show_default= True, help= "Arquivo JSON com os resultados.")
+    def benchmark_routes_command(sizes, users, wallets, requests, cache, output):
+        """Mede latência, consultas e memória de cada rota em bancos temporários de vários tamanhos."""
+        results = benchmark.benchmark_routes(
+            sizes= [int(size) for size in sizes.split(",")], users= users, wallets= wallets,
+            requests= requests, cache= cache
+        )
+
+        for run in results["runs"]:
+            click.echo(f"\n{run['transactions']} transações ({run['size']} por carteira)")
+            click.echo(f"{'rota':<22}{'p50':>10}{'p90':>10}{'p99':>10}{'consultas':>11}{'memória':>12}")
+
+            for name, route in run["routes"].items():
+                click.echo(
+                    f"{name:<22}{route['p50_ms']:>7.2f} ms{route['p90_ms']:>7.2f} ms{route['p99_ms']:>7.2f} ms"
+                    f"{route['queries_mean']:>11.1f}{route['peak_kib']:>8.0f} KiB"
+                )
+
+        with open(output, "w", encoding= "utf-8") as file:
+            json.dump(results, file, indent= 2, ensure_ascii= False)
+
+        click.echo(f"\nResultados gravados em {output}.")
+
+    @app.cli.command("benchmark-user-loader")
+    @click.option("--requests", default= 2_000, show_default= True, help= "Requisições medidas em cada modo.")
+    @click.option("--threads", default= 4, show_default= True, help= "Threads concorrentes.")
+    def benchmark_user_loader_command(requests, threads):
+        """Compara requisições por segundo com e sem o cache do usuário logado."""
+        results = benchmark.benchmark_user_loader(requests= requests, threads= threads)
+
+        click.echo(f"{'modo':<10}{'req/s':>10}{'consultas/req':>16}")
+
+        for mode, result in results.items():
+            click.echo(f"{mode:<10}{result['requests_per_s']:>10.0f}{result['queries_per_request']:>16.2f}")
+
+    @app.cli.command("benchmark-login")
+    @click.option("--logins", default= 64, show_default= True, help= "Logins da rajada.")
+    @click.option("--threads", default= 8, show_default= True, help= "Threads concorrentes fazendo login.")
+    @click.option("--workers", default= "0,2", show_default= True, help= "Tamanhos de pool comparados (0 = hash na requisição).")
+    def benchmark_login_command(logins, threads, workers):
+        """Mede o p99 do login em uma rajada e a latência de outra rota durante ela."""
+        results = benchmark.benchmark_login_burst(
+            logins= logins, threads= threads, workers= [int(size) for size in workers.split(",")]
+        )
+
+        click.echo(f"{'modo':<10}{'login p50':>12}{'login p99':>12}{'recusados':>11}{'rota p99 (sem carga)':>23}{'rota p99 (rajada)':>20}")
+
+        for mode, result in results.items():
+            login, other = result["login"], result["other_route"]
+            click.echo(
+                f"{mode:<10}{login['p50_ms']:>9.1f} ms{login['p99_ms']:>9.1f} ms{login['rejected']:>11}"
+                f"{other['idle']['p99_ms']:>20.1f} ms{other['during_burst']['p99_ms']:>17.1f} ms"
+            )
+
+    @app.cli.command("stress-balances")
+    @click.option("--threads", default= 8, show_default= True, help= "Threads concorrentes.")
+    @click.option("--operations", default= 200, show_default= True, help= "Operações por thread.")
+    @click.option("--seed", default= 42, show_default= True, help= "Semente do sorteio das operações.")
+    def stress_balances_command(threads, operations, seed):
+        """Lança, edita e exclui transações em paralelo e confere o saldo final com o livro-caixa."""
+        results = benchmark.stress_balances(threads= threads, operations= operations, seed= seed)
+
+        click.echo(f"{results['operations']} operações em {results['seconds']} s: " + ", ".join(
+            f"{name} {count}" for name, count in sorted(results["outcomes"].items())
+        ))
+        click.echo(f"Saldo gravado: {results['balance']:.2f} | soma das transações: {results['expected']:.2f}")
+
+        if results["drift"]:
+            click.echo("[ERRO] O saldo final diverge do livro-caixa.")
+            raise SystemExit(1)
+
+        click.echo("[OK] Saldo consistente com o livro-caixa.")
+
+    @app.cli.command("worker")
+    @click.option("--processes", default= 1, show_default= True, help= "Quantidade de processos worker.")
+    @click.option("--once", is_flag= True, help= "Encerra quando a fila estiver vazia.")
+    @click.option("--max-jobs", type= int, help= "Encerra cada processo depois dessa quantidade de tarefas.")
+    def worker_command(processes, once, max_jobs):
+        """Executa as tarefas da fila em segundo plano (exclusões, importações, relatórios...)."""
+        if processes <= 1:
+            counts = JobController.work(once= once, max_jobs= max_jobs)
+            click.echo(f"[OK] {counts['succeeded']} tarefa(s) concluída(s), {counts['failed']} com falha.")
+            return
+
+        import multiprocessing
+
+        # "spawn": cada processo abre as suas próprias conexões com o banco
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target= run_worker_process, args= (once, max_jobs), daemon= False)
+            for _ in range(processes)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
@@ -0,0 +1,50 @@
+from sqlalchemy import select, literal, true
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db
+from models.data_version import UserDataVersion
+from models.user import User
+
+
+def bump_data_version(user_id):
+    """Incrementa a versão dos dados de um usuário (criando o contador se preciso).
+
+    Não faz commit: deve ser chamada antes do commit da escrita que alterou os
+    dados, para que a nova versão e a alteração fiquem visíveis juntas.
+
+    Args:
+        user_id (int): O ID do usuário.
+    """
+    statement = sqlite_insert(UserDataVersion).values(user_id= user_id, version= 1)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements= [UserDataVersion.user_id],
+        set_= {"version": UserDataVersion.version + 1}
+    ))
+
+
+def bump_all_data_versions():
+    """Incrementa a versão de todos os usuários (ex: ao reconstruir os totais mensais). Não faz commit."""
+    # "WHERE true" evita a ambiguidade do SQLite entre ON CONFLICT e um JOIN no SELECT
+    statement = sqlite_insert(UserDataVersion).from_select(
+        ["user_id", "version"],
+        select(User.id, literal(1)).where(true())
+    )
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements= [UserDataVersion.user_id],
+        set_= {"version": UserDataVersion.version + 1}
+    ))
+
+
+def get_data_version(user_id):
+    """Retorna a versão atual dos dados de um usuário (0 se ele nunca alterou nada).
+
+    Args:
+        user_id (int): O ID do usuário.
+
+    Returns:
+        int: A versão atual.
+    """
+    version = db.session.execute(
+        select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+    ).scalar()
+
+    return version or 0
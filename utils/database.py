@@ -0,0 +1,129 @@
+import os
+import sqlite3
+from sqlalchemy import event
+
+DEFAULT_DATABASE_URI = "sqlite:///finance.db"
+
+# Perfis de PRAGMA aplicados em cada nova conexão SQLite (ver `configure_engine`)
+SQLITE_PRAGMA_PROFILES = {
+    # Padrões do SQLite (journal de rollback, synchronous=FULL) e chaves estrangeiras ligadas.
+    # O journal_mode é explícito porque o WAL fica gravado no arquivo do banco
+    "default": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "foreign_keys": "ON",
+    },
+    # Leituras não bloqueiam a escrita; commits sem fsync a cada transação (seguro contra
+    # queda do processo, podendo perder os últimos commits numa queda de energia)
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -20000,
+        "mmap_size": 134217728,
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    },
+    # WAL com fsync a cada commit: mais lento que "wal", mas sem perda de commits
+    "wal_full": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -20000,
+        "mmap_size": 134217728,
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    },
+}
+
+
+def database_config_from_env(environ=os.environ):
+    """Lê as configurações do banco a partir de variáveis de ambiente.
+
+    - `DATABASE_URL`: a URI do SQLAlchemy (padrão: 'sqlite:///finance.db', dentro de instance/).
+    - `DB_POOL_SIZE`, `DB_MAX_OVERFLOW`, `DB_POOL_TIMEOUT`, `DB_POOL_RECYCLE`: opções do
+      pool de conexões (só entram se definidas).
+    - `SQLITE_PRAGMA_PROFILE`: um dos perfis de `SQLITE_PRAGMA_PROFILES` (padrão: 'wal').
+
+    Args:
+        environ (Mapping, optional): De onde ler as variáveis.
+
+    Returns:
+        dict: As chaves `SQLALCHEMY_DATABASE_URI`, `SQLALCHEMY_ENGINE_OPTIONS` e
+        `SQLITE_PRAGMA_PROFILE`, prontas para `app.config.update`.
+    """
+    engine_options = {}
+
+    for variable, option, cast in (("DB_POOL_SIZE", "pool_size", int),
+                                   ("DB_MAX_OVERFLOW", "max_overflow", int),
+                                   ("DB_POOL_TIMEOUT", "pool_timeout", float),
+                                   ("DB_POOL_RECYCLE", "pool_recycle", int)):
+        if environ.get(variable):
+            engine_options[option] = cast(environ[variable])
+
+    return {
+        "SQLALCHEMY_DATABASE_URI": environ.get("DATABASE_URL", DEFAULT_DATABASE_URI),
+        "SQLALCHEMY_ENGINE_OPTIONS": engine_options,
+        "SQLITE_PRAGMA_PROFILE": environ.get("SQLITE_PRAGMA_PROFILE", "wal"),
+    }
+
+
+def resolve_pragmas(profile, overrides=None):
+    """Monta os PRAGMAs de um perfil, com ajustes pontuais por cima.
+
+    Args:
+        profile (str): O nome do perfil em `SQLITE_PRAGMA_PROFILES`.
+        overrides (dict, optional): PRAGMAs que substituem ou completam os do perfil
+            (ex: {"cache_size": -64000}).
+
+    Returns:
+        dict: Os PRAGMAs na ordem em que serão aplicados.
+
+    Raises:
+        ValueError: Se o perfil não existir.
+    """
+    if profile not in SQLITE_PRAGMA_PROFILES:
+        raise ValueError(f"SQLITE_PRAGMA_PROFILE inválido: '{profile}'.")
+
+    return dict(SQLITE_PRAGMA_PROFILES[profile], **(overrides or {}))
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Executa os PRAGMAs em uma conexão `sqlite3` (outras conexões são ignoradas)."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+
+    cursor.close()
+
+
+def configure_engine(engine, pragmas):
+    """Aplica `pragmas` em toda conexão nova da engine.
+
+    Roda depois do listener global de `extensions.py` (que só liga as chaves
+    estrangeiras), então os valores do perfil prevalecem.
+
+    Args:
+        engine (Engine): A engine do SQLAlchemy.
+        pragmas (dict): Os PRAGMAs (ver `resolve_pragmas`).
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+
+def current_pragmas(connection, names):
+    """Lê os valores atuais de alguns PRAGMAs em uma conexão (para conferência).
+
+    Args:
+        connection (Connection): Uma conexão do SQLAlchemy.
+        names (Iterable[str]): Os nomes dos PRAGMAs.
+
+    Returns:
+        dict: O valor de cada PRAGMA.
+    """
+    return {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
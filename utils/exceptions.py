@@ -35,4 +35,22 @@ class UsuarioInexistenteError(Exception):
     pass
 
 class SenhasDiferentes(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class ArquivoInvalidoError(Exception):
+    pass
+
+class CategoriaEmUsoError(Exception):
+    pass
+
+class OrcamentoDeConsultasExcedidoError(Exception):
+    pass
+
+class ServicoSobrecarregadoError(Exception):
+    pass
+
+class TarefaInexistenteError(Exception):
+    pass
+
+class TarefaReassumidaError(Exception):
+    pass
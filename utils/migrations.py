@@ -0,0 +1,263 @@
+from sqlalchemy import inspect, Integer
+from sqlalchemy.schema import CreateTable, CreateColumn
+from extensions import db
+from utils.money import Money, CENTS_PER_UNIT
+
+# Versão do esquema gravada no banco (PRAGMA user_version) depois de provisionado.
+# Só o SQLite guarda a versão; em outros bancos o provisionamento roda a cada inicialização.
+# Aumente sempre que mudar modelos, índices, migrações ou dados padrão: os bancos
+# com a versão anterior serão provisionados de novo na próxima inicialização.
+SCHEMA_VERSION = 3
+
+
+def find_missing_indexes():
+    """Compara os índices declarados nos modelos com os existentes no banco.
+
+    `db.create_all()` só cria índices junto com tabelas novas, então bancos
+    criados antes de um índice ser declarado ficam sem ele.
+
+    Returns:
+        list[Index]: Os índices declarados nos modelos que ainda não existem no banco.
+                     Tabelas que ainda não existem são ignoradas (serão criadas pelo create_all).
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                missing.append(index)
+
+    return missing
+
+
+def create_missing_indexes():
+    """Cria no banco atual todos os índices declarados que ainda não existem.
+
+    Returns:
+        list[str]: Os nomes dos índices criados. Lista vazia se o banco já estava atualizado.
+    """
+    created = []
+
+    for index in find_missing_indexes():
+        index.create(bind=db.engine, checkfirst=True)
+        created.append(index.name)
+        print(f"[OK] Índice '{index.name}' criado.")
+
+    return created
+
+
+def find_missing_columns():
+    """Compara as colunas declaradas nos modelos com as existentes no banco.
+
+    Assim como os índices, `db.create_all()` não altera tabelas que já existem, então
+    bancos antigos ficam sem as colunas declaradas depois.
+
+    Returns:
+        list[Column]: As colunas declaradas nos modelos que ainda não existem no banco.
+                      Tabelas que ainda não existem são ignoradas (serão criadas pelo create_all).
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in existing)
+
+    return missing
+
+
+def add_missing_columns():
+    """Adiciona ao banco atual as colunas declaradas que ainda não existem (ALTER TABLE ... ADD COLUMN).
+
+    Só serve para colunas que o SQLite consegue adicionar: anuláveis ou com valor padrão.
+
+    Returns:
+        list[str]: As colunas adicionadas ('tabela.coluna'). Lista vazia se o banco já estava atualizado.
+    """
+    added = []
+
+    with db.engine.begin() as connection:
+        for column in find_missing_columns():
+            ddl = CreateColumn(column).compile(dialect= connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {column.table.name} ADD COLUMN {ddl}")
+            added.append(f"{column.table.name}.{column.name}")
+
+    for name in added:
+        print(f"[OK] Coluna '{name}' adicionada.")
+
+    return added
+
+
+def find_float_money_columns():
+    """Lista as colunas monetárias (`Money`) que ainda estão gravadas como ponto flutuante.
+
+    Bancos criados antes da troca para centavos têm essas colunas como FLOAT,
+    com os valores em reais.
+
+    Returns:
+        dict[str, list[str]]: Para cada tabela pendente, os nomes das colunas a converter.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    pending = {}
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        money_columns = [column.name for column in table.columns if isinstance(column.type, Money)]
+        if not money_columns:
+            continue
+
+        existing = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+        stale = [name for name in money_columns if name in existing and not isinstance(existing[name], Integer)]
+
+        if stale:
+            pending[table.name] = stale
+
+    return pending
+
+
+def _rebuild_table(connection, table, money_columns):
+    """Recria uma tabela com o esquema atual do modelo, convertendo reais em centavos.
+
+    O SQLite não altera o tipo de uma coluna: a tabela nova é criada com outro nome,
+    recebe os dados (`ROUND(valor * 100)` nas colunas monetárias), a antiga é removida
+    e a nova assume o nome original. Os índices são recriados em seguida.
+    """
+    temp_name = f"{table.name}__money"
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    columns = [column.name for column in table.columns if column.name in existing]
+    select_list = [
+        f"CAST(ROUND({name} * {CENTS_PER_UNIT}) AS INTEGER)" if name in money_columns else name
+        for name in columns
+    ]
+
+    ddl = str(CreateTable(table).compile(dialect= connection.dialect))
+    ddl = ddl.replace(f"CREATE TABLE {table.name} (", f"CREATE TABLE {temp_name} (", 1)
+
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {temp_name}")
+    connection.exec_driver_sql(ddl)
+    connection.exec_driver_sql(
+        f"INSERT INTO {temp_name} ({', '.join(columns)}) SELECT {', '.join(select_list)} FROM {table.name}"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {table.name}")
+    connection.exec_driver_sql(f"ALTER TABLE {temp_name} RENAME TO {table.name}")
+
+    for index in table.indexes:
+        index.create(bind= connection)
+
+
+def migrate_money_columns():
+    """Converte para centavos inteiros as colunas monetárias de um `finance.db` antigo.
+
+    Todas as tabelas pendentes são convertidas na mesma transação. A verificação de
+    chaves estrangeiras fica desligada durante a troca das tabelas (como recomenda a
+    documentação do SQLite para alterações de esquema) e é religada ao final.
+
+    Returns:
+        list[str]: Os nomes das tabelas convertidas. Lista vazia se o banco já estava atualizado.
+    """
+    pending = find_float_money_columns()
+
+    if not pending:
+        return []
+
+    migrated = []
+
+    with db.engine.connect() as connection:
+        if is_sqlite():
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+
+        try:
+            for table in db.metadata.sorted_tables:
+                if table.name in pending:
+                    _rebuild_table(connection, table, pending[table.name])
+                    migrated.append(table.name)
+
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            if is_sqlite():
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+    for name in migrated:
+        print(f"[OK] Tabela '{name}' convertida para centavos.")
+
+    return migrated
+
+
+def is_sqlite():
+    """Indica se o banco configurado é SQLite (o único com `PRAGMA user_version`)."""
+    return db.engine.dialect.name == "sqlite"
+
+
+def get_schema_version():
+    """Lê a versão do esquema gravada no banco.
+
+    Returns:
+        int|None: A versão (0 em bancos nunca provisionados), ou None fora do SQLite,
+        onde a versão não é gravada.
+    """
+    if not is_sqlite():
+        return None
+
+    return db.session.connection().exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def set_schema_version(version):
+    """Grava a versão do esquema no cabeçalho do arquivo do banco (só no SQLite)."""
+    if not is_sqlite():
+        return
+
+    db.session.connection().exec_driver_sql(f"PRAGMA user_version={int(version)}")
+    db.session.commit()
+
+
+def provision_database(force=False):
+    """Prepara o banco para a versão atual do código, se ainda não estiver preparado.
+
+    Uma única consulta (`PRAGMA user_version`) decide: se o banco já estiver em
+    `SCHEMA_VERSION`, nada mais é feito. Fora do SQLite não há onde guardar a versão,
+    então todos os passos (idempotentes) rodam a cada chamada; nesses bancos, prefira
+    `DB_AUTO_PROVISION=0` e `flask provision-db` a cada atualização. Caso contrário, cria as tabelas, adiciona as
+    colunas ausentes, converte valores antigos para centavos, cria os índices ausentes, cadastra as categorias
+    de sistema, gera os totais mensais e grava a versão.
+
+    Args:
+        force (bool, optional): Se True, provisiona mesmo que a versão já esteja atualizada.
+
+    Returns:
+        bool: True se o banco foi provisionado agora.
+    """
+    # Importados aqui: dependem dos modelos, que importam este pacote
+    from utils import seeder
+    from controllers.rollup_controller import RollupController
+
+    if not force and get_schema_version() == SCHEMA_VERSION:
+        db.session.rollback()
+        return False
+
+    db.create_all()         # cria tabelas
+    add_missing_columns()   # colunas novas em bancos já existentes
+    migrate_money_columns()  # valores em centavos em bancos já existentes
+    create_missing_indexes()  # índices novos em bancos já existentes
+    seeder.seed_system_categories()  # popula categorias do sistema
+    RollupController.ensure_populated()  # totais mensais em bancos já existentes
+
+    set_schema_version(SCHEMA_VERSION)
+    print(f"[OK] Banco provisionado (esquema versão {SCHEMA_VERSION}).")
+    return True
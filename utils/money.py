@@ -0,0 +1,120 @@
+import math
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from sqlalchemy.types import TypeDecorator, Integer
+
+CENTS_PER_UNIT = 100
+
+# Maior valor (em reais) aceito em uma transação; mantém saldos e somas em centavos
+# muito abaixo do limite do INTEGER de 64 bits do SQLite
+MAX_AMOUNT = 1_000_000_000
+
+
+def to_cents(value):
+    """Converte um valor em reais (float, int, Decimal ou str) para centavos inteiros.
+
+    A conversão passa por `Decimal(str(value))`, então 0.1 + 0.2 digitados em um
+    formulário viram exatamente 10 e 20 centavos. Meio centavo arredonda para cima.
+
+    Args:
+        value (float|int|Decimal|str): O valor em reais.
+
+    Returns:
+        int: O valor em centavos.
+
+    Raises:
+        ValueError: Se o valor não representar um número finito.
+    """
+    try:
+        amount = Decimal(str(value)) * CENTS_PER_UNIT
+    except InvalidOperation:
+        raise ValueError(f"Valor monetário inválido: '{value}'.")
+
+    if not amount.is_finite():
+        raise ValueError(f"Valor monetário inválido: '{value}'.")
+
+    return int(amount.quantize(Decimal(1), rounding= ROUND_HALF_UP))
+
+
+def has_cents_precision(value):
+    """Indica se o valor tem no máximo duas casas decimais (é um número exato de centavos).
+
+    Valores com mais casas seriam arredondados por `to_cents` sem aviso.
+
+    Args:
+        value (float|int|Decimal|str): O valor em reais.
+
+    Returns:
+        bool: True se `to_cents` não precisar arredondar o valor.
+    """
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        return False
+
+    return amount.is_finite() and (amount * CENTS_PER_UNIT) % 1 == 0
+
+
+def is_valid_amount(value, positive=True):
+    """Indica se um valor em reais pode ser gravado em uma coluna `Money` sem distorção.
+
+    O valor precisa ser finito, ter no máximo duas casas decimais e não passar de
+    `MAX_AMOUNT` em valor absoluto. Com `positive`, também precisa ser maior que zero
+    depois da conversão para centavos.
+
+    Args:
+        value (float): O valor em reais, já convertido para número.
+        positive (bool, optional): Se o valor precisa ser maior que zero.
+
+    Returns:
+        bool: True se o valor for aceito.
+    """
+    if not math.isfinite(value) or abs(value) > MAX_AMOUNT or not has_cents_precision(value):
+        return False
+
+    return not positive or to_cents(value) > 0
+
+
+def from_cents(cents):
+    """Converte centavos inteiros de volta para reais.
+
+    Args:
+        cents (int): O valor em centavos.
+
+    Returns:
+        float: O valor em reais (ex: 1050 -> 10.5).
+    """
+    return cents / CENTS_PER_UNIT
+
+
+def sum_money(values):
+    """Soma valores em reais sem o erro do ponto flutuante (a soma é feita em centavos).
+
+    Args:
+        values (Iterable[float]): Os valores em reais (ex: saldos de carteiras já carregadas).
+
+    Returns:
+        float: A soma em reais.
+    """
+    return from_cents(sum(to_cents(value or 0) for value in values))
+
+
+class Money(TypeDecorator):
+    """Tipo de coluna que grava valores monetários como centavos inteiros.
+
+    O restante do sistema continua falando em reais (float): a conversão acontece
+    na fronteira com o banco, ao enviar parâmetros e ao ler resultados. Somas,
+    comparações e atualizações como `current_balance + delta` são feitas pelo
+    SQLite em aritmética inteira, sem o erro acumulado do ponto flutuante.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return from_cents(value)
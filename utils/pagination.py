@@ -0,0 +1,131 @@
+from datetime import date
+from sqlalchemy import or_, and_
+from utils.exceptions import ValorInvalidoError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def normalize_page_size(per_page):
+    """Converte o tamanho de página recebido para um inteiro dentro dos limites.
+
+    Args:
+        per_page (int|str|None): O tamanho solicitado (ex: vindo da query string).
+
+    Returns:
+        int: Um valor entre 1 e MAX_PAGE_SIZE. Usa DEFAULT_PAGE_SIZE se o valor for inválido.
+    """
+    try:
+        per_page = int(per_page)
+    except (ValueError, TypeError):
+        return DEFAULT_PAGE_SIZE
+
+    return max(1, min(per_page, MAX_PAGE_SIZE))
+
+
+def encode_cursor(transaction):
+    """Gera o cursor opaco de uma transação a partir da chave de ordenação (created_at, id).
+
+    Args:
+        transaction (Transaction): A transação que marca a posição na listagem.
+
+    Returns:
+        str: O cursor no formato 'YYYY-MM-DD.id'.
+    """
+    created_at = transaction.created_at
+    if hasattr(created_at, "date"):
+        created_at = created_at.date()
+
+    return f"{created_at.isoformat()}.{transaction.id}"
+
+
+def decode_cursor(cursor):
+    """Converte um cursor recebido na URL de volta para a tupla (created_at, id).
+
+    Args:
+        cursor (str): O cursor no formato 'YYYY-MM-DD.id'.
+
+    Returns:
+        tuple[date, int]: A data e o ID que marcam a posição na listagem.
+
+    Raises:
+        ValorInvalidoError: Se o cursor estiver mal formatado.
+    """
+    try:
+        date_str, id_str = cursor.split(".")
+        return date.fromisoformat(date_str), int(id_str)
+    except (ValueError, AttributeError):
+        raise ValorInvalidoError("Cursor de paginação inválido.")
+
+
+def keyset_paginate(query, created_column, id_column, after=None, before=None, per_page=DEFAULT_PAGE_SIZE):
+    """Pagina uma consulta por cursor (keyset) na ordem (created_at DESC, id DESC).
+
+    Em vez de OFFSET, cada página parte da chave do último (ou primeiro) registro
+    exibido, então o custo de buscar a página N não cresce com N. Apenas
+    `per_page + 1` linhas são carregadas para descobrir se existe outra página.
+
+    Args:
+        query (Query): A consulta base, já filtrada e SEM ordenação.
+        created_column (Column): A coluna de data usada na ordenação.
+        id_column (Column): A coluna de desempate (chave primária).
+        after (str, optional): Cursor a partir do qual buscar a próxima página (registros mais antigos).
+        before (str, optional): Cursor a partir do qual buscar a página anterior (registros mais recentes).
+        per_page (int, optional): Quantidade de registros por página.
+
+    Returns:
+        dict: Um dicionário contendo as chaves:
+            - "items" (list): Os registros da página, do mais recente para o mais antigo.
+            - "next_cursor" (str|None): Cursor para a próxima página, ou None se for a última.
+            - "prev_cursor" (str|None): Cursor para a página anterior, ou None se for a primeira.
+            - "per_page" (int): O tamanho de página efetivamente usado.
+
+    Raises:
+        ValorInvalidoError: Se algum dos cursores estiver mal formatado.
+    """
+    per_page = normalize_page_size(per_page)
+
+    if before:
+        cursor_date, cursor_id = decode_cursor(before)
+        rows = query.filter(or_(
+                created_column > cursor_date,
+                and_(created_column == cursor_date, id_column > cursor_id)
+            ))\
+            .order_by(created_column.asc(), id_column.asc())\
+            .limit(per_page + 1)\
+            .all()
+
+        has_more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+
+        if items:
+            return {
+                "items": items,
+                "next_cursor": encode_cursor(items[-1]),
+                "prev_cursor": encode_cursor(items[0]) if has_more else None,
+                "per_page": per_page
+            }
+
+        # Nada mais recente que o cursor: volta para a primeira página
+        after = None
+
+    if after:
+        cursor_date, cursor_id = decode_cursor(after)
+        query = query.filter(or_(
+            created_column < cursor_date,
+            and_(created_column == cursor_date, id_column < cursor_id)
+        ))
+
+    rows = query.order_by(created_column.desc(), id_column.desc())\
+        .limit(per_page + 1)\
+        .all()
+
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1]) if has_more else None,
+        "prev_cursor": encode_cursor(items[0]) if after and items else None,
+        "per_page": per_page
+    }
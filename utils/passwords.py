@@ -0,0 +1,178 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+from utils.exceptions import ServicoSobrecarregadoError
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+DEFAULT_SALT_LENGTH = 16
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_LIMIT = 32
+DEFAULT_TIMEOUT = 10
+
+
+def normalize_method(method):
+    """Completa os parâmetros omitidos de um método de hash com os padrões do werkzeug.
+
+    O werkzeug grava no hash o método já completo (ex: 'scrypt' vira
+    'scrypt:32768:8:1'), então a comparação com o hash gravado precisa da mesma forma.
+
+    Args:
+        method (str): 'scrypt[:n[:r[:p]]]' ou 'pbkdf2[:hash[:iterações]]'.
+
+    Returns:
+        str: O método com todos os parâmetros.
+
+    Raises:
+        ValueError: Se o método não for suportado.
+    """
+    name, *params = method.split(":")
+
+    if name == "scrypt":
+        defaults = ["32768", "8", "1"]
+    elif name == "pbkdf2":
+        defaults = ["sha256", str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        raise ValueError(f"PASSWORD_HASH_METHOD inválido: '{method}'.")
+
+    if len(params) > len(defaults):
+        raise ValueError(f"PASSWORD_HASH_METHOD inválido: '{method}'.")
+
+    return ":".join([name, *params, *defaults[len(params):]])
+
+
+class PasswordHasher():
+    """Gera e confere hashes de senha em um pool de threads limitado.
+
+    Cada hash é propositalmente caro. Feito direto na thread da requisição, uma
+    rajada de logins ocupa todas as threads do servidor e as demais rotas esperam.
+    Aqui no máximo `PASSWORD_HASH_WORKERS` hashes rodam ao mesmo tempo e até
+    `PASSWORD_HASH_QUEUE_LIMIT` esperam na fila. Acima disso, o pedido é recusado
+    na hora com `ServicoSobrecarregadoError`, em vez de acumular requisições presas.
+    Configurações:
+
+    - `PASSWORD_HASH_METHOD` e `PASSWORD_HASH_SALT_LENGTH`: parâmetros do werkzeug
+      para hashes novos. Hashes antigos continuam válidos e são refeitos no login
+      (ver `needs_rehash`).
+    - `PASSWORD_HASH_WORKERS`: threads do pool (0 faz o hash na própria requisição).
+    - `PASSWORD_HASH_QUEUE_LIMIT`: pedidos que podem esperar além dos que estão rodando.
+    - `PASSWORD_HASH_TIMEOUT`: segundos máximos de espera pelo resultado.
+    """
+
+    def __init__(self):
+        self.method = DEFAULT_METHOD
+        self.salt_length = DEFAULT_SALT_LENGTH
+        self.timeout = DEFAULT_TIMEOUT
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._counters = {"completed": 0, "rejected": 0, "timeouts": 0}
+
+    def init_app(self, app):
+        """Cria o pool com a configuração da aplicação."""
+        method = app.config.setdefault("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+        self.salt_length = app.config.setdefault("PASSWORD_HASH_SALT_LENGTH", DEFAULT_SALT_LENGTH)
+        workers = app.config.setdefault("PASSWORD_HASH_WORKERS", DEFAULT_WORKERS)
+        queue_limit = app.config.setdefault("PASSWORD_HASH_QUEUE_LIMIT", DEFAULT_QUEUE_LIMIT)
+        self.timeout = app.config.setdefault("PASSWORD_HASH_TIMEOUT", DEFAULT_TIMEOUT)
+        self.method = normalize_method(method)
+
+        if self._executor is not None:
+            self._executor.shutdown(wait= False)
+
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers= workers, thread_name_prefix= "password-hash")
+            self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        else:
+            self._executor = None
+            self._slots = None
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _run(self, function, *args):
+        """Executa `function` no pool (ou direto, sem pool) e espera o resultado."""
+        if self._executor is None:
+            return function(*args)
+
+        slots = self._slots
+
+        if not slots.acquire(blocking= False):
+            self._count("rejected")
+            raise ServicoSobrecarregadoError("Muitas requisições de autenticação. Tente novamente em instantes.")
+
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            slots.release()
+            raise
+
+        # A vaga só é liberada quando o hash termina, mesmo que a requisição desista antes
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            result = future.result(timeout= self.timeout)
+        except FutureTimeoutError:
+            self._count("timeouts")
+            raise ServicoSobrecarregadoError("A autenticação demorou demais. Tente novamente em instantes.")
+
+        self._count("completed")
+        return result
+
+    def hash(self, password):
+        """Gera o hash de uma senha com os parâmetros configurados.
+
+        Args:
+            password (str): A senha em texto plano.
+
+        Returns:
+            str: O hash no formato do werkzeug ('método$sal$hash').
+
+        Raises:
+            ServicoSobrecarregadoError: Se a fila estiver cheia ou o hash demorar mais que o limite.
+        """
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        """Confere uma senha com o hash gravado (de qualquer método suportado pelo werkzeug).
+
+        Args:
+            password_hash (str): O hash gravado.
+            password (str): A senha em texto plano.
+
+        Returns:
+            bool: True se a senha confere.
+
+        Raises:
+            ServicoSobrecarregadoError: Se a fila estiver cheia ou a conferência demorar mais que o limite.
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Indica se o hash gravado foi gerado com parâmetros diferentes dos atuais.
+
+        Args:
+            password_hash (str): O hash gravado.
+
+        Returns:
+            bool: True se o método ou o tamanho do sal forem diferentes dos configurados.
+        """
+        if password_hash.count("$") < 2:
+            return True
+
+        method, salt, _ = password_hash.split("$", 2)
+
+        try:
+            method = normalize_method(method)
+        except ValueError:
+            return True
+
+        return method != self.method or len(salt) != self.salt_length
+
+    def stats(self):
+        """Retorna os contadores de hashes concluídos, recusados por fila cheia e expirados."""
+        with self._lock:
+            return dict(self._counters)
+
+
+password_hasher = PasswordHasher()
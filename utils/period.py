@@ -0,0 +1,98 @@
+from datetime import date
+from sqlalchemy import and_
+from utils.exceptions import ValorInvalidoError
+
+MAX_RANGE_MONTHS = 120
+
+
+def month_range(month, year):
+    """Calcula o intervalo semiaberto [primeiro dia do mês, primeiro dia do mês seguinte).
+
+    Args:
+        month (int): O mês numérico (1-12).
+        year (int): O ano com 4 dígitos.
+
+    Returns:
+        tuple[date, date]: A data inicial (inclusiva) e a data final (exclusiva) do período.
+
+    Raises:
+        ValorInvalidoError: Se o mês ou o ano forem inválidos.
+    """
+    try:
+        month = int(month)
+        year = int(year)
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    except (ValueError, TypeError, OverflowError):
+        raise ValorInvalidoError("Período inválido.")
+
+    return start, end
+
+
+def month_filter(column, month, year):
+    """Monta o filtro de um mês sobre uma coluna de data como comparação de intervalo.
+
+    Diferente de `extract('month', coluna) == month`, a comparação direta com a
+    coluna permite que o SQLite use os índices que começam por ela (ou que a
+    tenham logo após uma igualdade, como (wallet_id, created_at)).
+
+    Args:
+        column (Column): A coluna de data a ser filtrada (ex: Transaction.created_at).
+        month (int): O mês numérico (1-12).
+        year (int): O ano com 4 dígitos.
+
+    Returns:
+        BooleanClauseList: A expressão `column >= início AND column < fim`.
+
+    Raises:
+        ValorInvalidoError: Se o mês ou o ano forem inválidos.
+    """
+    start, end = month_range(month, year)
+    return and_(column >= start, column < end)
+
+
+def parse_month(text):
+    """Converte um mês no formato 'AAAA-MM' (ex: o valor de um <input type="month">).
+
+    Args:
+        text (str): O mês no formato 'AAAA-MM'.
+
+    Returns:
+        tuple[int, int]: O ano e o mês.
+
+    Raises:
+        ValorInvalidoError: Se o texto não estiver no formato esperado.
+    """
+    try:
+        year, month = (int(part) for part in text.split("-"))
+    except (ValueError, AttributeError):
+        raise ValorInvalidoError(f"Mês inválido: '{text}'.")
+
+    start, _ = month_range(month, year)
+    return start.year, start.month
+
+
+def month_sequence(start, end):
+    """Lista os meses de `start` a `end` (inclusive), em ordem.
+
+    Args:
+        start (tuple[int, int]): O primeiro mês (ano, mês).
+        end (tuple[int, int]): O último mês (ano, mês).
+
+    Returns:
+        list[tuple[int, int]]: Os pares (ano, mês) do intervalo.
+
+    Raises:
+        ValorInvalidoError: Se `start` for posterior a `end` ou o intervalo passar
+            de MAX_RANGE_MONTHS meses.
+    """
+    first = start[0] * 12 + start[1] - 1
+    last = end[0] * 12 + end[1] - 1
+
+    if first > last:
+        raise ValorInvalidoError("O mês inicial deve ser anterior ao mês final.")
+
+    if last - first + 1 > MAX_RANGE_MONTHS:
+        raise ValorInvalidoError(f"O período pode ter no máximo {MAX_RANGE_MONTHS} meses.")
+
+    return [(index // 12, index % 12 + 1) for index in range(first, last + 1)]
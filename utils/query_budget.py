@@ -0,0 +1,43 @@
+from flask import current_app
+from utils.exceptions import OrcamentoDeConsultasExcedidoError
+from utils.query_stats import QueryStats
+
+
+class QueryBudget(QueryStats):
+    """Limita a quantidade de comandos SQL executados dentro de um bloco `with`.
+
+    Serve para garantir que uma tela continue com um número fixo de consultas,
+    independente da quantidade de dados do usuário (ex: um N+1 introduzido sem
+    querer). Ao sair do bloco, se o limite foi ultrapassado:
+
+    - com `QUERY_BUDGET_STRICT` (padrão: ligado quando `app.testing`), levanta
+      `OrcamentoDeConsultasExcedidoError`;
+    - caso contrário, apenas registra um aviso no log da aplicação.
+
+    Args:
+        name (str): Nome do bloco medido (aparece no aviso/erro).
+        limit (int): Quantidade máxima de comandos permitidos.
+
+    Example:
+        with QueryBudget("dashboard", 4):
+            overview = DashboardController.get_overview(user_id)
+    """
+
+    def __init__(self, name, limit):
+        super().__init__()
+        self.name = name
+        self.limit = limit
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+
+        if exc_type is not None or self.count <= self.limit:
+            return False
+
+        message = f"'{self.name}' executou {self.count} consultas (orçamento: {self.limit})."
+
+        if current_app.config.get("QUERY_BUDGET_STRICT", current_app.testing):
+            raise OrcamentoDeConsultasExcedidoError(message)
+
+        current_app.logger.warning(message)
+        return False
@@ -0,0 +1,81 @@
+from datetime import datetime
+from extensions import db
+from models.transaction import Transaction
+from utils.pagination import DEFAULT_PAGE_SIZE
+
+
+def explain_query_plan(query):
+    """Executa `EXPLAIN QUERY PLAN` no SQLite para uma consulta do SQLAlchemy.
+
+    Args:
+        query (Query|Select): A consulta a ser analisada (não é executada).
+
+    Returns:
+        list[str]: As linhas de detalhe do plano (ex: 'SEARCH transactions USING INDEX ...').
+    """
+    statement = query.statement if hasattr(query, "statement") else query
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+
+    rows = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+    return [row[-1] for row in rows]
+
+
+def find_full_scans(query):
+    """Retorna os passos do plano em que o SQLite percorre uma tabela (ou índice) inteira.
+
+    Args:
+        query (Query|Select): A consulta a ser analisada.
+
+    Returns:
+        list[str]: Os detalhes do plano que começam com 'SCAN'. Lista vazia se todos
+                   os acessos forem buscas por índice ('SEARCH').
+    """
+    return [detail for detail in explain_query_plan(query) if detail.startswith("SCAN")]
+
+
+def monitored_queries():
+    """Monta as consultas de listagem e de relatório cujo plano deve usar índices.
+
+    Os parâmetros (usuário, carteira e período) são fictícios: o plano escolhido
+    pelo SQLite depende apenas da forma da consulta e dos índices existentes.
+
+    Returns:
+        dict[str, Query]: As consultas indexadas por um nome descritivo.
+    """
+    # Importados aqui para evitar importação circular (controllers -> utils)
+    from controllers.transaction_controller import TransactionController
+    from controllers.report_controller import ReportController
+
+    today = datetime.now()
+    user_id, wallet_id = 0, 0
+    order = (Transaction.created_at.desc(), Transaction.id.desc())
+
+    return {
+        "transaction_list": TransactionController._user_transactions_query(user_id, today.month, today.year)
+            .order_by(*order).limit(DEFAULT_PAGE_SIZE + 1),
+        "wallet_detail": Transaction.query.filter_by(wallet_id= wallet_id)
+            .order_by(*order).limit(DEFAULT_PAGE_SIZE + 1),
+        "report_expenses_by_category": ReportController._expenses_by_category_query(user_id, today.month, today.year),
+        "report_monthly_summary": ReportController._monthly_summary_query(user_id, today.month, today.year),
+        "report_monthly_report": ReportController._monthly_report_query(user_id, today.month, today.year),
+        "report_category_month_range": ReportController._category_month_range_query(
+            user_id, (today.year - 1, today.month), (today.year, today.month)),
+        "report_consolidated_balance": ReportController._consolidated_balance_query(user_id),
+    }
+
+
+def check_query_plans():
+    """Verifica se alguma das consultas monitoradas voltou a fazer varredura completa.
+
+    Returns:
+        dict[str, list[str]]: Para cada consulta com problema, os passos 'SCAN' do plano.
+                              Dicionário vazio se todas usam índices.
+    """
+    problems = {}
+
+    for name, query in monitored_queries().items():
+        scans = find_full_scans(query)
+        if scans:
+            problems[name] = scans
+
+    return problems
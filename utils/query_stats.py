@@ -0,0 +1,188 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_N_PLUS_ONE_THRESHOLD = 5
+
+logger = logging.getLogger("finance.sql")
+
+# Coletores abertos na thread atual (cada requisição roda na sua própria thread)
+_active = threading.local()
+
+_IN_LIST = re.compile(r"\(\?(?:, \?)+\)")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """Normaliza um comando SQL para agrupar execuções da mesma consulta.
+
+    Os valores já chegam como parâmetros ('?'); aqui só são unificados os espaços
+    e as listas de `IN (?, ?, ...)`, cujo tamanho varia a cada execução.
+
+    Args:
+        statement (str): O SQL enviado ao banco.
+
+    Returns:
+        str: O formato do comando (ex: 'SELECT ... WHERE wallets.id IN (?)').
+    """
+    return _IN_LIST.sub("(?)", _SPACES.sub(" ", statement).strip())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    # O início fica no contexto da execução (um por comando): se o comando falhar, o
+    # after_cursor_execute não roda e o valor é descartado junto com o contexto
+    context._query_stats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    """Entrega o comando e o seu tempo a todos os coletores abertos na thread."""
+    elapsed = time.perf_counter() - context._query_stats_start
+
+    for stats in getattr(_active, "collectors", ()):
+        stats.record(statement, elapsed)
+
+
+class QueryStats():
+    """Coleta a quantidade, o tempo e o formato dos comandos SQL executados em um bloco `with`.
+
+    Só conta os comandos da thread que abriu o bloco. Pode ser aninhado: cada
+    coletor aberto recebe todos os comandos executados enquanto ele estiver ativo.
+
+    Attributes:
+        count (int): Quantidade de comandos executados.
+        total_time (float): Tempo total no banco, em segundos.
+        shapes (Counter): Quantas vezes cada formato de comando (ver `statement_shape`) rodou.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold=SQL_N_PLUS_ONE_THRESHOLD):
+        """Retorna os formatos executados mais de `threshold` vezes (prováveis N+1).
+
+        Returns:
+            list[tuple[str, int]]: Pares (formato, quantidade), do mais repetido ao menos.
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def __enter__(self):
+        if not hasattr(_active, "collectors"):
+            _active.collectors = []
+
+        _active.collectors.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active.collectors.remove(self)
+        return False
+
+
+def init_app(app):
+    """Mede os comandos SQL de cada requisição da aplicação.
+
+    Cada resposta recebe os cabeçalhos `X-DB-Queries` (quantidade de comandos) e
+    `X-DB-Time` (tempo total no banco, em milissegundos), e uma linha em JSON é
+    registrada no logger 'finance.sql' com o endpoint, o método, o caminho, o status
+    e as medidas. Se um mesmo formato de comando rodar mais de
+    `SQL_N_PLUS_ONE_THRESHOLD` vezes, a linha sai como aviso e lista os formatos
+    repetidos (provável N+1). Desligado com `SQL_INSTRUMENTATION = False`.
+
+    Args:
+        app (Flask): A aplicação.
+    """
+    app.config.setdefault("SQL_INSTRUMENTATION", True)
+    app.config.setdefault("SQL_N_PLUS_ONE_THRESHOLD", SQL_N_PLUS_ONE_THRESHOLD)
+
+    if not app.config["SQL_INSTRUMENTATION"]:
+        return
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s in %(name)s: %(message)s"))
+        logger.addHandler(handler)
+
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats().__enter__()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop("query_stats", None)
+
+        if stats is None:
+            return response
+
+        stats.__exit__(None, None, None)
+        repeated = stats.repeated(app.config["SQL_N_PLUS_ONE_THRESHOLD"])
+
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["X-DB-Time"] = f"{stats.total_time * 1000:.2f}"
+
+        entry = {
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "db_queries": stats.count,
+            "db_time_ms": round(stats.total_time * 1000, 2)
+        }
+
+        if repeated:
+            entry["n_plus_one"] = [{"statement": shape[:200], "count": count} for shape, count in repeated]
+            logger.warning(json.dumps(entry, ensure_ascii= False))
+        else:
+            logger.info(json.dumps(entry, ensure_ascii= False))
+
+        return response
+
+    @app.teardown_request
+    def discard_query_stats(exception):
+        # Requisições que terminam em erro não passam pelo after_request
+        stats = g.pop("query_stats", None)
+
+        if stats is not None:
+            stats.__exit__(None, None, None)
+
+
+def assert_max_queries(client, url, limit, method="GET", **kwargs):
+    """Auxiliar de teste: falha se uma rota executar mais de `limit` comandos SQL.
+
+    Usa o cabeçalho `X-DB-Queries` da resposta, então a aplicação precisa estar com
+    `SQL_INSTRUMENTATION` ligado.
+
+    Args:
+        client (FlaskClient): O cliente de teste (`app.test_client()`), já autenticado se preciso.
+        url (str): A rota a chamar.
+        limit (int): Quantidade máxima de comandos permitidos.
+        method (str, optional): O método HTTP.
+        **kwargs: Argumentos repassados a `client.open` (ex: data, headers).
+
+    Returns:
+        TestResponse: A resposta, para outras verificações.
+
+    Raises:
+        AssertionError: Se a rota executar mais comandos que o permitido.
+    """
+    response = client.open(url, method= method, **kwargs)
+    count = int(response.headers["X-DB-Queries"])
+
+    assert count <= limit, f"{method} {url} executou {count} consultas (máximo: {limit})."
+    return response
@@ -0,0 +1,161 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, update, func, case
+from extensions import db, report_cache
+from models.transaction import Transaction
+from models.wallet import Wallet
+from utils.data_version import bump_data_version
+
+RECONCILE_BATCH_SIZE = 500
+RECONCILE_WORKERS = 4
+
+
+def _ledger_sum(transaction):
+    """Expressão da soma com sinal das transações: receitas somam, despesas subtraem.
+
+    O 'Depósito inicial' de cada carteira é gravado como uma receita, então o saldo
+    esperado é exatamente essa soma.
+    """
+    return func.coalesce(func.sum(case(
+        (transaction.transaction_type == "income", transaction.value),
+        else_= -transaction.value
+    )), 0)
+
+
+def user_batches(batch_size=RECONCILE_BATCH_SIZE):
+    """Divide os usuários donos de carteiras em intervalos contíguos de IDs.
+
+    Args:
+        batch_size (int, optional): Quantidade de usuários por lote.
+
+    Returns:
+        list[tuple[int, int]]: Os intervalos (primeiro_id, último_id), inclusivos.
+    """
+    user_ids = db.session.execute(
+        select(Wallet.user_id).distinct().order_by(Wallet.user_id)
+    ).scalars().all()
+
+    return [
+        (user_ids[start], user_ids[min(start + batch_size, len(user_ids)) - 1])
+        for start in range(0, len(user_ids), batch_size)
+    ]
+
+
+def find_drift(first_user_id, last_user_id):
+    """Compara o saldo gravado com o saldo calculado das carteiras de um lote de usuários.
+
+    Um único SELECT agrupado por carteira soma as transações de todas as carteiras
+    do lote (ativas ou não) e devolve apenas as que divergem.
+
+    Args:
+        first_user_id (int): O primeiro ID de usuário do lote.
+        last_user_id (int): O último ID de usuário do lote (inclusivo).
+
+    Returns:
+        list[dict]: Uma entrada por carteira divergente, com as chaves "wallet_id",
+        "user_id", "stored", "expected" e "drift" (gravado - esperado).
+    """
+    expected = _ledger_sum(Transaction)
+
+    rows = db.session.execute(
+        select(Wallet.id, Wallet.user_id, Wallet.current_balance, expected.label("expected"))
+        .outerjoin(Transaction, Transaction.wallet_id == Wallet.id)
+        .where(Wallet.user_id.between(first_user_id, last_user_id))
+        .group_by(Wallet.id, Wallet.user_id, Wallet.current_balance)
+        # Valores em centavos inteiros (ver `Money`): a comparação é exata
+        .having(func.coalesce(Wallet.current_balance, 0) != expected)
+    ).all()
+
+    return [{
+        "wallet_id": row.id,
+        "user_id": row.user_id,
+        "stored": row.current_balance,
+        "expected": row.expected,
+        "drift": (row.current_balance or 0.0) - row.expected
+    } for row in rows]
+
+
+def repair_balances(wallet_ids):
+    """Regrava o saldo das carteiras informadas com a soma das suas transações.
+
+    O saldo é recalculado dentro do próprio UPDATE (subconsulta correlacionada), e não
+    copiado do relatório, então uma transação gravada entre a verificação e o reparo
+    não é perdida.
+
+    Args:
+        wallet_ids (list[int]): Os IDs das carteiras a corrigir.
+
+    Returns:
+        int: A quantidade de carteiras atualizadas.
+    """
+    if not wallet_ids:
+        return 0
+
+    ledger = select(_ledger_sum(Transaction))\
+        .where(Transaction.wallet_id == Wallet.id)\
+        .scalar_subquery()
+
+    result = db.session.execute(
+        update(Wallet)
+        .where(Wallet.id.in_(wallet_ids))
+        .values(current_balance= ledger)
+        .execution_options(synchronize_session= False)
+    )
+
+    user_ids = db.session.execute(
+        select(Wallet.user_id).where(Wallet.id.in_(wallet_ids)).distinct()
+    ).scalars().all()
+
+    for user_id in user_ids:
+        bump_data_version(user_id)
+
+    db.session.commit()
+
+    return result.rowcount
+
+
+def reconcile_balances(app, repair=False, workers=RECONCILE_WORKERS, batch_size=RECONCILE_BATCH_SIZE):
+    """Verifica (e opcionalmente corrige) o saldo de todas as carteiras em lotes paralelos.
+
+    Os lotes de usuários são lidos em paralelo, cada um em uma thread com o seu próprio
+    contexto de aplicação (e, portanto, a sua própria conexão). Os reparos são feitos
+    na thread principal, um UPDATE por lote, para não disputar o bloqueio de escrita
+    do SQLite entre as threads.
+
+    Args:
+        app (Flask): A aplicação, usada para abrir um contexto em cada thread.
+        repair (bool, optional): Se True, corrige os saldos divergentes.
+        workers (int, optional): Quantidade de threads de leitura.
+        batch_size (int, optional): Quantidade de usuários por lote.
+
+    Returns:
+        dict: Um dicionário contendo as chaves:
+            - "batches" (int): Quantidade de lotes processados.
+            - "drift" (list[dict]): As carteiras divergentes (ver `find_drift`).
+            - "repaired" (int): Quantidade de carteiras corrigidas (0 sem `repair`).
+    """
+    with app.app_context():
+        batches = user_batches(batch_size)
+
+    def check_batch(batch):
+        with app.app_context():
+            return find_drift(*batch)
+
+    with ThreadPoolExecutor(max_workers= max(1, workers)) as executor:
+        results = list(executor.map(check_batch, batches))
+
+    drift = [item for batch_drift in results for item in batch_drift]
+    repaired = 0
+
+    if repair:
+        with app.app_context():
+            for batch_drift in results:
+                repaired += repair_balances([item["wallet_id"] for item in batch_drift])
+
+                for user_id in {item["user_id"] for item in batch_drift}:
+                    report_cache.invalidate(user_id, [])
+
+    return {
+        "batches": len(batches),
+        "drift": drift,
+        "repaired": repaired
+    }
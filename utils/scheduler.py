@@ -0,0 +1,34 @@
+import threading
+from controllers.goal_controller import GoalController
+
+
+def start_goal_sweeper(app, interval):
+    """Inicia uma thread que desativa as metas vencidas a cada `interval` segundos.
+
+    Cada execução roda `GoalController.expire_overdue_goals` (um UPDATE para todos os
+    usuários) em um contexto de aplicação próprio e registra no log da aplicação
+    quantas metas foram desativadas. A thread é daemon: termina junto com o processo.
+    Com vários processos, cada um roda a sua; o UPDATE é idempotente.
+
+    Args:
+        app (Flask): A aplicação.
+        interval (float): Segundos entre as execuções.
+
+    Returns:
+        threading.Event: Evento que, quando acionado (`set()`), encerra a thread.
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    expired = GoalController.expire_overdue_goals()
+                except Exception:
+                    app.logger.exception("Falha ao expirar metas vencidas.")
+                    continue
+
+                app.logger.info("%s meta(s) vencida(s) desativada(s).", expired)
+
+    threading.Thread(target= run, name= "goal-sweeper", daemon= True).start()
+    return stop
@@ -1,22 +1,219 @@
-from models.category import SystemCategory
+import math
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert, select, union_all, literal
+from models.category import Category, UserCategory
+from models.user import User
+from models.wallet import Wallet
+from models.transaction import Transaction
+from models.goal import Goal
+from models.objective import Objective
 from extensions import db
+from utils.exceptions import UsuarioJaExisteError, ValorInvalidoError
+from utils.money import from_cents
+from utils.system_categories import system_categories
+from utils.passwords import password_hasher
 
+SYNTHETIC_PASSWORD = "senha123"
+SYNTHETIC_CATEGORIES = [
+    "Alimentação", "Moradia", "Transporte", "Lazer", "Saúde",
+    "Educação", "Assinaturas", "Vestuário", "Salário", "Investimentos"
+]
 
-def seed_system_categories():  
-    default_categories = [
-        "Depósito inicial",
-        "Fechamento de carteira",
+
+SYSTEM_CATEGORIES = [
+    "Depósito inicial",
+    "Fechamento de carteira",
+]
+
+
+def seed_system_categories():
+    """Cria as categorias de sistema que ainda não existem, em um único INSERT ... SELECT.
+
+    Cada nome de `SYSTEM_CATEGORIES` só é inserido se ainda não houver uma categoria
+    de sistema com esse nome (NOT EXISTS), então rodar de novo não duplica nada.
+    Se alguma for criada, o registro em memória (`system_categories`) é recarregado.
+
+    Returns:
+        int: A quantidade de categorias criadas.
+    """
+    defaults = union_all(*[select(literal(name).label("name")) for name in SYSTEM_CATEGORIES]).subquery("defaults")
+    existing = select(Category.id)\
+        .where(Category.type == "system", Category.name == defaults.c.name)\
+        .exists()
+
+    created = db.session.execute(
+        insert(Category.__table__).from_select(
+            ["name", "type", "is_default"],
+            select(defaults.c.name, literal("system"), literal(True)).where(~existing)
+        )
+    ).rowcount
+
+    db.session.commit()
+
+    if created:
+        # Novos padrões: o registro em memória passa a enxergá-los sem reiniciar
+        system_categories.refresh()
+        print(f"[OK] {created} categoria(s) de sistema criada(s).")
+
+    return created
+
+
+def synthetic_email(index, seed):
+    """Monta o e-mail do usuário sintético número `index` (a partir de 1) gerado com `seed`."""
+    return f"user{index}.s{seed}@exemplo.com"
+
+
+def seed_synthetic_data(users=10, wallets=2, transactions=500, categories=6, goals=3, objectives=2,
+                        start=None, end=None, expense_ratio=0.7, value_distribution="lognormal",
+                        category_skew=1.0, seed=42):
+    """Gera uma massa de dados realista e reproduzível para medições de desempenho.
+
+    Cria `users` usuários, cada um com `wallets` carteiras de `transactions`
+    transações, `categories` categorias próprias, `goals` metas e `objectives`
+    objetivos. Os saldos seguem as mesmas regras da aplicação: cada carteira começa
+    com um 'Depósito inicial' e nenhuma despesa deixa o saldo negativo (uma despesa
+    maior que o saldo vira receita). No fim os totais mensais são reconstruídos.
+    A mesma semente gera sempre os mesmos dados.
+
+    Todos os usuários entram com a senha `SYNTHETIC_PASSWORD` e o e-mail de
+    `synthetic_email`.
+
+    Args:
+        users (int, optional): Quantidade de usuários.
+        wallets (int, optional): Carteiras por usuário.
+        transactions (int, optional): Transações por carteira (além do depósito inicial).
+        categories (int, optional): Categorias por usuário (no máximo `len(SYNTHETIC_CATEGORIES)`).
+        goals (int, optional): Metas ativas por usuário.
+        objectives (int, optional): Objetivos por usuário (alternando entre vinculados a uma
+            carteira e gerais).
+        start (date, optional): Primeira data das transações. Default: 1 ano antes de `end`.
+        end (date, optional): Última data das transações. Default: hoje.
+        expense_ratio (float, optional): Proporção de despesas (0 a 1).
+        value_distribution (str, optional): 'lognormal' (muitos valores pequenos e poucos
+            grandes) ou 'uniform' (entre R$ 1 e R$ 500).
+        category_skew (float, optional): Concentração das transações nas primeiras
+            categorias (0 = todas igualmente usadas).
+        seed (int, optional): Semente do gerador aleatório.
+
+    Returns:
+        dict: Quantidades geradas ("users", "wallets", "transactions", "categories",
+        "goals" e "objectives") e os IDs dos usuários criados ("user_ids").
+
+    Raises:
+        ValorInvalidoError: Se algum parâmetro for inválido.
+        UsuarioJaExisteError: Se os dados dessa semente já tiverem sido gerados.
+    """
+    # Importado aqui: o controlador de totais mensais depende dos modelos carregados pelo app
+    from controllers.rollup_controller import RollupController
+
+    end = end or date.today()
+    start = start or end - timedelta(days= 365)
+
+    if start > end:
+        raise ValorInvalidoError("A data inicial deve ser anterior à data final.")
+
+    if not 1 <= categories <= len(SYNTHETIC_CATEGORIES):
+        raise ValorInvalidoError(f"A quantidade de categorias deve estar entre 1 e {len(SYNTHETIC_CATEGORIES)}.")
+
+    if not 0 <= expense_ratio <= 1:
+        raise ValorInvalidoError("A proporção de despesas deve estar entre 0 e 1.")
+
+    if value_distribution not in ("lognormal", "uniform"):
+        raise ValorInvalidoError("Distribuição de valores inválida.")
+
+    if User.query.filter_by(email= synthetic_email(1, seed)).first():
+        raise UsuarioJaExisteError(f"Os dados sintéticos da semente {seed} já foram gerados.")
+
+    generator = random.Random(seed)
+    span = (end - start).days
+    deposit_category = system_categories.get("Depósito inicial")
+    category_weights = [1 / (index + 1) ** category_skew for index in range(categories)]
+
+    def random_cents():
+        if value_distribution == "uniform":
+            return generator.randint(100, 50_000)
+        # Mediana de ~R$ 60, com cauda longa
+        return max(1, int(generator.lognormvariate(math.log(6_000), 1.0)))
+
+    def random_date():
+        return start + timedelta(days= generator.randint(0, span))
+
+    password_hash = password_hasher.hash(SYNTHETIC_PASSWORD)
+    user_rows = [
+        User(username= f"Usuário {index}", email= synthetic_email(index, seed), _password= password_hash)
+        for index in range(1, users + 1)
     ]
+    db.session.add_all(user_rows)
+    db.session.flush()
+
+    counts = {"users": users, "wallets": 0, "transactions": 0, "categories": 0, "goals": 0, "objectives": 0}
+
+    for user in user_rows:
+        user_categories = [UserCategory(name= name, user_id= user.id) for name in SYNTHETIC_CATEGORIES[:categories]]
+        user_wallets = [
+            Wallet(wallet_name= f"Carteira {index}", initial_balance= 0, current_balance= 0, user_id= user.id)
+            for index in range(1, wallets + 1)
+        ]
+        db.session.add_all(user_categories + user_wallets)
+        db.session.flush()
+
+        ledger = []
+
+        for wallet in user_wallets:
+            balance = generator.randint(100_000, 1_000_000)
+            wallet.initial_balance = from_cents(balance)
+            ledger.append({
+                "transaction_type": "income", "value": from_cents(balance), "created_at": start,
+                "description": "Depósito para abertura", "wallet_id": wallet.id, "category_id": deposit_category.id
+            })
+
+            for created_at in sorted(random_date() for _ in range(transactions)):
+                cents = random_cents()
+                transaction_type = "expense" if generator.random() < expense_ratio and cents <= balance else "income"
+                balance += cents if transaction_type == "income" else -cents
+                category = generator.choices(user_categories, weights= category_weights)[0]
+
+                ledger.append({
+                    "transaction_type": transaction_type, "value": from_cents(cents), "created_at": created_at,
+                    "description": f"{category.name} {created_at:%d/%m}", "wallet_id": wallet.id,
+                    "category_id": category.id
+                })
+
+            wallet.current_balance = from_cents(balance)
+
+        db.session.execute(insert(Transaction), ledger)
+
+        for index in range(1, goals + 1):
+            created_at = random_date()
+            db.session.add(Goal(
+                goal_name= f"Meta {index}",
+                target_amount= from_cents(generator.randint(50_000, 500_000)),
+                created_at= created_at,
+                deadline= created_at + timedelta(days= generator.choice((30, 365))),
+                user_id= user.id,
+                category_id= generator.choice(user_categories).id
+            ))
+
+        for index in range(1, objectives + 1):
+            db.session.add(Objective(
+                objective_name= f"Objetivo {index}",
+                target_amount= from_cents(generator.randint(100_000, 5_000_000)),
+                due_date= datetime.combine(end + timedelta(days= generator.randint(30, 720)), datetime.min.time()),
+                icon= "🎯",
+                user_id= user.id,
+                wallet_id= user_wallets[index % len(user_wallets)].id if index % 2 and user_wallets else None
+            ))
+
+        counts["wallets"] += len(user_wallets)
+        counts["transactions"] += len(ledger)
+        counts["categories"] += len(user_categories)
+        counts["goals"] += goals
+        counts["objectives"] += objectives
 
-    for cat_name in default_categories:
-        existing = SystemCategory.query.filter_by(name= cat_name).first()
+    counts["user_ids"] = [user.id for user in user_rows]
 
-        if existing:
-            print(f"[OK] Categoria '{cat_name}' já existe.")
-            continue
-        
-        new_cat = SystemCategory(name= cat_name, is_default= True)
-        db.session.add(new_cat)
-        print(f"[OK] Categoria '{cat_name}' criada.")
+    db.session.commit()
+    RollupController.rebuild()
 
-    db.session.commit()
\ No newline at end of file
+    return counts
@@ -0,0 +1,262 @@
+import csv
+import io
+import math
+from datetime import datetime
+from utils.exceptions import ArquivoInvalidoError, ValorInvalidoError
+from utils.money import MAX_AMOUNT, has_cents_precision
+
+CSV_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y")
+OFX_CHUNK_SIZE = 8192
+
+INCOME_TYPES = {"income", "receita", "credit", "credito", "crédito"}
+EXPENSE_TYPES = {"expense", "despesa", "debit", "debito", "débito"}
+
+
+def parse_value(raw, thousands=True):
+    """Converte um valor monetário textual em float, aceitando formato brasileiro.
+
+    Quando o texto tem vírgula e ponto, o separador que aparece por último é o
+    decimal e o outro é o de milhar. Com um só tipo de separador repetido
+    ('1.234.567'), ele é tratado como separador de milhar. Um único separador
+    seguido de exatamente três dígitos ('1.234', '1,234') tanto pode ser milhar quanto
+    decimal, então o valor é recusado em vez de adivinhado; o mesmo vale para valores
+    com mais de duas casas decimais, que seriam arredondados ao virar centavos.
+    Em formatos sem separador de milhar (`thousands=False`, como o OFX), um único
+    separador é sempre o decimal.
+
+    Exemplos:
+        >>> parse_value("1234.56"), parse_value("1234,56"), parse_value("R$ -50,00")
+        (1234.56, 1234.56, -50.0)
+        >>> parse_value("1.234,56"), parse_value("1,234.56"), parse_value("1.234.567")
+        (1234.56, 1234.56, 1234567.0)
+        >>> parse_value("1.234")
+        Traceback (most recent call last):
+        utils.exceptions.ValorInvalidoError: Valor ambíguo: '1.234' (use '1.234,00' ou '1234').
+        >>> parse_value("-100.000", thousands= False)
+        -100.0
+        >>> parse_value("0,005")
+        Traceback (most recent call last):
+        utils.exceptions.ValorInvalidoError: Valor com mais de duas casas decimais: '0,005'.
+        >>> parse_value("nan")
+        Traceback (most recent call last):
+        utils.exceptions.ValorInvalidoError: Valor inválido: 'nan'.
+        >>> parse_value("1e30")
+        Traceback (most recent call last):
+        utils.exceptions.ValorInvalidoError: Valor fora do limite permitido: '1e30'.
+
+    Args:
+        raw (str): O valor lido do arquivo.
+        thousands (bool, optional): Se o formato do arquivo admite separador de milhar.
+
+    Returns:
+        float: O valor convertido (pode ser negativo).
+
+    Raises:
+        ValorInvalidoError: Se o texto não representar um número finito, for ambíguo,
+            tiver mais de duas casas decimais ou passar de `MAX_AMOUNT` em valor absoluto.
+    """
+    text = (raw or "").replace("R$", "").replace(" ", "").strip()
+
+    if "," in text and "." in text:
+        decimal, thousands = (",", ".") if text.rfind(",") > text.rfind(".") else (".", ",")
+        text = text.replace(thousands, "").replace(decimal, ".")
+    elif text.count(",") > 1 or text.count(".") > 1:
+        text = text.replace(",", "").replace(".", "")
+    elif "," in text or "." in text:
+        integer, _, fraction = text.replace(",", ".").partition(".")
+
+        # '1.234' é R$ 1.234,00 no formato brasileiro e R$ 1,23 no americano
+        if thousands and len(fraction) == 3 and fraction.isdigit() and _is_thousands_group(integer):
+            raise ValorInvalidoError(f"Valor ambíguo: '{raw}' (use '1.234,00' ou '1234').")
+
+        text = f"{integer}.{fraction}"
+
+    try:
+        value = float(text)
+    except ValueError:
+        raise ValorInvalidoError(f"Valor inválido: '{raw}'.")
+
+    # float() também aceita 'nan', 'inf' e notação científica
+    if not math.isfinite(value):
+        raise ValorInvalidoError(f"Valor inválido: '{raw}'.")
+
+    if abs(value) > MAX_AMOUNT:
+        raise ValorInvalidoError(f"Valor fora do limite permitido: '{raw}'.")
+
+    if not has_cents_precision(text):
+        raise ValorInvalidoError(f"Valor com mais de duas casas decimais: '{raw}'.")
+
+    return value
+
+
+def _is_thousands_group(integer):
+    """Indica se a parte inteira pode ser o primeiro grupo de um número com separador de milhar."""
+    digits = integer.lstrip("+-")
+    return digits.isdigit() and 1 <= len(digits) <= 3 and not digits.startswith("0")
+
+
+def parse_csv_date(raw):
+    """Converte a data de uma linha CSV ('YYYY-MM-DD' ou 'DD/MM/YYYY').
+
+    Raises:
+        ValorInvalidoError: Se a data não estiver em nenhum dos formatos aceitos.
+    """
+    for date_format in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime((raw or "").strip(), date_format).date()
+        except ValueError:
+            continue
+
+    raise ValorInvalidoError(f"Data inválida: '{raw}'.")
+
+
+def parse_type(raw, value):
+    """Define o tipo da transação pela coluna de tipo ou, na falta dela, pelo sinal do valor.
+
+    Returns:
+        str: 'income' ou 'expense'.
+
+    Raises:
+        ValorInvalidoError: Se o tipo informado não for reconhecido.
+    """
+    raw = (raw or "").strip().lower()
+
+    if not raw:
+        return "expense" if value < 0 else "income"
+    if raw in INCOME_TYPES:
+        return "income"
+    if raw in EXPENSE_TYPES:
+        return "expense"
+
+    raise ValorInvalidoError(f"Tipo de transação inválido: '{raw}'.")
+
+
+def iter_csv(stream):
+    """Lê um extrato CSV linha a linha, sem carregar o arquivo inteiro em memória.
+
+    Colunas esperadas (cabeçalho obrigatório): `date`, `value` e, opcionalmente,
+    `type`, `description` e `category`. O separador (',' ou ';') é detectado
+    pelo cabeçalho.
+
+    Args:
+        stream (BinaryIO): O arquivo enviado, aberto em modo binário.
+
+    Yields:
+        tuple[int, dict|Exception]: O número da linha e os dados normalizados
+        ("date", "value", "transaction_type", "description", "category"), ou a
+        exceção de validação daquela linha.
+
+    Raises:
+        ArquivoInvalidoError: Se o cabeçalho não tiver as colunas obrigatórias.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    header = text.readline()
+    delimiter = ";" if header.count(";") > header.count(",") else ","
+    fields = [field.strip().lower() for field in next(csv.reader([header], delimiter=delimiter), [])]
+
+    if "date" not in fields or "value" not in fields:
+        raise ArquivoInvalidoError("O CSV precisa das colunas 'date' e 'value'.")
+
+    reader = csv.DictReader(text, fieldnames=fields, delimiter=delimiter)
+
+    for line_number, row in enumerate(reader, start=2):
+        try:
+            value = parse_value(row.get("value"))
+            yield line_number, {
+                "date": parse_csv_date(row.get("date")),
+                "value": abs(value),
+                "transaction_type": parse_type(row.get("type"), value),
+                "description": (row.get("description") or "").strip(),
+                "category": (row.get("category") or "").strip()
+            }
+        except ValorInvalidoError as e:
+            yield line_number, e
+
+
+def _iter_ofx_tags(stream):
+    """Quebra um arquivo OFX (SGML ou XML) em pares (tag, texto) lendo em blocos."""
+    buffer = ""
+
+    while True:
+        chunk = stream.read(OFX_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        buffer += chunk.decode("latin-1") if isinstance(chunk, bytes) else chunk
+        parts = buffer.split("<")
+        buffer = parts.pop()  # o último pedaço pode estar incompleto
+
+        for part in parts:
+            if ">" in part:
+                tag, _, content = part.partition(">")
+                yield tag.strip().upper(), content.strip()
+
+    if ">" in buffer:
+        tag, _, content = buffer.partition(">")
+        yield tag.strip().upper(), content.strip()
+
+
+def iter_ofx(stream):
+    """Lê as transações (<STMTTRN>) de um extrato OFX em memória constante.
+
+    Usa TRNAMT (com sinal) para valor e tipo, DTPOSTED para a data e MEMO
+    (ou NAME) para a descrição. OFX não traz categoria.
+
+    Args:
+        stream (BinaryIO): O arquivo enviado, aberto em modo binário.
+
+    Yields:
+        tuple[int, dict|Exception]: A posição da transação no arquivo e os dados
+        normalizados, ou a exceção de validação daquela transação.
+    """
+    current = None
+    position = 0
+
+    for tag, content in _iter_ofx_tags(stream):
+        if tag == "STMTTRN":
+            position += 1
+            current = {}
+        elif tag == "/STMTTRN" and current is not None:
+            yield position, _normalize_ofx_transaction(current)
+            current = None
+        elif current is not None and not tag.startswith("/"):
+            current[tag] = content
+
+
+def _normalize_ofx_transaction(fields):
+    """Converte os campos de um <STMTTRN> no mesmo formato produzido por `iter_csv`."""
+    try:
+        # No OFX o valor não tem separador de milhar
+        value = parse_value(fields.get("TRNAMT"), thousands= False)
+        raw_date = (fields.get("DTPOSTED") or "")[:8]
+
+        try:
+            date = datetime.strptime(raw_date, "%Y%m%d").date()
+        except ValueError:
+            raise ValorInvalidoError(f"Data inválida: '{fields.get('DTPOSTED')}'.")
+
+        return {
+            "date": date,
+            "value": abs(value),
+            "transaction_type": "expense" if value < 0 else "income",
+            "description": fields.get("MEMO") or fields.get("NAME") or "",
+            "category": ""
+        }
+    except ValorInvalidoError as e:
+        return e
+
+
+def iter_statement(stream, filename):
+    """Escolhe o leitor (CSV ou OFX) pela extensão do arquivo.
+
+    Raises:
+        ArquivoInvalidoError: Se a extensão não for suportada.
+    """
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+
+    if extension == "csv":
+        return iter_csv(stream)
+    if extension == "ofx":
+        return iter_ofx(stream)
+
+    raise ArquivoInvalidoError("Formato de arquivo não suportado. Envie um arquivo .csv ou .ofx.")
@@ -0,0 +1,112 @@
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from flask import current_app
+from sqlalchemy import select
+from extensions import db
+from models.category import SystemCategory
+
+EXTENSION_KEY = "system_categories"
+
+SystemCategoryEntry = namedtuple("SystemCategoryEntry", ["id", "name"])
+
+
+class SystemCategorySnapshot():
+    """Cópia imutável das categorias de sistema, indexada por nome e por ID.
+
+    Attributes:
+        by_name (Mapping[str, SystemCategoryEntry]): As categorias pelo nome.
+        by_id (Mapping[int, SystemCategoryEntry]): As categorias pelo ID.
+    """
+
+    __slots__ = ("by_name", "by_id")
+
+    def __init__(self, entries):
+        self.by_name = MappingProxyType({entry.name: entry for entry in entries})
+        self.by_id = MappingProxyType({entry.id: entry for entry in entries})
+
+
+class SystemCategoryRegistry():
+    """Registro em memória das categorias de sistema (ex: 'Depósito inicial').
+
+    As categorias de sistema só mudam quando o seeder cadastra novos padrões, então
+    são lidas do banco uma vez (na inicialização ou no primeiro uso) e consultadas
+    em memória nos caminhos quentes, como a criação de carteiras e transações. Cada
+    aplicação guarda o seu próprio snapshot em `app.extensions`, já que os IDs
+    dependem do banco configurado. O snapshot nunca é alterado: `refresh` monta um
+    novo e troca a referência, então leituras em outras threads nunca veem um
+    registro pela metade.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Prepara o espaço do snapshot na aplicação (carregado no primeiro uso)."""
+        app.extensions[EXTENSION_KEY] = None
+
+    def refresh(self):
+        """Relê as categorias de sistema do banco e substitui o snapshot da aplicação atual.
+
+        Returns:
+            SystemCategorySnapshot: O novo snapshot.
+        """
+        rows = db.session.execute(select(SystemCategory.id, SystemCategory.name)).all()
+
+        snapshot = SystemCategorySnapshot([SystemCategoryEntry(row.id, row.name) for row in rows])
+        current_app.extensions[EXTENSION_KEY] = snapshot
+        return snapshot
+
+    def snapshot(self):
+        """Devolve o snapshot da aplicação atual, carregando-o se ainda não existir."""
+        snapshot = current_app.extensions.get(EXTENSION_KEY)
+
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            snapshot = current_app.extensions.get(EXTENSION_KEY)
+            return snapshot if snapshot is not None else self.refresh()
+
+    def get(self, name):
+        """Busca uma categoria de sistema pelo nome.
+
+        Se o nome não estiver no snapshot, relê o banco uma vez (a categoria pode ter
+        sido cadastrada por outro processo depois da carga).
+
+        Args:
+            name (str): O nome da categoria (ex: 'Depósito inicial').
+
+        Returns:
+            SystemCategoryEntry|None: A categoria, ou None se não existir.
+        """
+        entry = self.snapshot().by_name.get(name)
+
+        if entry is None:
+            with self._lock:
+                entry = self.refresh().by_name.get(name)
+
+        return entry
+
+    def get_by_id(self, category_id):
+        """Busca uma categoria de sistema pelo ID, sem consultar o banco.
+
+        Args:
+            category_id (int|str): O ID da categoria (aceita o valor vindo de formulário).
+
+        Returns:
+            SystemCategoryEntry|None: A categoria, ou None se o ID não for de uma categoria de sistema.
+        """
+        try:
+            category_id = int(category_id)
+        except (ValueError, TypeError):
+            return None
+
+        return self.snapshot().by_id.get(category_id)
+
+    def is_system(self, category_id):
+        """Indica se o ID pertence a uma categoria de sistema, sem consultar o banco."""
+        return self.get_by_id(category_id) is not None
+
+
+system_categories = SystemCategoryRegistry()
@@ -0,0 +1,128 @@
+from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from extensions import db
+from models.user import User
+from utils.cache import MemoryCacheBackend
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 60
+
+
+class SessionUser(UserMixin):
+    """Identidade do usuário logado, guardada no cache no lugar do objeto do ORM.
+
+    Não está ligada a nenhuma sessão do banco (pode ser compartilhada entre threads)
+    e não guarda o hash da senha. Expõe apenas o que as rotas usam de `current_user`.
+
+    Attributes:
+        id (int): O ID do usuário.
+        username (str): O nome de exibição.
+        email (str): O e-mail de login.
+    """
+
+    __slots__ = ("id", "username", "email")
+
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    def __repr__(self):
+        return f"<SessionUser {self.email}>"
+
+
+class UserLoaderCache():
+    """Cache das identidades carregadas pelo `user_loader` do Flask-Login.
+
+    Sem ele, toda requisição autenticada faz um SELECT na tabela de usuários. As
+    entradas ficam em um `MemoryCacheBackend` (LRU + TTL, protegido por lock) e são
+    descartadas quando o usuário é alterado ou removido pelo ORM (ex: troca de nome,
+    e-mail ou senha) e no logout. Como o cache é do processo, uma alteração feita
+    por outro worker só é vista depois do TTL. Configurações:
+
+    - `USER_CACHE_ENABLED` (padrão True): False faz toda requisição ir ao banco.
+    - `USER_CACHE_MAX_ENTRIES` e `USER_CACHE_TTL` (segundos) limitam o tamanho e a idade.
+    """
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app):
+        """Cria o backend configurado para a aplicação."""
+        enabled = app.config.setdefault("USER_CACHE_ENABLED", True)
+        max_entries = app.config.setdefault("USER_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        ttl = app.config.setdefault("USER_CACHE_TTL", DEFAULT_TTL)
+
+        self.backend = MemoryCacheBackend(max_entries, ttl) if enabled else None
+
+    @staticmethod
+    def key(user_id):
+        """Monta a chave de um usuário (o ':' final evita que 'user:1' alcance 'user:10')."""
+        return f"user:{int(user_id)}:"
+
+    def load(self, user_id):
+        """Devolve a identidade do usuário, do cache ou do banco.
+
+        Args:
+            user_id (str|int): O ID guardado na sessão pelo Flask-Login.
+
+        Returns:
+            SessionUser|None: A identidade, ou None se o usuário não existir.
+        """
+        if self.backend is not None:
+            found, value = self.backend.get(self.key(user_id))
+
+            if found:
+                return value
+
+        user = db.session.get(User, int(user_id))
+
+        if user is None:
+            return None
+
+        identity = SessionUser(user.id, user.username, user.email)
+
+        if self.backend is not None:
+            self.backend.set(self.key(user_id), identity)
+
+        return identity
+
+    def invalidate(self, user_id):
+        """Descarta a identidade em cache de um usuário (ex: no logout)."""
+        if self.backend is not None:
+            self.backend.delete_prefix(self.key(user_id))
+
+    def stats(self):
+        """Retorna os contadores do backend, ou {"backend": "none"} com o cache desligado."""
+        if self.backend is None:
+            return {"backend": "none"}
+
+        return dict(self.backend.stats(), backend= "memory")
+
+
+user_cache = UserLoaderCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def forget_changed_user(mapper, connection, target):
+    """Descarta do cache o usuário alterado ou removido pelo ORM (ex: troca de senha).
+
+    O descarte acontece no flush e de novo no commit (ver `forget_committed_users`),
+    o que cobre uma requisição concorrente que tenha recarregado os dados antigos
+    nesse intervalo.
+    """
+    user_cache.invalidate(target.id)
+
+    session = inspect(target).session
+
+    if session is not None:
+        session.info.setdefault("user_cache_stale", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def forget_committed_users(session):
+    """Descarta do cache, depois do commit, os usuários alterados na transação."""
+    for user_id in session.info.pop("user_cache_stale", ()):
+        user_cache.invalidate(user_id)